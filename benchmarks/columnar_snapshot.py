@@ -0,0 +1,141 @@
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+from csv import DictReader
+from json import loads
+from benchmarks.workspace import create_workspace
+from wowhead_scraper.columnar_table import ColumnarTable, get_columnar_file_path, write_columnar_file
+from wowhead_scraper.entity_store import EntityStore
+from wowhead_scraper.psv_sink import PsvSink
+
+# Ways a table is read, every one is measured in its own process so the peak memory is its own
+# The psv codec is measured last, because it removes the columnar file so the entity store reads the psv file
+read_modes = ("psv_dict_reader", "columnar_rows", "columnar_one_column", "columnar", "psv_codec")
+
+
+def read_table_rules():
+
+    with open("wowhead_scraper/json_data/validation_rules.json", "r", newline="") as file:
+        return loads(file.read())["classic"]
+
+
+def create_rows(table_rules: dict, row_count: int, seed: int):
+
+    # Names are unique, other name columns repeat, like the profession, recipe and reagent names of the real tables
+    generator = random.Random(seed)
+    pools = {}
+    rows = []
+    for index in range(row_count):
+
+        row = {}
+        for field_name, field_rules in table_rules.items():
+
+            if field_rules["type"] == "integer":
+                row[field_name] = generator.randrange(field_rules.get("minimum", 0), 100000)
+            elif field_rules["type"] == "boolean":
+                row[field_name] = generator.random() < 0.5
+            elif field_name == "name":
+                row[field_name] = f"Recipe {index}"
+            elif field_rules.get("format", None) == "url":
+                row[field_name] = f"https://classic.wowhead.com/{field_name}={index}"
+            else:
+                if field_name not in pools:
+                    pools[field_name] = [f"{field_name.replace('_', ' ').title()} {value}"
+                                         for value in range(generator.choice((12, 200, 2000)))]
+                pool = pools[field_name]
+                row[field_name] = generator.choice(pool) if field_rules.get("not_null", False) or \
+                    generator.random() < 0.8 else None
+        rows.append(row)
+
+    return rows
+
+
+def read(mode: str, directory_path: str, table_name: str, field_name: str):
+
+    table_rules = read_table_rules()
+    file_path = f"{directory_path}/{table_name}.psv"
+    if mode == "psv_dict_reader":
+        with open(file_path, newline="") as file:
+            return len(list(DictReader(file, delimiter='|', lineterminator='\n')))
+    if mode == "columnar_rows":
+        with ColumnarTable(get_columnar_file_path(file_path)) as table:
+            return len(table.read_rows())
+    if mode == "columnar_one_column":
+        with ColumnarTable(get_columnar_file_path(file_path)) as table:
+            return len(table.read_column(field_name))
+
+    # The entity store reads the columnar file when it is there
+    if mode == "psv_codec" and os.path.isfile(get_columnar_file_path(file_path)):
+        os.remove(get_columnar_file_path(file_path))
+    return len(EntityStore(None, table_rules, directory_path).read(table_name))
+
+
+def get_peak_rss():
+
+    # The peak memory of this process in KiB, linux keeps the peak of the parent process in ru_maxrss after a fork
+    if os.path.isfile("/proc/self/status"):
+        with open("/proc/self/status", "r") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(mode: str, directory_path: str, table_name: str, field_name: str):
+
+    start_rss = get_peak_rss()
+    start_time = time.perf_counter()
+    row_count = read(mode, directory_path, table_name, field_name)
+    elapsed_time = time.perf_counter() - start_time
+    peak_rss = get_peak_rss()
+
+    print(f"{mode:>20}: {elapsed_time:8.3f} s, {row_count} rows, "
+          f"peak rss {peak_rss / 1024:8.1f} MiB (+{(peak_rss - start_rss) / 1024:.1f} MiB while reading)")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compare reading a table from its psv file and its columnar file.")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--table", default="recipe")
+    parser.add_argument("--column", default="profession_name", help="Column that is read on its own")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--measure", choices=read_modes, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--directory", default=None, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.measure is not None:
+        measure(arguments.measure, arguments.directory, arguments.table, arguments.column)
+        sys.exit()
+
+    # The measuring processes run in the workspace, with the repository on their path
+    repository_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print(f"Benchmark workspace: {create_workspace()}")
+    table_rules = read_table_rules()
+    directory_path = os.path.abspath("data")
+    os.makedirs(directory_path)
+    rows = create_rows(table_rules[arguments.table], arguments.rows, arguments.seed)
+    psv_file_path = f"{directory_path}/{arguments.table}.psv"
+    with PsvSink(psv_file_path, table_rules[arguments.table].keys()) as sink:
+        sink.write_rows(rows)
+
+    record_class = EntityStore(None, table_rules).get_record_class(arguments.table)
+    write_columnar_file(get_columnar_file_path(psv_file_path), record_class.codec, rows, psv_file_path)
+    print(f"{arguments.rows} rows of {arguments.table}, "
+          f"psv {os.path.getsize(psv_file_path) / 1024 / 1024:.1f} MiB, "
+          f"columnar {os.path.getsize(get_columnar_file_path(psv_file_path)) / 1024 / 1024:.1f} MiB")
+
+    for read_mode in read_modes:
+        subprocess.run([sys.executable, "-m", "benchmarks.columnar_snapshot",
+                        "--measure", read_mode,
+                        "--directory", directory_path,
+                        "--table", arguments.table,
+                        "--column", arguments.column],
+                       env=dict(os.environ, PYTHONPATH=repository_path),
+                       check=True)
@@ -0,0 +1,174 @@
+import argparse
+import random
+import time
+
+from wowhead_scraper.entity_index import EntityIndex
+
+# Rough sizes of the classic tables
+base_sizes = {
+    "locations": 350,
+    "vendors": 1200,
+    "trainers": 250,
+    "reagents": 600,
+    "enchantments": 150,
+    "craftable_items": 1500,
+    "recipe_items": 800,
+    "recipes": 2500
+}
+
+
+def create_tables(multiplier: int, seed: int):
+
+    # Psv rows hold strings, listview rows hold integers, like in the scraper
+    generator = random.Random(seed)
+    sizes = {name: size * multiplier for name, size in base_sizes.items()}
+    locations = tuple([{"name": f"Location {index}", "wowhead_id": str(index)}
+                       for index in range(sizes["locations"])])
+    reagents = tuple([{"name": f"Reagent {index}", "wowhead_id": str(10000 + index)}
+                      for index in range(sizes["reagents"])])
+    enchantments = tuple([{"name": f"Recipe {generator.randrange(sizes['recipes'])}"}
+                          for index in range(sizes["enchantments"])])
+    craftable_items = tuple([{"name": f"Recipe {generator.randrange(sizes['recipes'])}"}
+                             for index in range(sizes["craftable_items"])])
+    recipe_items = tuple([{"name": f"Pattern: Recipe {generator.randrange(sizes['recipes'])}"}
+                          for index in range(sizes["recipe_items"])])
+    vendors = tuple([{"location": [generator.randrange(sizes["locations"])
+                                   for location in range(generator.randint(1, 2))]}
+                     for index in range(sizes["vendors"])])
+    trainers = tuple([{"location": [generator.randrange(sizes["locations"])]}
+                      for index in range(sizes["trainers"])])
+
+    # Some reagents aren't known yet, like in the real data
+    recipes = tuple([{"name": f"Recipe {index}",
+                      "reagents": [[10000 + generator.randrange(int(sizes["reagents"] * 1.1)), 1]
+                                   for reagent in range(generator.randint(1, 5))]}
+                     for index in range(sizes["recipes"])])
+
+    return {
+        "locations": locations,
+        "reagents": reagents,
+        "enchantments": enchantments,
+        "craftable_items": craftable_items,
+        "recipe_items": recipe_items,
+        "vendors": vendors,
+        "trainers": trainers,
+        "recipes": recipes
+    }
+
+
+def remove_recipe_item_prefix(name: str):
+
+    return name.split(": ")[1] if len(name.split(": ")) > 1 else name
+
+
+def join_with_scans(tables: dict, vendors: tuple, trainers: tuple, recipes: tuple):
+
+    # The nested loops the stages used before
+    vendor_locations = []
+    for vendor in vendors:
+        for location in vendor["location"]:
+            for known_location in tables["locations"]:
+                if int(known_location["wowhead_id"]) == location:
+                    vendor_locations.append(known_location["name"])
+
+    trainer_locations = []
+    for trainer in trainers:
+        location = None
+        for known_location in tables["locations"]:
+            if int(known_location["wowhead_id"]) == trainer["location"][0]:
+                location = known_location
+        trainer_locations.append(location)
+
+    recipe_links = []
+    for recipe in recipes:
+        recipe_item_name = None
+        for recipe_item in tables["recipe_items"]:
+            if remove_recipe_item_prefix(recipe_item["name"]) == recipe["name"]:
+                recipe_item_name = recipe_item["name"]
+        enchantment_name = None
+        for enchantment in tables["enchantments"]:
+            if enchantment["name"] == recipe["name"]:
+                enchantment_name = enchantment["name"]
+        craftable_item_name = None
+        for craftable_item in tables["craftable_items"]:
+            if craftable_item["name"] == recipe["name"]:
+                craftable_item_name = craftable_item["name"]
+        reagent_names = []
+        for reagent in recipe["reagents"]:
+            reagent_name = None
+            for known_reagent in tables["reagents"]:
+                if int(known_reagent["wowhead_id"]) == reagent[0]:
+                    reagent_name = known_reagent["name"]
+            reagent_names.append(reagent_name)
+        recipe_links.append((recipe_item_name, enchantment_name, craftable_item_name, tuple(reagent_names)))
+
+    return vendor_locations, trainer_locations, recipe_links
+
+
+def join_with_indexes(tables: dict, vendors: tuple, trainers: tuple, recipes: tuple):
+
+    # Build the indexes once, like the scraper does per psv file
+    locations = EntityIndex(tables["locations"])
+    reagents = EntityIndex(tables["reagents"])
+    enchantments = EntityIndex(tables["enchantments"])
+    craftable_items = EntityIndex(tables["craftable_items"])
+    recipe_items = EntityIndex(tables["recipe_items"],
+                               name_function=lambda row: remove_recipe_item_prefix(row["name"]))
+
+    vendor_locations = []
+    for vendor in vendors:
+        for location in vendor["location"]:
+            for known_location in locations.get_all_by_id(location):
+                vendor_locations.append(known_location["name"])
+
+    trainer_locations = [locations.get_by_id(trainer["location"][0]) for trainer in trainers]
+
+    recipe_links = []
+    for recipe in recipes:
+        recipe_item = recipe_items.get_by_name(recipe["name"])
+        enchantment = enchantments.get_by_name(recipe["name"])
+        craftable_item = craftable_items.get_by_name(recipe["name"])
+        reagent_names = []
+        for reagent in recipe["reagents"]:
+            known_reagent = reagents.get_by_id(reagent[0])
+            reagent_names.append(known_reagent["name"] if known_reagent is not None else None)
+        recipe_links.append((recipe_item["name"] if recipe_item is not None else None,
+                             enchantment["name"] if enchantment is not None else None,
+                             craftable_item["name"] if craftable_item is not None else None,
+                             tuple(reagent_names)))
+
+    return vendor_locations, trainer_locations, recipe_links
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compare nested scans with indexed lookups for the stage joins.")
+    parser.add_argument("--multiplier", type=int, default=10)
+    parser.add_argument("--scan-sample", type=int, default=100,
+                        help="Outer rows the nested scans are timed on, the full time is extrapolated from them.")
+    parser.add_argument("--seed", type=int, default=1)
+    arguments = parser.parse_args()
+
+    tables = create_tables(arguments.multiplier, arguments.seed)
+    print(", ".join([f"{len(rows)} {name}" for name, rows in tables.items()]))
+
+    start_time = time.process_time()
+    join_with_indexes(tables, tables["vendors"], tables["trainers"], tables["recipes"])
+    indexed_time = time.process_time() - start_time
+
+    # The nested scans take too long on the full tables, so time a sample of every outer table and extrapolate
+    sample = arguments.scan_sample
+    estimated_scan_time = 0.0
+    for outer_table_name in ("vendors", "trainers", "recipes"):
+
+        outer_tables = {name: () for name in ("vendors", "trainers", "recipes")}
+        outer_tables[outer_table_name] = tables[outer_table_name][0:sample]
+        start_time = time.process_time()
+        scan_results = join_with_scans(tables, **outer_tables)
+        scan_time = time.process_time() - start_time
+        estimated_scan_time += scan_time / len(outer_tables[outer_table_name]) * len(tables[outer_table_name])
+        if scan_results != join_with_indexes(tables, **outer_tables):
+            print(f"DIFFERENT RESULTS for {outer_table_name}")
+
+    print(f"nested scans: {estimated_scan_time:10.3f} s (estimated from {sample} rows per table)")
+    print(f"     indexes: {indexed_time:10.3f} s")
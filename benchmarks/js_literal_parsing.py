@@ -0,0 +1,50 @@
+import argparse
+import re
+import time
+
+from wowhead_scraper.json_fixer import parse_js_literal
+from wowhead_scraper.page_extractor import extract_page, index_listviews
+from wowhead_scraper.stand_in_server import SyntheticPages
+
+
+def get_largest_listview(scale: int):
+
+    # Profession listviews are the biggest literals the scraper parses
+    synthetic_pages = SyntheticPages(scale=scale)
+    largest_data = ""
+    for profession_name in synthetic_pages.professions:
+
+        page = synthetic_pages.get_page(f"/{profession_name.lower().replace(' ', '-')}")
+        for listview in index_listviews(extract_page(page)["scripts"]).values():
+            if len(listview["data"]) > len(largest_data):
+                largest_data = listview["data"]
+
+    return largest_data
+
+
+def measure(name: str, records: str, multipliers: list, compatibility: bool):
+
+    # Time per megabyte stays the same when parsing is linear
+    for multiplier in multipliers:
+
+        text = "[" + ",".join([records] * multiplier) + "],extraCols:[]"
+        start_time = time.process_time()
+        parse_js_literal(text, compatibility=compatibility)
+        cpu_time = time.process_time() - start_time
+        print(f"{name:>24} x{multiplier:<4}: {len(text) / 1024:10.1f} KiB, "
+              f"{cpu_time * 1000:8.2f} ms, {cpu_time / (len(text) / 1024 / 1024) * 1000:8.2f} ms per MiB")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Measure how javascript literal parsing scales with its size.")
+    parser.add_argument("--scale", type=int, default=2)
+    parser.add_argument("--multipliers", type=int, nargs="+", default=[1, 4, 16, 64])
+    arguments = parser.parse_args()
+
+    quoted_records = get_largest_listview(arguments.scale).strip()[1:-1]
+    unquoted_records = re.sub(r'"(\w+)":', r"\1:", quoted_records)
+    measure("quoted keys", quoted_records, arguments.multipliers, False)
+    measure("quoted keys, compatible", quoted_records, arguments.multipliers, True)
+    measure("unquoted keys", unquoted_records, arguments.multipliers, False)
+    measure("unquoted keys, compatible", unquoted_records, arguments.multipliers, True)
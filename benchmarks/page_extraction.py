@@ -0,0 +1,77 @@
+import argparse
+import time
+import tracemalloc
+import zipfile
+
+from bs4 import BeautifulSoup
+from wowhead_scraper.page_extractor import etree, extract_page
+from wowhead_scraper.stand_in_server import SyntheticPages
+
+
+def extract_page_with_beautiful_soup(page: str):
+
+    html = BeautifulSoup(page, "html.parser")
+    headings = html.find_all(name="h1", class_="heading-size-1")
+
+    return {
+        "scripts": tuple([tag.contents[0] for tag in html.find_all("script", string=True)]),
+        "heading": headings[0].get_text() if len(headings) > 0 else None
+    }
+
+
+def load_pages(arguments):
+
+    # Use recorded pages when an archive is given, otherwise generate them
+    if arguments.archive is not None:
+        with zipfile.ZipFile(arguments.archive) as archive:
+            return [archive.read(name).decode("utf-8") for name in archive.namelist() if name.endswith(".html")]
+
+    synthetic_pages = SyntheticPages(scale=arguments.scale, padding=arguments.padding)
+    paths = ["/professions", "/zones", "/npcs?filter=29;1;0", "/items?filter=87;11;0"]
+    paths += [f"/{name.lower().replace(' ', '-')}" for name in synthetic_pages.professions]
+    paths += [f"/item={reagent['id']}" for reagent in synthetic_pages.reagents[0:50]]
+    paths += [f"/npc={trainer_id}" for trainer_id in list(synthetic_pages.trainers)[0:50]]
+
+    return [synthetic_pages.get_page(path) for path in paths]
+
+
+def measure(name: str, extract, pages: list, expected_results: list = None):
+
+    # Measure cpu time and peak python heap separately, tracemalloc slows everything down
+    start_time = time.process_time()
+    results = [extract(page) for page in pages]
+    cpu_time = time.process_time() - start_time
+
+    tracemalloc.start()
+    peak_memory = 0
+    for page in pages:
+        tracemalloc.reset_peak()
+        extract(page)
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    identical = "" if expected_results is None else \
+        ", identical results" if results == expected_results else ", DIFFERENT RESULTS"
+    print(f"{name:>16}: {cpu_time / len(pages) * 1000:8.2f} ms per page, "
+          f"peak {peak_memory / 1024:10.1f} KiB per page{identical}")
+
+    return results
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Benchmark extracting scripts and headings from wowhead pages.")
+    parser.add_argument("--archive", default=None, help="Page archive recorded in record mode")
+    parser.add_argument("--scale", type=int, default=2)
+    parser.add_argument("--padding", type=int, default=64 * 1024)
+    benchmark_arguments = parser.parse_args()
+
+    benchmark_pages = load_pages(benchmark_arguments)
+    average_size = sum([len(page) for page in benchmark_pages]) / len(benchmark_pages)
+    print(f"{len(benchmark_pages)} pages, {average_size / 1024:.1f} KiB on average")
+
+    expected = measure("BeautifulSoup", extract_page_with_beautiful_soup, benchmark_pages)
+    measure("extractor", extract_page, benchmark_pages, expected)
+    if etree is not None:
+        # lxml allocates outside the python heap, so its peak is underreported
+        measure("extractor (lxml)", lambda page: extract_page(page, use_lxml=True), benchmark_pages, expected)
@@ -0,0 +1,69 @@
+import argparse
+import time
+
+from benchmarks.workspace import create_workspace
+from wowhead_scraper.logger import Logger
+from wowhead_scraper.rate_limiter import RetryPolicy, TokenBucketRateLimiter
+from wowhead_scraper.scraper import WowheadScraper
+from wowhead_scraper.stand_in_server import StandInServer, SyntheticPages
+
+
+def run(arguments, concurrency: int):
+
+    server = StandInServer(SyntheticPages(scale=arguments.scale),
+                           latency=arguments.latency,
+                           latency_jitter=arguments.latency_jitter,
+                           throttle_rate=arguments.throttle_rate,
+                           error_rate=arguments.error_rate,
+                           truncate_rate=arguments.truncate_rate,
+                           requests_per_second=arguments.server_requests_per_second).start()
+    logger = Logger()
+    wowhead_scraper = WowheadScraper("classic",
+                                     wowhead_url=server.url,
+                                     connections_per_host=concurrency,
+                                     maximum_concurrency=concurrency,
+                                     rate_limiter=TokenBucketRateLimiter(logger,
+                                                                         rate=arguments.rate,
+                                                                         burst=arguments.burst,
+                                                                         maximum_rate=arguments.maximum_rate),
+                                     retry_policy=RetryPolicy(base_delay=0.1, maximum_delay=2.0),
+                                     use_cache=False)
+
+    start_time = time.time()
+    wowhead_scraper.scrape_all()
+    elapsed_time = time.time() - start_time
+
+    connection_statistics = wowhead_scraper.fetcher.get_connection_statistics()
+    limiter_state = wowhead_scraper.fetcher.rate_limiter.get_state()
+    wowhead_scraper.close()
+    server.stop()
+
+    print(f"concurrency {concurrency:>3}: {elapsed_time:8.2f} s, "
+          f"{server.statistics['pages_served'] / elapsed_time:8.1f} pages/s, "
+          f"{server.statistics['requests']} requests, "
+          f"{server.statistics['throttled']} throttled, "
+          f"{server.statistics['errors']} errors, "
+          f"{server.statistics['truncated']} truncated, "
+          f"reuse {round(connection_statistics['reuse_ratio'] * 100, 1)}%, "
+          f"final rate {limiter_state['rate']} requests/s")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Benchmark scrape_all against the local wowhead stand-in.")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--latency-jitter", type=float, default=0.05)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--server-requests-per-second", type=float, default=None)
+    parser.add_argument("--rate", type=float, default=50.0, help="Initial requests per second of the scraper")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--maximum-rate", type=float, default=200.0)
+    benchmark_arguments = parser.parse_args()
+
+    print(f"Benchmark workspace: {create_workspace()}")
+    for benchmark_concurrency in benchmark_arguments.concurrency:
+        run(benchmark_arguments, benchmark_concurrency)
@@ -0,0 +1,15 @@
+import os
+import tempfile
+
+
+def create_workspace():
+
+    # The scraper works relative to the current directory and clears data/,
+    # so benchmarks run in a temporary directory which links to the json data
+    repository_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    workspace_path = tempfile.mkdtemp(prefix="wowhead_scraper_benchmark_")
+    os.makedirs(f"{workspace_path}/wowhead_scraper")
+    os.symlink(f"{repository_path}/wowhead_scraper/json_data", f"{workspace_path}/wowhead_scraper/json_data")
+    os.chdir(workspace_path)
+
+    return workspace_path
@@ -0,0 +1,25 @@
+import os
+import pytest
+
+from wowhead_scraper.logger import Logger
+
+package_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+
+    # The scraper works relative to the current directory, so every test runs in its own directory,
+    # which links to the rules and scripts of the package like a checkout does
+    os.makedirs(tmp_path / "wowhead_scraper")
+    for directory_name in ("json_data", "sql_scripts"):
+        os.symlink(os.path.join(package_path, "wowhead_scraper", directory_name),
+                   tmp_path / "wowhead_scraper" / directory_name)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def logger(workspace):
+
+    return Logger()
@@ -0,0 +1,110 @@
+import os
+import pytest
+import time
+
+from wowhead_scraper.checkpoint_manifest import CheckpointManifest
+from wowhead_scraper.scraper import WowheadScraper
+
+locations = {
+    "1": {"id": 1, "name": "Tanaris"},
+    "2": {"id": 2, "name": "Feralas"},
+    "3": {"id": 3, "name": "Azshara"}
+}
+
+
+def create_scraper():
+
+    return WowheadScraper("classic", use_cache=False, resume=True, inline_validation=False)
+
+
+def scrape_locations(wowhead_scraper, contents: dict, fetched_keys: list, failing_key: str = None):
+
+    def scrape_details(keys: list):
+
+        fetched_keys.extend(keys)
+        if failing_key in keys:
+            raise RuntimeError(f"Can't scrape location {failing_key}")
+        return [{"name": contents[key]["name"], "wowhead_id": int(key)} for key in keys]
+
+    return wowhead_scraper.scrape_checkpointed_entities("locations", "locations", sorted(contents), scrape_details,
+                                                        contents, chunk_size=1)
+
+
+def test_a_resumed_run_only_scrapes_the_entities_that_werent_checkpointed(workspace):
+
+    fetched_keys = []
+    with pytest.raises(RuntimeError):
+        scrape_locations(create_scraper(), locations, fetched_keys, failing_key="3")
+
+    fetched_keys.clear()
+    details = scrape_locations(create_scraper(), locations, fetched_keys)
+
+    assert fetched_keys == ["3"]
+    assert [location["name"] for location in details] == ["Tanaris", "Feralas", "Azshara"]
+
+
+def test_an_entity_cut_off_by_a_crash_is_scraped_again(workspace, logger):
+
+    fetched_keys = []
+    scrape_locations(create_scraper(), locations, fetched_keys)
+    entity_file_path = CheckpointManifest(logger, "classic").get_entity_file_path("locations", "locations")
+    with open(entity_file_path, "r") as file:
+        journal = file.read()
+    with open(entity_file_path, "w") as file:
+        file.write(journal[0:-10])
+
+    fetched_keys.clear()
+    details = scrape_locations(create_scraper(), locations, fetched_keys)
+    assert fetched_keys == ["3"]
+    assert [location["name"] for location in details] == ["Tanaris", "Feralas", "Azshara"]
+
+    # The entity that was scraped again is on a line of its own
+    assert CheckpointManifest(logger, "classic").get_entities("locations", "locations") == {
+        key: {"name": location["name"], "wowhead_id": location["id"]} for key, location in locations.items()}
+
+
+def test_entities_whose_content_changed_are_scraped_again(workspace):
+
+    fetched_keys = []
+    scrape_locations(create_scraper(), locations, fetched_keys)
+
+    fetched_keys.clear()
+    changed_locations = dict(locations)
+    changed_locations["2"] = {"id": 2, "name": "Desolace"}
+    details = scrape_locations(create_scraper(), changed_locations, fetched_keys)
+
+    assert fetched_keys == ["2"]
+    assert [location["name"] for location in details] == ["Tanaris", "Desolace", "Azshara"]
+
+
+def test_finished_stages_run_again_when_their_inputs_changed(workspace):
+
+    stage_runs = []
+
+    def run_vendors_stage():
+
+        wowhead_scraper = create_scraper()
+
+        def scrape_vendors():
+
+            stage_runs.append(time.time())
+            return {
+                "start_time": time.time(),
+                "end_time": time.time()
+            }
+
+        wowhead_scraper.stages["vendors"]["function"] = scrape_vendors
+        wowhead_scraper.run_stage("vendors")
+
+    # The vendors stage reads the locations
+    os.makedirs("data", exist_ok=True)
+    with open("data/location.psv", "w") as file:
+        file.write("name|wowhead_id\nTanaris|1\n")
+    run_vendors_stage()
+    run_vendors_stage()
+    assert len(stage_runs) == 1
+
+    with open("data/location.psv", "a") as file:
+        file.write("Feralas|2\n")
+    run_vendors_stage()
+    assert len(stage_runs) == 2
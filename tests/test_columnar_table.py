@@ -0,0 +1,59 @@
+from wowhead_scraper.columnar_table import ColumnarTable, find_columnar_file, get_columnar_file_path, \
+    write_columnar_file
+from wowhead_scraper.psv_sink import PsvSink
+from wowhead_scraper.row_codec import RowCodec
+
+table_rules = {
+    "id": {"type": "integer", "not_null": True},
+    "name": {"type": "string", "not_null": True},
+    "location_name": {"type": "string"},
+    "is_limited": {"type": "boolean"},
+    "note": {"type": "string"}
+}
+rows = [
+    {"id": 1, "name": "Zarena", "location_name": "Tanaris", "is_limited": True, "note": None},
+    {"id": 2, "name": "Jabbey", "location_name": "Tanaris", "is_limited": None, "note": None},
+    {"id": None, "name": "Blizrik Buckshot", "location_name": None, "is_limited": False, "note": None},
+    {"id": -4, "name": "Ëlyssa", "location_name": "Tanaris", "is_limited": None, "note": None}
+]
+
+
+def write_table(file_path: str = "vendor.psv"):
+
+    codec = RowCodec("vendor", table_rules)
+    with PsvSink(file_path, codec.field_names) as sink:
+        sink.write_rows(rows)
+    write_columnar_file(get_columnar_file_path(file_path), codec, rows, file_path)
+
+
+def test_rows_read_back_with_nulls_and_dictionaries(workspace):
+
+    write_table()
+
+    with ColumnarTable("vendor.col") as table:
+        assert table.columns["location_name"]["encoding"] == "dictionary"
+        assert table.columns["name"]["encoding"] == "plain"
+        assert table.read_rows() == [tuple(row.values()) for row in rows]
+        assert list(table.iterate_rows(("name", "location_name"), start=1, chunk_size=2)) == [
+            ("Jabbey", "Tanaris"), ("Blizrik Buckshot", None), ("Ëlyssa", "Tanaris")]
+        assert table.read_column("note") == [None, None, None, None]
+        assert table.get_dictionary(table.columns["location_name"]) is \
+            table.get_dictionary(table.columns["location_name"])
+
+
+def test_columnar_files_are_only_used_for_the_psv_file_they_were_written_from(workspace):
+
+    write_table()
+    assert find_columnar_file("vendor.psv") == "vendor.col"
+
+    # Another psv file of the same size, like an edit that keeps the length of a value
+    with open("vendor.psv", "r+") as file:
+        content = file.read().replace("Zarena", "Zerena")
+        file.seek(0)
+        file.write(content)
+    assert find_columnar_file("vendor.psv") is None
+
+    write_table()
+    with open("vendor.psv", "a") as file:
+        file.write("5|Gikkix|Tanaris||\n")
+    assert find_columnar_file("vendor.psv") is None
@@ -0,0 +1,53 @@
+import pytest
+
+from wowhead_scraper.columnar_table import get_columnar_file_path, write_columnar_file
+from wowhead_scraper.data_validator import DataValidator
+from wowhead_scraper.psv_sink import PsvSink
+from wowhead_scraper.row_codec import RowCodec
+
+table_rules = {
+    "vendor": {
+        "id": {"type": "integer", "not_null": True, "minimum": 1},
+        "name": {"type": "string", "not_null": True, "unique": True},
+        "note": {"type": "string"},
+        "wowhead_link_url": {"type": "string", "format": "url"}
+    },
+    "source": {
+        "name": {"type": "string", "not_null": True, "unique": True}
+    }
+}
+
+
+def write_tables(columnar: bool = False):
+
+    # Bad values are spread over the table, duplicates are far apart so they end up in other shards,
+    # notes have quotes and line breaks, so records don't end at every line break
+    vendors = []
+    for index in range(200):
+        vendors.append({
+            "id": index + 1 if index % 37 != 5 else (0 if index % 2 == 0 else "x"),
+            "name": f"Vendor {index % 150}" if index % 61 != 7 else "",
+            "note": f"Sells \"goods\"\nand | more {index}" if index % 3 == 0 else None,
+            "wowhead_link_url": f"https://classic.wowhead.com/npc={index}" if index % 43 != 1 else "npc"
+        })
+    for table_name, rows in (("vendor", vendors), ("source", [{"name": "Vendor"}, {"name": "Drop"}])):
+
+        codec = RowCodec(table_name, table_rules[table_name])
+        with PsvSink(f"data/{table_name}.psv", codec.field_names) as sink:
+            sink.write_rows(rows)
+        if columnar:
+            write_columnar_file(get_columnar_file_path(f"data/{table_name}.psv"), codec, rows,
+                                f"data/{table_name}.psv")
+
+
+@pytest.mark.parametrize("columnar", (False, True))
+def test_sharded_validation_reports_like_a_single_process(logger, columnar):
+
+    write_tables(columnar)
+
+    report = DataValidator(logger, table_rules).validate()
+    sharded_report = DataValidator(logger, table_rules, maximum_workers=2, shard_size=256).validate()
+
+    assert report["tables"]["vendor"]["errors_by_rule"]["unique"] == 48
+    assert report["error_count"] > 50
+    assert sharded_report == report
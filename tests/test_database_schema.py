@@ -0,0 +1,48 @@
+import pytest
+
+from json import dumps
+from wowhead_scraper.database_schema import DatabaseSchema
+
+
+def test_link_tables_are_loaded_after_the_tables_they_reference(workspace):
+
+    schema = DatabaseSchema("classic")
+    levels = schema.get_dependency_levels(schema.table_rules)
+    table_levels = {table_name: level for level, table_names in enumerate(levels) for table_name in table_names}
+
+    for table_name, referenced_table_name in (("location_vendor", "vendor"),
+                                              ("location_vendor", "location"),
+                                              ("profession_trainer", "trainer"),
+                                              ("reagent_recipe", "reagent"),
+                                              ("recipe_specialisation", "specialisation"),
+                                              ("recipe_trainer", "recipe"),
+                                              ("recipe", "recipe_item")):
+        assert table_levels[table_name] > table_levels[referenced_table_name]
+
+
+def test_tables_without_rules_fail_loudly(workspace):
+
+    schema = DatabaseSchema("classic")
+
+    with pytest.raises(ValueError, match="vendor_location"):
+        schema.get_dependency_levels(["vendor", "vendor_location"])
+
+
+def test_references_to_unknown_columns_fail_loudly(workspace):
+
+    with open("validation_rules.json", "w") as file:
+        file.write(dumps({"classic": {"vendor": {"name": {"type": "string"}},
+                                      "location_vendor": {"vendor_name": {"type": "string",
+                                                                          "references": "vendors.name"}}}}))
+
+    with pytest.raises(ValueError, match="vendors.name"):
+        DatabaseSchema("classic", validation_rules_path="validation_rules.json")
+
+
+def test_tables_and_columns_missing_from_the_setup_script_are_reported(workspace):
+
+    schema = DatabaseSchema("classic")
+
+    assert schema.get_schema_gaps("enchantment") == "The setup script has no table enchantment"
+    assert "location_name" in schema.get_schema_gaps("trainer")
+    assert schema.get_schema_gaps("source") is None
@@ -0,0 +1,263 @@
+import pytest
+import requests
+import threading
+import time
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from wowhead_scraper import fetcher as fetcher_module
+from wowhead_scraper import rate_limiter as rate_limiter_module
+from wowhead_scraper.exceptions import PageNotFoundException, TooManyRetriesException, \
+    UnexpectedStatusCodeException
+from wowhead_scraper.fetcher import Fetcher
+from wowhead_scraper.rate_limiter import RetryPolicy, TokenBucketRateLimiter, parse_retry_after
+from wowhead_scraper.stand_in_server import StandInServer, SyntheticPages
+
+
+class FakeTime:
+
+    # A clock that only moves when something sleeps
+    def __init__(self):
+
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+
+        return self.now
+
+    def time(self):
+
+        return self.now
+
+    def sleep(self, seconds: float):
+
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+
+    def __init__(self, status_code: int, text: str = "", headers: dict = None):
+
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers if headers is not None else {}
+
+
+class FakeSession:
+
+    # Answers every request with the next response, exceptions are raised
+    def __init__(self, responses: list):
+
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url: str, headers: dict = None, timeout=None):
+
+        self.requests.append((url, headers))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+
+        return response
+
+    def close(self):
+
+        pass
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+
+    fake_time = FakeTime()
+    monkeypatch.setattr(rate_limiter_module, "time", fake_time)
+    monkeypatch.setattr(fetcher_module, "time", fake_time)
+    return fake_time
+
+
+def create_fetcher(logger, responses: list, maximum_retries: int = 3):
+
+    fetcher = Fetcher(logger,
+                      rate_limiter=TokenBucketRateLimiter(logger, rate=1.0, burst=2, rate_increase=0.5),
+                      retry_policy=RetryPolicy(maximum_retries=maximum_retries, base_delay=1.0, maximum_delay=4.0))
+    fetcher.session = FakeSession(responses)
+
+    return fetcher
+
+
+def test_token_bucket_allows_a_burst_then_waits_for_the_rate(logger, fake_time):
+
+    rate_limiter = TokenBucketRateLimiter(logger, rate=2.0, burst=3)
+
+    assert [rate_limiter.acquire() for request in range(3)] == [0.0, 0.0, 0.0]
+    assert rate_limiter.acquire() == 0.5
+    assert rate_limiter.acquire() == 0.5
+
+    # An idle bucket fills up to the burst again, not beyond it
+    fake_time.sleep(60)
+    assert [rate_limiter.acquire() for request in range(4)] == [0.0, 0.0, 0.0, 0.5]
+    assert rate_limiter.get_state()["requests_allowed"] == 9
+
+
+def test_throttles_halve_the_rate_and_successes_raise_it_again(logger, fake_time):
+
+    rate_limiter = TokenBucketRateLimiter(logger, rate=1.0, burst=2, minimum_rate=0.2, maximum_rate=1.5,
+                                          rate_increase=0.25, rate_decrease_factor=0.5)
+
+    rate_limiter.record_throttle(429)
+    assert rate_limiter.rate == 0.5
+    rate_limiter.record_throttle(503)
+    rate_limiter.record_throttle(503)
+    assert rate_limiter.rate == 0.2
+
+    # A throttle empties the bucket, so the next request waits for a token at the lowered rate
+    assert rate_limiter.acquire() == 5.0
+
+    for response in range(10):
+        rate_limiter.record_success()
+    assert rate_limiter.rate == 1.5
+    assert rate_limiter.get_state()["throttled_responses"] == 3
+
+
+def test_retry_after_pauses_requests(logger, fake_time):
+
+    rate_limiter = TokenBucketRateLimiter(logger, rate=1.0, burst=5)
+
+    rate_limiter.record_throttle(429, retry_after=30.0)
+
+    assert rate_limiter.acquire() == 30.0
+
+
+def test_retry_after_is_read_as_seconds_or_as_a_date(fake_time):
+
+    retry_date = datetime.fromtimestamp(fake_time.now, timezone.utc) + timedelta(seconds=120)
+
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(format_datetime(retry_date, usegmt=True)) == 120.0
+    assert parse_retry_after(format_datetime(retry_date - timedelta(hours=1), usegmt=True)) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_delays_are_jittered_below_an_exponential_cap(monkeypatch):
+
+    retry_policy = RetryPolicy(maximum_retries=5, base_delay=1.0, maximum_delay=10.0)
+    monkeypatch.setattr(rate_limiter_module.random, "uniform", lambda low, high: (low, high))
+
+    assert [retry_policy.get_delay(attempt) for attempt in range(5)] == [(0, 1.0), (0, 2.0), (0, 4.0), (0, 8.0),
+                                                                         (0, 10.0)]
+
+
+def test_throttled_and_failed_requests_are_retried(logger, fake_time, monkeypatch):
+
+    monkeypatch.setattr(rate_limiter_module.random, "uniform", lambda low, high: high)
+    fetcher = create_fetcher(logger, [FakeResponse(429, headers={"Retry-After": "10"}),
+                                      requests.ConnectionError("reset"),
+                                      FakeResponse(502),
+                                      FakeResponse(200, "<html>Item</html>")])
+
+    assert fetcher.download_page("https://classic.wowhead.com/item=1") == "<html>Item</html>"
+    assert len(fetcher.session.requests) == 4
+    assert fetcher.rate_limiter.get_state()["throttled_responses"] == 2
+
+    # Every retry backed off, the second request also waited for the rest of the retry after pause
+    assert fake_time.sleeps == [1.0, 9.0, 2.0, 4.0]
+
+
+def test_requests_give_up_after_the_retry_cap(logger, fake_time):
+
+    fetcher = create_fetcher(logger, [FakeResponse(503) for response in range(4)], maximum_retries=3)
+
+    with pytest.raises(TooManyRetriesException):
+        fetcher.download_page("https://classic.wowhead.com/item=1")
+    assert len(fetcher.session.requests) == 4
+
+
+@pytest.mark.parametrize("status_code, exception_class", ((404, PageNotFoundException),
+                                                          (410, PageNotFoundException),
+                                                          (403, UnexpectedStatusCodeException),
+                                                          (301, UnexpectedStatusCodeException)))
+def test_pages_that_cant_be_fetched_fail_without_retrying(logger, fake_time, status_code, exception_class):
+
+    fetcher = create_fetcher(logger, [FakeResponse(status_code)])
+
+    with pytest.raises(exception_class):
+        fetcher.download_page("https://classic.wowhead.com/item=1")
+    assert len(fetcher.session.requests) == 1
+
+
+def test_pages_are_returned_in_the_order_of_their_urls(logger):
+
+    # Later pages are downloaded faster, so they are done first
+    fetcher = Fetcher(logger, maximum_concurrency=4)
+    urls = [f"https://classic.wowhead.com/item={number}" for number in range(8)]
+
+    def download_page(url: str):
+
+        time.sleep((8 - int(url.split("=")[1])) * 0.005)
+        return f"<html>{url}</html>"
+
+    fetcher.download_page = download_page
+
+    assert fetcher.get_pages(urls) == tuple([f"<html>{url}</html>" for url in urls])
+
+
+def test_a_failed_page_fails_get_pages_without_leaving_downloads_running(logger):
+
+    fetcher = Fetcher(logger, maximum_concurrency=4)
+    urls = [f"https://classic.wowhead.com/item={number}" for number in range(8)]
+    started_urls = []
+    finished_urls = []
+    thread_count = threading.active_count()
+
+    def download_page(url: str):
+
+        started_urls.append(url)
+        if url.endswith("=2"):
+            raise PageNotFoundException(f"The page {url} returned status code 404")
+        time.sleep(0.01)
+        finished_urls.append(url)
+        return f"<html>{url}</html>"
+
+    fetcher.download_page = download_page
+
+    with pytest.raises(PageNotFoundException, match="item=2"):
+        fetcher.get_pages(urls)
+
+    # The pages that were being downloaded are done, the pages that weren't started yet are cancelled
+    assert sorted(finished_urls) == sorted([url for url in started_urls if not url.endswith("=2")])
+    assert threading.active_count() == thread_count
+
+
+def test_keep_alive_connections_are_counted_as_reused(logger):
+
+    # A local server that keeps http/1.1 connections open between requests
+    server = StandInServer(SyntheticPages(scale=1, padding=64)).start()
+    try:
+        fetcher = Fetcher(logger, rate_limiter=TokenBucketRateLimiter(logger, rate=1000.0, burst=100))
+        responses = [fetcher.get(f"{server.url}{path}")
+                     for path in ("/professions", "/zones", "/professions", "/missing")]
+        assert [response.status_code for response in responses] == [200, 200, 200, 404]
+        assert fetcher.get_connection_statistics() == {
+            "requests_sent": 4,
+            "connections_opened": 1,
+            "connections_reused": 3,
+            "reuse_ratio": 0.75
+        }
+        fetcher.close()
+
+        # Concurrent requests share the connections of the pool instead of opening one per request
+        fetcher = Fetcher(logger, connections_per_host=2, maximum_concurrency=4,
+                          rate_limiter=TokenBucketRateLimiter(logger, rate=1000.0, burst=100))
+        pages = fetcher.get_pages([f"{server.url}/professions" for request in range(12)])
+        statistics = fetcher.get_connection_statistics()
+        fetcher.close()
+    finally:
+        server.stop()
+
+    assert len(set(pages)) == 1
+    assert statistics["requests_sent"] == 12
+    assert statistics["connections_opened"] <= 2
+    assert statistics["connections_reused"] == 12 - statistics["connections_opened"]
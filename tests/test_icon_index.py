@@ -0,0 +1,49 @@
+import time
+
+from json import dumps, loads
+from wowhead_scraper.icon_index import IconIndex
+
+
+def test_names_are_looked_up_within_their_type(logger):
+
+    icon_index = IconIndex(logger, "classic")
+    icon_index.add("item", 2840, "Copper Bar", "inv_ingot_02")
+    icon_index.add("spell", 2657, "Copper Bar", "spell_smelt_copper")
+
+    assert icon_index.get("item", name="Copper Bar") == "inv_ingot_02"
+    assert icon_index.get("spell", name="copper  bar") == "spell_smelt_copper"
+    assert icon_index.get("npc", name="Copper Bar") is None
+
+
+def test_icons_expire_with_the_cached_pages(logger):
+
+    icon_index = IconIndex(logger, "classic", resource_ttls={"item": 60})
+    icon_index.add("item", 2840, "Copper Bar", "inv_ingot_02")
+    icon_index.add("spell", 2657, "Smelt Copper", "spell_smelt_copper")
+    icon_index.save()
+
+    # Make the icons older than the item time to live, but not older than the spell time to live
+    with open(icon_index.file_path, "r") as file:
+        data = loads(file.read())
+    for entries in (data["ids"], data["names"]):
+        for entry in entries.values():
+            entry[1] = time.time() - 120
+    with open(icon_index.file_path, "w") as file:
+        file.write(dumps(data))
+
+    icon_index = IconIndex(logger, "classic", resource_ttls={"item": 60})
+    assert icon_index.get("item", 2840, "Copper Bar") is None
+    assert icon_index.get("spell", 2657, "Smelt Copper") == "spell_smelt_copper"
+
+
+def test_other_domains_and_versions_are_ignored(logger):
+
+    icon_index = IconIndex(logger, "classic")
+    icon_index.add("item", 2840, "Copper Bar", "inv_ingot_02")
+    icon_index.save()
+
+    assert IconIndex(logger, "ptr").get("item", 2840) is None
+
+    with open(icon_index.file_path, "w") as file:
+        file.write(dumps({"domain": "classic", "ids": {"item:2840": "inv_ingot_02"}, "names": {}}))
+    assert IconIndex(logger, "classic").get("item", 2840) is None
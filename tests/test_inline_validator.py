@@ -0,0 +1,74 @@
+import pytest
+
+from wowhead_scraper.data_validator import DataValidator
+from wowhead_scraper.entity_store import EntityStore
+from wowhead_scraper.exceptions import ErrorBudgetExceededException
+from wowhead_scraper.inline_validator import InlineValidator
+
+table_rules = {
+    "vendor": {
+        "name": {"type": "string", "not_null": True, "unique": True},
+        "wowhead_link_url": {"type": "string", "format": "url"}
+    },
+    "location_vendor": {
+        "vendor_name": {"type": "string", "not_null": True, "references": "vendor.name"},
+        "location_name": {"type": "string", "not_null": True}
+    }
+}
+vendors = [{"name": "Zarena", "wowhead_link_url": "https://classic.wowhead.com/npc=1"},
+           {"name": "Jabbey", "wowhead_link_url": "no url"},
+           {"name": "Zarena", "wowhead_link_url": "https://classic.wowhead.com/npc=2"}]
+location_vendors = [{"vendor_name": "Zarena", "location_name": "Tanaris"},
+                    {"vendor_name": "Jabbey", "location_name": "Tanaris"}]
+
+
+def scrape_vendors(entity_store: EntityStore):
+
+    # The link table is written first, like stages that produce their rows interleaved
+    with entity_store.open_sinks(("location_vendor", "vendor")) as sinks:
+        sinks["location_vendor"].write_rows(location_vendors)
+        sinks["vendor"].write_rows(vendors)
+
+
+def test_bad_rows_are_reported_and_kept_by_default(logger):
+
+    inline_validator = InlineValidator(logger, DataValidator(logger, table_rules))
+    entity_store = EntityStore(logger, table_rules, inline_validator=inline_validator)
+
+    scrape_vendors(entity_store)
+
+    assert len(entity_store.read("vendor")) == 3
+    assert len(entity_store.read("location_vendor")) == 2
+    assert [row["reasons"] for row in inline_validator.quarantined_rows["vendor"]] == [
+        "wowhead_link_url: The value \"no url\" is not in the url format",
+        "name: The value \"Zarena\" is not unique"]
+    with open("data/quarantine/vendor.psv") as file:
+        assert len(file.readlines()) == 3
+
+
+def test_dropped_rows_take_the_rows_that_reference_them_along(logger):
+
+    inline_validator = InlineValidator(logger, DataValidator(logger, table_rules), quarantine_mode="drop")
+    entity_store = EntityStore(logger, table_rules, inline_validator=inline_validator)
+
+    scrape_vendors(entity_store)
+
+    # Zarena is still a vendor after its duplicate was dropped, Jabbey isn't
+    assert [vendor.name for vendor in entity_store.read("vendor")] == ["Zarena"]
+    assert [(row.vendor_name, row.location_name) for row in entity_store.read("location_vendor")] == [
+        ("Zarena", "Tanaris")]
+    assert [row["reasons"] for row in inline_validator.quarantined_rows["location_vendor"]] == [
+        "vendor_name: The value \"Jabbey\" only references quarantined rows"]
+
+
+def test_a_stage_only_fails_with_an_error_budget(logger):
+
+    inline_validator = InlineValidator(logger, DataValidator(logger, table_rules), error_budget=1)
+    entity_store = EntityStore(logger, table_rules, inline_validator=inline_validator)
+    entity_store.write("vendor", vendors[0:1])
+
+    with pytest.raises(ErrorBudgetExceededException):
+        scrape_vendors(entity_store)
+
+    assert len(entity_store.read("vendor")) == 1
+    assert "location_vendor" not in entity_store.changed_table_names
@@ -0,0 +1,97 @@
+import json
+import pytest
+
+from wowhead_scraper.exceptions import CantConvertJSONStringException
+from wowhead_scraper.json_fixer import fix_json, parse_js_literal
+
+
+@pytest.mark.parametrize("text", [
+    '{"id": 1, "name": "Copper Bar", "reagents": [[2770, 1]], "quality": 1.5, "learned": false, "source": null}',
+    '[{"id": -12, "text": "\\u00e9\\n\\t"}, [], {}]',
+    '"string"',
+    '12e3'
+])
+def test_plain_json_is_parsed_like_json(text: str):
+
+    assert parse_js_literal(text) == json.loads(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("{id:1,name:\"Copper Bar\"}", {"id": 1, "name": "Copper Bar"}),
+    ("{a:true,b:false,c:null,d:undefined}", {"a": True, "b": False, "c": None, "d": None}),
+    ("{name:LANG.tab_items}", {"name": "LANG.tab_items"}),
+    ("{true:1}", {"true": 1}),
+    ("[1,2,]", [1, 2]),
+    ("{a:1,b:[{c:2,},],}", {"a": 1, "b": [{"c": 2}]}),
+    ("[{id:1}],extraCols:[Listview.extraCols.popularity]", [{"id": 1}]),
+    ("{a:'It\\'s',b:'\\x41\\u00e9\\v\\0'}", {"a": "It's", "b": "Aé\v\0"}),
+    ("{'quoted':1, \"double\":2, bare:3}", {"quoted": 1, "double": 2, "bare": 3}),
+    ("\n  {\n  a : 1 ,\n  b : -0.5\n  }\n", {"a": 1, "b": -0.5})
+])
+def test_javascript_literals_are_parsed(text: str, expected):
+
+    assert parse_js_literal(text) == expected
+
+
+def test_deep_nesting_doesnt_recurse():
+
+    depth = 5000
+    value = parse_js_literal("[" * depth + "]" * depth)
+    for level in range(depth - 1):
+        value = value[0]
+    assert value == []
+
+
+@pytest.mark.parametrize("text", [
+    '{"id":1,"name":"Say \\"hi\\"","note":"1,2:3","text":"it\'s"}',
+    '{id:1,name:"Say \\"hi\\"",note:"1,2:3",text:"it\'s"}'
+])
+def test_compatibility_reproduces_old_quoting(text: str):
+
+    # The old regex repairs changed strings, the result is the same for quoted and unquoted keys
+    assert fix_json(text) == {"id": 1, "name": "Say `hi`", "note": "1, 2: 3", "text": "it''s"}
+    assert parse_js_literal(text) == {"id": 1, "name": "Say \"hi\"", "note": "1,2:3", "text": "it's"}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('[{"id":1,"name":"a"}]', [{"id": 1, "name": "a"}]),
+    ("{a:1,b:LANG.x}", {"a": 1, "b": "LANG.x"}),
+    ("{a:[1,2],b:{c:3}}", {"a": [1, 2], "b": {"c": 3}}),
+    ('{"x,y":1}', {"x, y": 1}),
+    ("{a:1.5,b:-2,c:true,d:null}", {"a": 1.5, "b": -2, "c": True, "d": None})
+])
+def test_compatibility_matches_old_fix_json(text: str, expected):
+
+    # Results of the old fix_json for the same text
+    assert fix_json(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    # The old repairs kept the quotes of single quoted strings doubled in the value
+    ("{name:'Foo'}", {"name": "Foo"}),
+    ("{\"name\":'Foo'}", {"name": "Foo"}),
+    # The old repairs failed on commas and colons in strings after unquoted keys
+    ('{a:"x,y:z"}', {"a": "x, y: z"}),
+    ('{"x,y:z":1}', {"x, y: z": 1})
+])
+def test_compatibility_differs_from_old_fix_json(text: str, expected):
+
+    assert fix_json(text) == expected
+
+
+@pytest.mark.parametrize("text, position", [
+    ("{a:1", 4),
+    ("{a:1]", 5),
+    ("{a:1,b:}", 8),
+    ("{a:1,b}", 7),
+    ("{a:1,", 5),
+    ("[1,2", 4),
+    ("{[1]:2}", 4),
+    ("{a:1:2}", 5),
+    ("\"unterminated", 0),
+    ("", 0)
+])
+def test_invalid_literals_raise(text: str, position: int):
+
+    with pytest.raises(CantConvertJSONStringException, match=f"position {position}:"):
+        parse_js_literal(text)
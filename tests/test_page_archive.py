@@ -0,0 +1,90 @@
+import shutil
+import zipfile
+import pytest
+
+from wowhead_scraper.exceptions import PageNotInArchiveException
+from wowhead_scraper.page_archive import PageArchive
+
+
+def record_pages(archive: PageArchive, first: int, last: int):
+
+    for number in range(first, last):
+        archive.record(f"https://classic.wowhead.com/item={number}", f"<html>Item {number}</html>")
+
+
+def test_closed_archive_replays_every_page(logger, workspace):
+
+    archive = PageArchive(logger, "archive.zip", "record", flush_interval=2)
+    record_pages(archive, 0, 5)
+    archive.close()
+
+    archive = PageArchive(logger, "archive.zip", "replay")
+    assert len(archive.index) == 5
+    assert archive.read("https://classic.wowhead.com/item=4") == "<html>Item 4</html>"
+    archive.close()
+
+
+def test_crashed_recording_replays_flushed_pages(logger, workspace):
+
+    # Copy the archive while it's still open, like the file a crashed scrape leaves behind
+    archive = PageArchive(logger, "archive.zip", "record", flush_interval=2)
+    record_pages(archive, 0, 5)
+    shutil.copyfile("archive.zip", "crashed.zip")
+    archive.close()
+
+    archive = PageArchive(logger, "crashed.zip", "replay")
+    assert [archive.read(f"https://classic.wowhead.com/item={number}") for number in range(4)] == \
+        [f"<html>Item {number}</html>" for number in range(4)]
+    with pytest.raises(PageNotInArchiveException):
+        archive.read("https://classic.wowhead.com/item=4")
+    archive.close()
+
+
+def test_resumed_recording_keeps_earlier_pages(logger, workspace):
+
+    archive = PageArchive(logger, "archive.zip", "record", flush_interval=2)
+    record_pages(archive, 0, 3)
+    archive.close()
+
+    # A crash while recording into an existing archive overwrites its zip directory
+    archive = PageArchive(logger, "archive.zip", "record", flush_interval=2)
+    record_pages(archive, 3, 6)
+    shutil.copyfile("archive.zip", "crashed.zip")
+    archive.close()
+
+    archive = PageArchive(logger, "crashed.zip", "record", flush_interval=2)
+    record_pages(archive, 0, 8)
+    archive.close()
+
+    archive = PageArchive(logger, "crashed.zip", "replay")
+    assert sorted(archive.index.keys()) == sorted([f"https://classic.wowhead.com/item={number}"
+                                                   for number in range(8)])
+    assert archive.read("https://classic.wowhead.com/item=7") == "<html>Item 7</html>"
+    archive.close()
+
+
+def test_recording_into_a_repaired_archive_adds_new_index_parts(logger, workspace):
+
+    archive = PageArchive(logger, "archive.zip", "record", flush_interval=2)
+    record_pages(archive, 0, 5)
+    shutil.copyfile("archive.zip", "crashed.zip")
+    archive.close()
+
+    # The crash left the index parts of the first four pages and the fifth page without its url
+    archive = PageArchive(logger, "crashed.zip", "record", flush_interval=2)
+    assert sorted([entry_name for entry_name in archive.entry_names if entry_name.startswith("index/")]) == \
+        ["index/0.json", "index/1.json"]
+    record_pages(archive, 4, 8)
+    archive.close()
+
+    # Every index part is written once, after the parts that survived the crash
+    with zipfile.ZipFile("crashed.zip") as crashed_archive:
+        entry_names = crashed_archive.namelist()
+    assert len(entry_names) == len(set(entry_names))
+    assert sorted([entry_name for entry_name in entry_names if entry_name.startswith("index/")]) == \
+        ["index/0.json", "index/1.json", "index/2.json", "index/3.json"]
+
+    archive = PageArchive(logger, "crashed.zip", "replay")
+    assert [archive.read(f"https://classic.wowhead.com/item={number}") for number in range(8)] == \
+        [f"<html>Item {number}</html>" for number in range(8)]
+    archive.close()
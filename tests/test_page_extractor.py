@@ -0,0 +1,149 @@
+import re
+import pytest
+
+from wowhead_scraper.json_fixer import fix_json, parse_js_literal
+from wowhead_scraper.page_extractor import etree, extract_page, index_listviews, scan_object_properties
+from wowhead_scraper.scraper import WowheadScraper
+from wowhead_scraper.stand_in_server import SyntheticPages
+
+bs4 = pytest.importorskip("bs4")
+
+# Pages with what the old BeautifulSoup scraper had to handle, next to generated table, listview and details pages
+fixture_pages = {
+    "script with markup": "<script>document.write('<div>x</div>');<!-- b(); --></script>",
+    "empty scripts": "<script src=\"/js/basic.js\"></script><script> </script><script>\n  \n</script>",
+    "commented script": "<!-- <script>hidden();</script> --><SCRIPT>shown();</SCRIPT>",
+    "nested scripts": "<div><script>x();</script></div><noscript><script>y();</script></noscript>",
+    "heading with markup": "<h1 class='heading-size-1'>Copper &amp; <span>Tin</span>  \n  <b>Bar</b> \n</h1>",
+    "heading with a script": "<h1 class=\"heading-size-1\">Copper Bar<script>x();</script>\n</h1><script>y();</script>",
+    "second heading": "<h1>Classic</h1><h1 class=\"title heading-size-1\">Copper Bar</h1>"
+                      "<h1 class=heading-size-1>B</h1>",
+    "heading with a comment": "<H1 CLASS='heading-size-1'>Copper<!-- Tin --> Bar&nbsp;</H1>"
+}
+synthetic_pages = SyntheticPages(scale=1, padding=64)
+fixture_paths = ["/professions", "/zones", "/items?filter=87;11;0", "/spells/professions/engineering",
+                 f"/{synthetic_pages.main_professions[0][0].lower()}",
+                 f"/item={synthetic_pages.reagents[0]['id']}",
+                 f"/npc={list(synthetic_pages.trainers)[0]}"]
+for fixture_path in fixture_paths:
+    fixture_pages[fixture_path] = synthetic_pages.get_page(fixture_path)
+
+extractors = ["regex", "lxml"] if etree is not None else ["regex"]
+
+
+def extract_page_with_beautiful_soup(page: str):
+
+    # What the old scrape functions read from the document tree
+    html = bs4.BeautifulSoup(page, "html.parser")
+    headings = html.find_all(name="h1", class_="heading-size-1")
+
+    return {
+        "scripts": tuple([tag.contents[0] for tag in html.find_all("script", string=True)]),
+        "heading": headings[0].get_text() if len(headings) > 0 else None
+    }
+
+
+@pytest.mark.parametrize("extractor", extractors)
+@pytest.mark.parametrize("name", list(fixture_pages))
+def test_pages_are_extracted_like_beautiful_soup_did(name: str, extractor: str):
+
+    page = fixture_pages[name]
+
+    assert extract_page(page, use_lxml=extractor == "lxml") == extract_page_with_beautiful_soup(page)
+    assert extract_page(page.encode("utf-8"), use_lxml=extractor == "lxml") == extract_page_with_beautiful_soup(page)
+
+
+def test_details_pages_are_parsed_like_beautiful_soup_did(workspace):
+
+    wowhead_scraper = WowheadScraper("classic", use_cache=False, inline_validation=False)
+    for item_id in [reagent["id"] for reagent in synthetic_pages.reagents[0:5]]:
+
+        page = synthetic_pages.get_page(f"/item={item_id}")
+        html = bs4.BeautifulSoup(page, "html.parser")
+        icon_name = None
+        for tag in html.find_all("script", string=True):
+
+            match = re.search(fr"WH\.ge\('ic{item_id}'\)\.appendChild\(Icon\.create\('([a-z0-9_]+)'", tag.contents[0])
+            if match is not None:
+                icon_name = match.group(1)
+
+        assert wowhead_scraper.parse_details_page(page, item_id) == {
+            "name": html.find_all(name="h1", class_="heading-size-1")[0].get_text().rstrip(),
+            "icon_link_url": wowhead_scraper.format_icon_link(icon_name)
+        }
+    wowhead_scraper.close()
+
+
+def test_listview_pages_are_parsed_like_beautiful_soup_did(workspace):
+
+    wowhead_scraper = WowheadScraper("classic", use_cache=False, inline_validation=False)
+    page = synthetic_pages.get_page("/items?filter=87;11;0")
+    html = bs4.BeautifulSoup(page, "html.parser")
+    expected_data = None
+    for tag in html.find_all("script", string=True):
+
+        match = re.search(r"var listviewitems = ([^;]+);", tag.contents[0])
+        if match is not None:
+            expected_data = fix_json(match.group(1))
+
+    assert expected_data is not None
+    assert wowhead_scraper.parse_listview_page(page, "items", "reagents")["reagents"] == expected_data
+    wowhead_scraper.close()
+
+
+def test_every_listview_of_a_page_is_indexed_by_its_own_id():
+
+    # The ids of the other listviews occur in comments, names and strings before the listview that has them
+    recipes_script = "var tabsRelated = new Tabs({parent: WH.ge('jkbfksdbl4')});\n" \
+                     "// new Listview({id: 'trainers'}) is added after the recipes\n" \
+                     "new Listview({template: 'spell', id: 'recipes', name: LANG.trainers, " \
+                     "note: \"id: 'trainers', data: [1]\", data: [{\"id\": 1}], sort: ['name']});\n" \
+                     "new Listview({template: 'npc', id: \"trainers\", data: [{\"id\": 2}]});"
+    items_script = "var listviewitems = [{\"id\": 3}];\n" \
+                   "new Listview({template: 'item', 'id': 'crafted-items', \"data\": [{\"id\": 4}]});"
+
+    listviews = index_listviews([recipes_script, items_script])
+
+    assert {listview_id: listview["data"] for listview_id, listview in listviews.items()} == {
+        "recipes": "[{\"id\": 1}]",
+        "trainers": "[{\"id\": 2}]",
+        "crafted-items": "[{\"id\": 4}]"
+    }
+    assert listviews["trainers"]["script"] is recipes_script
+    assert listviews["crafted-items"]["script"] is items_script
+
+
+def test_listviews_without_an_id_data_or_closing_brace_are_skipped():
+
+    listviews = index_listviews(["new Listview({template: 'spell', data: [{\"id\": 1}]});",
+                                 "new Listview({template: 'spell', id: 'recipes'});",
+                                 "new Listview({template: 'item', id: 'broken', data: [{\"id\": 2}"])
+
+    assert listviews == {}
+
+
+def test_nested_braces_and_strings_dont_end_the_data_of_a_listview():
+
+    script = "new Listview({id: 'recipes', data: [{\"name\": \"Brace {yourself}\", \"text\": 'It\\'s [a] }trap{'}, " \
+             "{\"nested\": {\"a\": [1, {\"b\": \"\\\"}\"}]}}], " \
+             "extraCols: [Listview.extraCols.popularity]});"
+
+    listview_data = index_listviews([script])["recipes"]["data"]
+
+    assert listview_data == "[{\"name\": \"Brace {yourself}\", \"text\": 'It\\'s [a] }trap{'}, " \
+                            "{\"nested\": {\"a\": [1, {\"b\": \"\\\"}\"}]}}]"
+    assert parse_js_literal(listview_data) == [{"name": "Brace {yourself}", "text": "It's [a] }trap{"},
+                                               {"nested": {"a": [1, {"b": "\"}"}]}}]
+
+
+def test_object_properties_are_split_at_top_level_commas():
+
+    text = "var listview = {a: {b: '}', c: [1, 2]}, 'd': \"x,y\", e: f(1, 2), g: `${1 + {h: 1}.h}`, i: -1};"
+
+    assert scan_object_properties(text, text.index("{")) == {
+        "a": "{b: '}', c: [1, 2]}",
+        "d": "\"x,y\"",
+        "e": "f(1, 2)",
+        "g": "`${1 + {h: 1}.h}`",
+        "i": "-1"
+    }
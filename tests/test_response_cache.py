@@ -0,0 +1,108 @@
+import os
+import pytest
+
+from tests.test_fetcher import FakeResponse, FakeSession
+from wowhead_scraper import response_cache as response_cache_module
+from wowhead_scraper.fetcher import Fetcher
+from wowhead_scraper.response_cache import ResponseCache
+
+
+class FakeClock:
+
+    def __init__(self):
+
+        self.now = 1000000.0
+
+    def time(self):
+
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache_module, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_the_ttl_of_their_resource(logger, workspace, clock):
+
+    response_cache = ResponseCache(logger, "classic", resource_ttls={"item": 100, "listview": 10})
+    response_cache.store("https://classic.wowhead.com/item=1", "<html>Item</html>")
+    response_cache.store("https://classic.wowhead.com/items?filter=1", "<html>Items</html>")
+
+    clock.now += 50
+    assert response_cache.get("https://classic.wowhead.com/item=1")["is_fresh"]
+    assert not response_cache.get("https://classic.wowhead.com/items?filter=1")["is_fresh"]
+    assert response_cache.get("https://classic.wowhead.com/items?filter=1")["body"] == "<html>Items</html>"
+
+    clock.now += 50
+    assert not response_cache.get("https://classic.wowhead.com/item=1")["is_fresh"]
+    assert response_cache.get("https://classic.wowhead.com/item=2") is None
+
+
+def test_stale_entries_are_revalidated_without_rewriting_their_body(logger, workspace, clock):
+
+    url = "https://classic.wowhead.com/item=1"
+    response_cache = ResponseCache(logger, "classic", resource_ttls={"item": 100})
+    fetcher = Fetcher(logger, response_cache=response_cache)
+    fetcher.session = FakeSession([FakeResponse(200, "<html>Item</html>",
+                                                {"ETag": "\"v1\"", "Last-Modified": "Sat, 17 Oct 2026 10:00:00 GMT"}),
+                                   FakeResponse(304)])
+    assert fetcher.download_page(url) == "<html>Item</html>"
+    body_path = f"{response_cache.get_entry_path(response_cache.get_key(url))}.gz"
+    os.utime(body_path, (1, 1))
+
+    # A fresh entry is served without a request
+    clock.now += 50
+    assert fetcher.download_page(url) == "<html>Item</html>"
+    assert len(fetcher.session.requests) == 1
+
+    clock.now += 100
+    assert fetcher.download_page(url) == "<html>Item</html>"
+    assert fetcher.session.requests[1][1] == {"If-None-Match": "\"v1\"",
+                                              "If-Modified-Since": "Sat, 17 Oct 2026 10:00:00 GMT"}
+    assert os.path.getmtime(body_path) == 1
+    assert response_cache.get(url)["is_fresh"]
+    assert response_cache.revalidations == 1
+
+
+def test_least_recently_used_entries_are_evicted_below_90_percent(logger, workspace, clock):
+
+    response_cache = ResponseCache(logger, "classic")
+    urls = [f"https://classic.wowhead.com/item={number}" for number in range(5)]
+    for index, url in enumerate(urls):
+
+        response_cache.store(url, f"<html>Item {index}</html>")
+        os.utime(f"{response_cache.get_entry_path(response_cache.get_key(url))}.json", (index, index))
+    entry_size = response_cache.get_size() // 5
+
+    # Reading the oldest entry makes it the most recently used one
+    response_cache.get(urls[0])
+    response_cache.maximum_size = entry_size * 5 + entry_size // 2
+    response_cache.store("https://classic.wowhead.com/item=5", "<html>Item 5</html>")
+
+    assert response_cache.get_size() <= response_cache.maximum_size * 0.9
+    assert [response_cache.get(url) is not None for url in urls] == [True, False, False, True, True]
+    assert response_cache.evictions == 2
+
+
+def test_opening_the_cache_doesnt_walk_its_entries(logger, workspace, clock):
+
+    response_cache = ResponseCache(logger, "classic")
+    response_cache.store("https://classic.wowhead.com/item=1", "<html>Item</html>")
+    size = response_cache.get_size()
+
+    def get_entries():
+
+        raise AssertionError("The cache entries were walked")
+
+    response_cache = ResponseCache(logger, "classic")
+    response_cache.get_entries = get_entries
+    assert response_cache.get("https://classic.wowhead.com/item=1")["body"] == "<html>Item</html>"
+    del response_cache.get_entries
+
+    # The size is determined once the first response is stored
+    response_cache.store("https://classic.wowhead.com/item=2", "<html>Item</html>")
+    assert response_cache.get_size() == size * 2
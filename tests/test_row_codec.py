@@ -0,0 +1,84 @@
+from csv import reader
+from wowhead_scraper.columnar_table import ColumnarTable, write_columnar_file
+from wowhead_scraper.data_validator import DataValidator
+from wowhead_scraper.entity_store import EntityStore
+from wowhead_scraper.inline_validator import InlineValidator
+from wowhead_scraper.psv_sink import PsvSink
+from wowhead_scraper.row_codec import RowCodec, encode_value
+
+table_rules = {
+    "vendor": {
+        "id": {"type": "integer", "not_null": True, "minimum": 1},
+        "name": {"type": "string", "not_null": True, "unique": True},
+        "is_limited": {"type": "boolean"},
+        "note": {"type": "string"}
+    }
+}
+
+
+def test_converted_values_read_back_from_psv_like_they_are_written():
+
+    codec = RowCodec("vendor", table_rules["vendor"])
+
+    values = codec.convert(codec.get_values({"id": "12", "name": "Zarena", "is_limited": "True", "note": ""}))
+    assert values == (12, "Zarena", True, None)
+    assert codec.decode_psv([encode_value(value) for value in values]) == values
+
+    # Values that already have their type are kept, databases give booleans as numbers
+    assert codec.convert((12, "", False, "Tanaris")) == (12, "", False, "Tanaris")
+    assert codec.read_sql((12, "Zarena", 1, None)) == (12, "Zarena", True, None)
+
+
+def test_values_that_cant_be_converted_are_kept():
+
+    codec = RowCodec("vendor", table_rules["vendor"])
+
+    assert codec.convert(("12a", "Zarena", "yes", None)) == ("12a", "Zarena", "yes", None)
+    assert codec.decode_psv(["12a", "Zarena", "yes", ""]) == ("12a", "Zarena", "yes", None)
+
+
+def test_bad_values_are_stored_without_inline_validation(logger):
+
+    entity_store = EntityStore(logger, table_rules)
+
+    entity_store.write("vendor", [{"id": "12a", "name": "Zarena"}])
+    entity_store.flush()
+    entity_store.clear()
+
+    assert entity_store.read("vendor")[0].to_tuple() == ("12a", "Zarena", None, None)
+
+
+def test_bad_values_are_quarantined_with_inline_validation(logger):
+
+    data_validator = DataValidator(logger, table_rules)
+    inline_validator = InlineValidator(logger, data_validator, quarantine_mode="drop")
+    entity_store = EntityStore(logger, table_rules, inline_validator=inline_validator)
+
+    with entity_store.open_sink("vendor") as sink:
+        sink.write_rows([{"id": "12a", "name": "Zarena"}, {"id": 13, "name": "Jabbey"}])
+        sink.write_rows([{"id": "14", "name": "Jabbey"}])
+
+    assert [record.to_tuple() for record in entity_store.read("vendor")] == [(13, "Jabbey", None, None)]
+    assert [row["reasons"] for row in inline_validator.quarantined_rows["vendor"]] == [
+        "id: The value \"12a\" is not an integer", "name: The value \"Jabbey\" is not unique"]
+
+
+def test_converted_rows_round_trip_through_psv_and_columnar_files(workspace):
+
+    # The columnar format is the binary serialization of converted rows, values that couldn't be converted included
+    codec = RowCodec("vendor", table_rules["vendor"])
+    rows = [codec.convert(codec.get_values(row)) for row in (
+        {"id": "12", "name": "Zarena", "is_limited": "True", "note": ""},
+        {"id": 13, "name": "", "is_limited": False, "note": "Ëlyssa''s"},
+        {"id": "14a", "name": "Jabbey", "is_limited": None, "note": None}
+    )]
+    with PsvSink("vendor.psv", codec.field_names) as sink:
+        sink.write_rows([dict(zip(codec.field_names, row)) for row in rows])
+    write_columnar_file("vendor.col", codec, [dict(zip(codec.field_names, row)) for row in rows], "vendor.psv")
+
+    with open("vendor.psv", newline="") as file:
+        assert [codec.decode_psv(row) for row in list(reader(file, delimiter="|"))[1:]] == rows
+    with ColumnarTable("vendor.col") as table:
+        assert table.columns["id"]["encoding"] == "text"
+        assert table.columns["is_limited"]["encoding"] == "plain"
+        assert table.read_rows() == rows
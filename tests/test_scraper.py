@@ -0,0 +1,61 @@
+import time
+
+from json import loads
+from wowhead_scraper.scraper import WowheadScraper
+
+# Entities are keyed by strings, like the ids of the real stages
+locations = {
+    "1": {"id": 1, "name": "Tanaris"},
+    "2": {"id": 2, "name": "Feralas"}
+}
+
+
+def create_scraper(fetched_keys: list):
+
+    # A stage that gets the detail pages of the locations of its listview and writes their table
+    wowhead_scraper = WowheadScraper("classic", use_cache=False, delta=True, inline_validation=False)
+
+    def scrape_locations():
+
+        start_time = time.time()
+
+        def scrape_details(keys: list):
+
+            fetched_keys.extend(keys)
+            return [{"name": locations[key]["name"], "wowhead_id": int(key)} for key in keys]
+
+        details = wowhead_scraper.scrape_checkpointed_entities("locations", "locations", sorted(locations),
+                                                               scrape_details, locations)
+        wowhead_scraper.entity_store.write("location", details)
+        wowhead_scraper.entity_store.flush()
+
+        return {
+            "start_time": start_time,
+            "end_time": time.time()
+        }
+
+    wowhead_scraper.stages["locations"]["function"] = scrape_locations
+
+    return wowhead_scraper
+
+
+def test_a_single_stage_delta_run_saves_the_snapshot_for_the_next_run(workspace):
+
+    fetched_keys = []
+    wowhead_scraper = create_scraper(fetched_keys)
+    wowhead_scraper.scrape_stage("locations")
+    wowhead_scraper.close()
+    with open("data/changeset.json") as file:
+        assert loads(file.read())["tables"]["location"]["added"] == 2
+
+    # The next run diffs against the snapshot of the previous run, so nothing changed
+    wowhead_scraper = create_scraper(fetched_keys)
+    wowhead_scraper.scrape_stage("locations")
+    wowhead_scraper.close()
+    with open("data/changeset.json") as file:
+        changeset = loads(file.read())
+
+    assert fetched_keys == ["1", "2"]
+    assert changeset["entities"]["locations"] == {"new": 0, "changed": 0, "unchanged": 2}
+    assert {change_type: changeset["tables"]["location"][change_type]
+            for change_type in ("added", "changed", "removed")} == {"added": 0, "changed": 0, "removed": 0}
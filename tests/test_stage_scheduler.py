@@ -0,0 +1,152 @@
+import logging
+import pytest
+import time
+
+from threading import Lock
+from wowhead_scraper.stage_scheduler import StageScheduler
+
+
+def create_stage(inputs: tuple, outputs: tuple):
+
+    return {
+        "inputs": inputs,
+        "outputs": outputs
+    }
+
+
+# The tables the stages of the scraper read and write
+stages = {
+    "professions": create_stage((), ("profession", "specialisation")),
+    "locations": create_stage((), ("location",)),
+    "vendors": create_stage(("location",), ("vendor", "location_vendor")),
+    "reagents": create_stage((), ("reagent", "reagent_source", "reagent_vendor")),
+    "craftable_items": create_stage(("profession",), ("craftable_item",)),
+    "profession_data": create_stage(("profession", "location", "craftable_item", "reagent"),
+                                    ("trainer", "recipe", "reagent")),
+    "specialisation_recipes": create_stage(("specialisation",), ("recipe_specialisation",))
+}
+
+
+class StageRecorder:
+
+    # Runs stages for a moment and records when they start and end
+    def __init__(self, failing_stage_names: tuple = ()):
+
+        self.failing_stage_names = failing_stage_names
+        self.events = []
+        self.running_stages = 0
+        self.maximum_running_stages = 0
+        self.lock = Lock()
+
+    def run_stage(self, stage_name: str):
+
+        with self.lock:
+            self.events.append(("start", stage_name))
+            self.running_stages += 1
+            self.maximum_running_stages = max(self.maximum_running_stages, self.running_stages)
+        time.sleep(0.01)
+        with self.lock:
+            self.events.append(("end", stage_name))
+            self.running_stages -= 1
+        if stage_name in self.failing_stage_names:
+            raise RuntimeError(f"Stage {stage_name} failed")
+
+        return stage_name
+
+    def get_started_stage_names(self):
+
+        return [stage_name for event, stage_name in self.events if event == "start"]
+
+
+def test_stages_wait_for_the_stages_whose_tables_they_use(logger):
+
+    stage_scheduler = StageScheduler(logger, stages, maximum_parallel_stages=3)
+    recorder = StageRecorder()
+
+    timings = stage_scheduler.run(recorder.run_stage)
+
+    assert stage_scheduler.dependencies == {
+        "professions": [],
+        "locations": [],
+        "vendors": ["locations"],
+        "reagents": [],
+        "craftable_items": ["professions"],
+        "profession_data": ["professions", "locations", "reagents", "craftable_items"],
+        "specialisation_recipes": ["professions"]
+    }
+    for stage_name, dependencies in stage_scheduler.dependencies.items():
+        for dependency in dependencies:
+            assert recorder.events.index(("end", dependency)) < recorder.events.index(("start", stage_name))
+    assert {stage_name: timing["results"] for stage_name, timing in timings.items()} == {
+        stage_name: stage_name for stage_name in stages}
+    assert recorder.maximum_running_stages <= 3
+
+
+def test_a_failed_stage_keeps_its_dependent_stages_from_starting(logger):
+
+    stage_scheduler = StageScheduler(logger, stages, maximum_parallel_stages=4)
+    recorder = StageRecorder(failing_stage_names=("locations",))
+
+    with pytest.raises(RuntimeError, match="Stage locations failed"):
+        stage_scheduler.run(recorder.run_stage)
+
+    # The stages that were running when it failed are finished, the vendors and profession data never start
+    started_stage_names = recorder.get_started_stage_names()
+    assert "vendors" not in started_stage_names
+    assert "profession_data" not in started_stage_names
+    assert all([("end", stage_name) in recorder.events for stage_name in started_stage_names])
+
+
+def test_no_stage_starts_after_a_failure(logger):
+
+    stage_scheduler = StageScheduler(logger, stages, maximum_parallel_stages=1)
+    recorder = StageRecorder(failing_stage_names=("professions",))
+
+    with pytest.raises(RuntimeError):
+        stage_scheduler.run(recorder.run_stage)
+
+    assert recorder.get_started_stage_names() == ["professions"]
+
+
+def test_the_critical_path_is_the_longest_chain_of_dependent_stages(logger, caplog):
+
+    stage_scheduler = StageScheduler(logger, stages)
+    timings = {stage_name: {"start_time": start_time, "end_time": end_time} for stage_name, start_time, end_time in (
+        ("professions", 0, 2),
+        ("locations", 0, 5),
+        ("vendors", 5, 11),
+        ("reagents", 0, 1),
+        ("craftable_items", 2, 4),
+        ("profession_data", 5, 8),
+        ("specialisation_recipes", 2, 3)
+    )}
+
+    assert stage_scheduler.get_critical_path(timings) == {
+        "stages": ("locations", "vendors"),
+        "duration": 11
+    }
+
+    # The report names every stage of the path with how long it took
+    with caplog.at_level(logging.INFO):
+        stage_scheduler.log_critical_path(timings)
+    assert "Critical path: locations (5s) -> vendors (6s)." in caplog.messages
+    assert "The critical path took 11s of 11s, the stages took 20s together." in caplog.messages
+
+
+def test_the_critical_path_follows_the_longest_dependency(logger):
+
+    stage_scheduler = StageScheduler(logger, stages)
+    timings = {stage_name: {"start_time": start_time, "end_time": end_time} for stage_name, start_time, end_time in (
+        ("professions", 0, 2),
+        ("locations", 0, 1),
+        ("vendors", 1, 2),
+        ("reagents", 0, 3),
+        ("craftable_items", 2, 6),
+        ("profession_data", 6, 9),
+        ("specialisation_recipes", 2, 3)
+    )}
+
+    assert stage_scheduler.get_critical_path(timings) == {
+        "stages": ("professions", "craftable_items", "profession_data"),
+        "duration": 9
+    }
@@ -1,8 +1,10 @@
 import time
 
-from flask import Flask, Response
+from flask import Flask, Response, request
 from flask_restx import Api, Resource
 from json import dumps
+from wowhead_scraper.exceptions import InvalidArgumentException
+from wowhead_scraper.inline_validator import quarantine_modes
 from wowhead_scraper.scraper import WowheadScraper
 from wowhead_scraper.sql_connector import SQLConnector
 from wowhead_scraper.time import convert_timedelta_to_dictionary, get_timedelta_from_time_periods
@@ -30,6 +32,71 @@ site_versions = ("classic",
                  "live",
                  "ptr",
                  "public test realm")
+archive_modes = ("record",
+                 "replay")
+
+
+def create_scraper(site_version: str):
+
+    # Optionally record the fetched pages or replay them from an archive
+    archive_mode = request.args.get("archive", None)
+    archive_path = request.args.get("archive-path", None)
+
+    # Optionally resume from the checkpoints of an earlier run that didn't finish
+    resume = request.args.get("resume", "false").lower() in ("true", "1", "yes")
+
+    # Optionally only fetch the detail pages of entities that changed since the previous snapshot
+    delta = request.args.get("delta", "false").lower() in ("true", "1", "yes")
+
+    # Rows that break the validation rules are written to quarantine files, optionally they are dropped as well
+    # With an error budget, a stage fails when it has more of them than the budget
+    quarantine_mode = request.args.get("quarantine", "report")
+    if quarantine_mode not in quarantine_modes:
+        raise InvalidArgumentException(f"The argument quarantine must be one of: {', '.join(quarantine_modes)}.")
+    error_budget = get_integer_argument("error-budget", None, minimum=0)
+
+    # Optionally write every table to a typed columnar file as well, which is read instead of the psv file
+    columnar = request.args.get("columnar", "false").lower() in ("true", "1", "yes")
+
+    return WowheadScraper(site_version,
+                          archive_mode=archive_mode,
+                          archive_path=archive_path,
+                          resume=resume,
+                          delta=delta,
+                          error_budget=error_budget,
+                          quarantine_mode=quarantine_mode,
+                          columnar=columnar)
+
+
+def get_integer_argument(name: str, default: int = None, minimum: int = None):
+
+    # Arguments that aren't whole numbers are answered with a bad request instead of a server error
+    value = request.args.get(name, None)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise InvalidArgumentException(f"The argument {name} must be a whole number.")
+    if minimum is not None and value < minimum:
+        raise InvalidArgumentException(f"The argument {name} can't be lower than {minimum}.")
+
+    return value
+
+
+def has_valid_archive_mode():
+
+    archive_mode = request.args.get("archive", None)
+
+    return archive_mode is None or archive_mode in archive_modes
+
+
+def invalid_archive_mode_response():
+
+    response = Response(response="Invalid archive mode. See the <a href=\"/\">documentation</a> for details.",
+                        status=404,
+                        mimetype="text/html")
+    return response
 
 
 # TODO Add scraper documentation here
@@ -43,10 +110,15 @@ def documentation():
 def get(resource: str, site_version: str):
 
     if site_version in site_versions:
-        wowhead_scraper = WowheadScraper(site_version)
+        if not has_valid_archive_mode():
+            return invalid_archive_mode_response()
         resource = resource.replace("-", "_")
         if resource in resources:
-            result = getattr(wowhead_scraper, f"get_{resource}")()
+            wowhead_scraper = create_scraper(site_version)
+            try:
+                result = getattr(wowhead_scraper, f"get_{resource}")()
+            finally:
+                wowhead_scraper.close()
 
             return Response(response=dumps(result),
                             status=200,
@@ -64,11 +136,47 @@ def get(resource: str, site_version: str):
         return response
 
 
+@app.route("/data/<table>/<site_version>")
+def read_data(table: str, site_version: str):
+
+    if site_version in site_versions:
+        # Optionally only read some columns and a range of rows
+        field_names = request.args.get("columns", None)
+        field_names = field_names.split(",") if field_names is not None else None
+        start = get_integer_argument("offset", 0, minimum=0)
+        limit = get_integer_argument("limit", None, minimum=0)
+        end = start + limit if limit is not None else None
+
+        wowhead_scraper = WowheadScraper(site_version)
+        try:
+            rows = wowhead_scraper.read_table(table.replace("-", "_"), field_names, start, end)
+        except (FileNotFoundError, KeyError):
+            response = Response(response="Invalid table or column. See the <a href=\"/\">documentation</a> for details.",
+                                status=404,
+                                mimetype="text/html")
+            return response
+        finally:
+            wowhead_scraper.close()
+
+        return Response(response=dumps(rows),
+                        status=200,
+                        mimetype="application/json")
+    else:
+        response = Response(response="Invalid site version. See the <a href=\"/\">documentation</a> for details.",
+                            status=404,
+                            mimetype="text/html")
+        return response
+
+
 @app.route("/clear-data/<site_version>")
 def clear_data(site_version: str):
     if site_version in site_versions:
         wowhead_scraper = WowheadScraper(site_version)
-        wowhead_scraper.clear_data()
+        keep_cache = request.args.get("keep-cache", "false").lower() in ("true", "1", "yes")
+        try:
+            wowhead_scraper.clear_data(keep_cache=keep_cache)
+        finally:
+            wowhead_scraper.close()
         response = Response(response="Data cache is cleared.",
                             status=200,
                             mimetype="text/html")
@@ -84,7 +192,10 @@ def clear_data(site_version: str):
 def prepare_data(site_version: str):
     if site_version in site_versions:
         wowhead_scraper = WowheadScraper(site_version)
-        wowhead_scraper.prepare_data_for_scraping()
+        try:
+            wowhead_scraper.prepare_data_for_scraping()
+        finally:
+            wowhead_scraper.close()
         response = Response(response="Data cache is ready for scraping.",
                             status=200,
                             mimetype="text/html")
@@ -99,8 +210,27 @@ def prepare_data(site_version: str):
 @app.route("/check-data/<site_version>")
 def check_data(site_version: str):
     if site_version in site_versions:
-        wowhead_scraper = WowheadScraper(site_version)
-        wowhead_scraper.check_data()
+        # The psv files are split into shards, which are checked in worker processes
+        validation_workers = get_integer_argument("workers", 4, minimum=1)
+        wowhead_scraper = WowheadScraper(site_version, validation_workers=validation_workers)
+        try:
+            results = wowhead_scraper.check_data()
+        finally:
+            wowhead_scraper.close()
+        report = results["report"]
+        data = {
+            "valid": report["valid"],
+            "row_count": report["row_count"],
+            "error_count": report["error_count"],
+            "missing_tables": report["missing_tables"],
+            "tables": report["tables"],
+            "check_time": round(results["end_time"] - results["start_time"], 2)
+        }
+
+        response = Response(response=dumps(data),
+                            status=200,
+                            mimetype="application/json")
+        return response
     else:
         response = Response(response="Invalid site version. See the <a href=\"/\">documentation</a> for details.",
                             status=404,
@@ -111,19 +241,24 @@ def check_data(site_version: str):
 @app.route("/scrape/<resource>/<site_version>")
 def scrape(resource: str, site_version: str):
     if site_version in site_versions:
+        if not has_valid_archive_mode():
+            return invalid_archive_mode_response()
         resource = resource.replace("-", "_")
         if resource in resources:
 
-            # Add scrape prefix
-            resource = f"scrape_{resource}"
-
             # Start timer
             start_response_time = time.time()
 
-            # Perform scraper function
+            # Perform scraper function, single resources run as a checkpointed stage that saves the snapshot
             try:
-                wowhead_scraper = WowheadScraper(site_version)
-                result = getattr(wowhead_scraper, resource)()
+                wowhead_scraper = create_scraper(site_version)
+                try:
+                    if resource == "all":
+                        result = wowhead_scraper.scrape_all()
+                    else:
+                        result = wowhead_scraper.scrape_stage(resource)
+                finally:
+                    wowhead_scraper.close()
                 scraper_delta = get_timedelta_from_time_periods(result["start_time"],
                                                                 result["end_time"])
                 scraper_time = convert_timedelta_to_dictionary(scraper_delta)
@@ -162,13 +297,88 @@ def scrape(resource: str, site_version: str):
         return response
 
 
-@app.route("/export-to-db")
-def export_to_db():
-    sql_connector = SQLConnector()
-    sql_connector.update_tables_from_psv()
+@app.route("/export-to-db/<site_version>")
+def export_to_db(site_version: str):
+
+    if site_version not in site_versions:
+        response = Response(response="Invalid site version. See the <a href=\"/\">documentation</a> for details.",
+                            status=404,
+                            mimetype="text/html")
+        return response
+
+    # Optionally let the server read the psv files with load data local infile
+    use_load_data = request.args.get("load-data", "false").lower() in ("true", "1", "yes")
+    batch_size = get_integer_argument("batch-size", 1000, minimum=1)
+
+    # Optionally load shadow tables and swap them in at once, so the live tables are never empty
+    use_shadow_tables = request.args.get("shadow", "false").lower() in ("true", "1", "yes")
+
+    # Optionally only insert, update and delete the rows that changed, so rows keep their ids
+    use_sync = request.args.get("sync", "false").lower() in ("true", "1", "yes")
+
+    # Tables that don't reference each other are loaded at the same time
+    maximum_workers = get_integer_argument("workers", 4, minimum=1)
+
+    sql_connector = SQLConnector(site_version,
+                                 batch_size=batch_size,
+                                 use_load_data=use_load_data,
+                                 maximum_workers=maximum_workers)
+    if use_sync:
+        results = sql_connector.sync_tables_from_psv()
+        data = {change_type: results[change_type] for change_type in ("inserted", "updated", "deleted", "unchanged")}
+        data["tables"] = {table_name: {report_key: table_results[report_key]
+                                       for report_key in ("inserted", "updated", "deleted", "unchanged", "level",
+                                                          "duration")}
+                          for table_name, table_results in results["tables"].items()}
+    else:
+        if use_shadow_tables:
+            results = sql_connector.swap_tables_from_psv()
+        else:
+            results = sql_connector.update_tables_from_psv()
+        data = {
+            "row_count": results["row_count"],
+            "tables": {table_name: {"row_count": table_results["row_count"],
+                                    "rows_per_second": table_results["rows_per_second"],
+                                    "level": table_results["level"],
+                                    "duration": table_results["duration"]}
+                       for table_name, table_results in results["tables"].items()}
+        }
+    data["export_time"] = round(results["end_time"] - results["start_time"], 2)
+
+    response = Response(response=dumps(data),
+                        status=200,
+                        mimetype="application/json")
+    return response
+
+
+@app.route("/export-to-db/rollback/<site_version>")
+def rollback_db(site_version: str):
+
+    if site_version not in site_versions:
+        response = Response(response="Invalid site version. See the <a href=\"/\">documentation</a> for details.",
+                            status=404,
+                            mimetype="text/html")
+        return response
+
+    # Swap the tables of the previous shadow export back in
+    sql_connector = SQLConnector(site_version)
+    results = sql_connector.rollback_tables()
+
+    response = Response(response=dumps({"tables": results["tables"]}),
+                        status=200,
+                        mimetype="application/json")
+    return response
 
 
 # Errors
+@app.errorhandler(InvalidArgumentException)
+def invalid_argument(e):
+    response = Response(response=f"{e} See the <a href=\"/\">documentation</a> for details.",
+                        status=400,
+                        mimetype="text/html")
+    return response
+
+
 @app.errorhandler(403)
 def no_permission(e):
     response = Response(response="You don't have permission to access this. If this is wrong, "
@@ -0,0 +1,160 @@
+import os
+import shutil
+import time
+
+from hashlib import sha1
+from json import dumps, loads
+from threading import RLock
+from wowhead_scraper.logger import Logger
+
+
+class CheckpointManifest:
+
+    def __init__(self, logger: Logger, domain: str, directory_path: str = "data"):
+
+        self.logger = logger
+        self.domain = domain
+        self.file_path = f"{directory_path}/manifest.json"
+        self.entity_directory_path = f"{directory_path}/checkpoints"
+
+        # Status of every stage by name, stages that run at the same time share the manifest
+        self.stages = {}
+        self.lock = RLock()
+
+        self.load()
+
+    def load(self):
+
+        if not os.path.isfile(self.file_path):
+            return
+
+        try:
+            with open(self.file_path, "r") as file:
+                manifest = loads(file.read())
+        except ValueError:
+            self.logger.warning(f"Ignoring unreadable checkpoint manifest {self.file_path}.")
+            return
+
+        # Checkpoints of another site version can't be resumed
+        if manifest.get("domain", None) != self.domain:
+            return
+
+        self.stages = manifest.get("stages", {})
+
+    def save(self):
+
+        directory_path = os.path.dirname(self.file_path)
+        if not os.path.isdir(directory_path):
+            os.makedirs(directory_path)
+
+        # Write to a temporary file first, so a crash never leaves a half written manifest behind
+        with self.lock:
+            with open(f"{self.file_path}.tmp", "w") as file:
+                file.write(dumps({
+                    "domain": self.domain,
+                    "stages": self.stages
+                }))
+            os.replace(f"{self.file_path}.tmp", self.file_path)
+
+    def has_checkpoints(self):
+
+        return len(self.stages) > 0
+
+    def is_stage_finished(self, stage_name: str, input_hash: str = None):
+
+        # A stage that finished with other inputs has to run again
+        stage = self.stages.get(stage_name, {})
+
+        return stage.get("status", None) == "finished" and stage.get("input_hash", None) == input_hash
+
+    def hash_inputs(self, file_paths: iter):
+
+        input_hash = sha1()
+        for file_path in file_paths:
+
+            input_hash.update(f"{file_path}\n".encode("utf-8"))
+            if not os.path.isfile(file_path):
+                continue
+            with open(file_path, "rb") as file:
+                for block in iter(lambda: file.read(1024 * 1024), b""):
+                    input_hash.update(block)
+
+        return input_hash.hexdigest()
+
+    def start_stage(self, stage_name: str, resume: bool = False):
+
+        # Without resuming, the entities of an earlier attempt are thrown away
+        if not resume:
+            self.remove_entities(stage_name)
+        with self.lock:
+            self.stages[stage_name] = {
+                "status": "started",
+                "started_at": time.time(),
+                "finished_at": None
+            }
+            self.save()
+
+    def finish_stage(self, stage_name: str, input_hash: str = None):
+
+        with self.lock:
+            self.stages.setdefault(stage_name, {"started_at": None})
+            self.stages[stage_name]["status"] = "finished"
+            self.stages[stage_name]["finished_at"] = time.time()
+            self.stages[stage_name]["input_hash"] = input_hash
+            self.save()
+
+    def get_entity_file_path(self, stage_name: str, entity_name: str):
+
+        return f"{self.entity_directory_path}/{stage_name}/{entity_name}.jsonl"
+
+    def get_entities(self, stage_name: str, entity_name: str, content_hashes: dict = None):
+
+        # Entities are appended one per line, a line cut off by a crash is skipped
+        # With content hashes, only the entities that were scraped for the same content are returned
+        entities = {}
+        entity_file_path = self.get_entity_file_path(stage_name, entity_name)
+        if not os.path.isfile(entity_file_path):
+            return entities
+
+        with open(entity_file_path, "r") as file:
+            for line in file:
+
+                try:
+                    entity = loads(line)
+                except ValueError:
+                    continue
+                if content_hashes is not None and entity.get("hash", None) != content_hashes.get(entity["key"], None):
+                    entities.pop(entity["key"], None)
+                    continue
+                entities[entity["key"]] = entity["value"]
+
+        return entities
+
+    def record_entities(self, stage_name: str, entity_name: str, entities: dict, content_hashes: dict = None):
+
+        entity_file_path = self.get_entity_file_path(stage_name, entity_name)
+        if not os.path.isdir(os.path.dirname(entity_file_path)):
+            os.makedirs(os.path.dirname(entity_file_path))
+
+        # A line cut off by a crash is ended first, so the entities start on a line of their own
+        separator = ""
+        if os.path.isfile(entity_file_path) and os.path.getsize(entity_file_path) > 0:
+            with open(entity_file_path, "rb") as file:
+                file.seek(-1, os.SEEK_END)
+                separator = "" if file.read(1) == b"\n" else "\n"
+
+        with open(entity_file_path, "a") as file:
+            file.write(separator + "".join([
+                f"{dumps({'key': key, 'hash': (content_hashes or {}).get(key, None), 'value': value})}\n"
+                for key, value in entities.items()]))
+
+    def remove_entities(self, stage_name: str):
+
+        shutil.rmtree(f"{self.entity_directory_path}/{stage_name}", ignore_errors=True)
+
+    def reset(self):
+
+        self.stages = {}
+        shutil.rmtree(self.entity_directory_path, ignore_errors=True)
+        if os.path.isfile(self.file_path):
+            os.remove(self.file_path)
@@ -0,0 +1,290 @@
+import hashlib
+import mmap
+import os
+import sys
+
+from array import array
+from json import dumps, loads
+from wowhead_scraper.row_codec import RowCodec, decode_value, encode_value, type_decoders
+
+# A columnar file starts with the magic bytes and the length of its json header, the column blocks follow the header
+magic = b"WCOL"
+version = 2
+alignment = 8
+
+
+def get_columnar_file_path(psv_file_path: str):
+
+    return f"{psv_file_path[0:-4] if psv_file_path.endswith('.psv') else psv_file_path}.col"
+
+
+def get_psv_file_hash(psv_file_path: str):
+
+    file_hash = hashlib.sha256()
+    with open(psv_file_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
+
+def read_header(file):
+
+    # The json header of a columnar file, or None when the file isn't a columnar file
+    if file.read(len(magic)) != magic:
+        return None
+    header_length = int.from_bytes(file.read(4), "little")
+
+    return loads(file.read(header_length).decode("utf-8"))
+
+
+def find_columnar_file(psv_file_path: str):
+
+    # The columnar file is only used when it was written from the current psv file,
+    # it has the size and hash of that psv file, which change when the psv file is written or edited
+    columnar_file_path = get_columnar_file_path(psv_file_path)
+    if not os.path.isfile(columnar_file_path):
+        return None
+    if not os.path.isfile(psv_file_path):
+        return columnar_file_path
+
+    with open(columnar_file_path, "rb") as file:
+        header = read_header(file)
+    if header is None or header["version"] != version or header["psv_size"] != os.path.getsize(psv_file_path):
+        return None
+    if header["psv_hash"] != get_psv_file_hash(psv_file_path):
+        return None
+
+    return columnar_file_path
+
+
+def create_null_bitmap(values: tuple):
+
+    null_bitmap = bytearray((len(values) + 7) // 8)
+    for index, value in enumerate(values):
+        if value is None:
+            null_bitmap[index // 8] |= 1 << (index % 8)
+
+    return bytes(null_bitmap)
+
+
+def encode_strings(values: iter):
+
+    # Byte offsets of every string in one utf-8 blob, the last offset is the end of the blob
+    encoded_values = [value.encode("utf-8") if value is not None else b"" for value in values]
+    offsets = array("I", [0])
+    for encoded_value in encoded_values:
+        offsets.append(offsets[-1] + len(encoded_value))
+
+    return offsets.tobytes(), b"".join(encoded_values)
+
+
+def write_columnar_file(file_path: str, codec: RowCodec, rows: iter, psv_file_path: str = None):
+
+    # Every column is stored as one block of typed values, with a null bitmap
+    # The size and hash of the psv file the rows were written to tell whether the columnar file is still current
+    # Strings that repeat, like the names of professions and locations, are stored once in a dictionary
+    rows = [codec.get_values(row) for row in rows]
+    column_values_list = list(zip(*rows)) if len(rows) > 0 else [() for field_name in codec.field_names]
+    blocks = []
+    block_offset = 0
+
+    def add_block(data: bytes):
+
+        nonlocal block_offset
+        blocks.append(data)
+        blocks.append(b"\x00" * (-len(data) % alignment))
+        location = [block_offset, len(data)]
+        block_offset += len(data) + (-len(data) % alignment)
+        return location
+
+    columns = []
+    for field_name, field_type, native_type, column_values in zip(codec.field_names, codec.field_types,
+                                                                  codec.native_types, column_values_list):
+
+        column = {
+            "name": field_name,
+            "type": field_type,
+            "encoding": "plain",
+            "null_count": sum([1 for value in column_values if value is None]),
+            "nulls": add_block(create_null_bitmap(column_values))
+        }
+        # Values that couldn't be converted into the type of their column are kept, the column is stored as text
+        if field_type in ("integer", "boolean") and \
+                any([value is not None and type(value) is not native_type for value in column_values]):
+            offsets, strings = encode_strings([encode_value(value) for value in column_values])
+            column["encoding"] = "text"
+            column["offsets"] = add_block(offsets)
+            column["values"] = add_block(strings)
+        elif field_type == "integer":
+            column["values"] = add_block(array("q", [value if value is not None else 0
+                                                     for value in column_values]).tobytes())
+        elif field_type == "boolean":
+            column["values"] = add_block(bytes([1 if value else 0 for value in column_values]))
+        else:
+            distinct_values = list(dict.fromkeys([value for value in column_values if value is not None]))
+            if 0 < len(distinct_values) * 2 <= len(column_values):
+                codes = {value: code for code, value in enumerate(distinct_values)}
+                dictionary_offsets, dictionary = encode_strings(distinct_values)
+                column["encoding"] = "dictionary"
+                column["values"] = add_block(array("I", [codes[value] if value is not None else 0
+                                                         for value in column_values]).tobytes())
+                column["dictionary_offsets"] = add_block(dictionary_offsets)
+                column["dictionary"] = add_block(dictionary)
+            else:
+                offsets, strings = encode_strings(column_values)
+                column["offsets"] = add_block(offsets)
+                column["values"] = add_block(strings)
+        columns.append(column)
+
+    header = dumps({
+        "version": version,
+        "table": codec.table_name,
+        "row_count": len(rows),
+        "byteorder": sys.byteorder,
+        "psv_size": os.path.getsize(psv_file_path) if psv_file_path is not None else None,
+        "psv_hash": get_psv_file_hash(psv_file_path) if psv_file_path is not None else None,
+        "columns": columns
+    }).encode("utf-8")
+    header += b" " * (-(len(magic) + 4 + len(header)) % alignment)
+
+    # Write a temporary file first, so readers never see a half written file
+    temporary_file_path = f"{file_path}.tmp"
+    with open(temporary_file_path, "wb") as file:
+        file.write(magic)
+        file.write(len(header).to_bytes(4, "little"))
+        file.write(header)
+        for block in blocks:
+            file.write(block)
+    os.replace(temporary_file_path, file_path)
+
+
+class ColumnarTable:
+
+    def __init__(self, file_path: str):
+
+        # The file is memory mapped, only the header is parsed, columns are decoded when they are read
+        self.file_path = file_path
+        self.file = open(file_path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = read_header(self.file)
+        if header is None:
+            self.close()
+            raise ValueError(f"{file_path} isn't a columnar file")
+        if header["version"] != version or header["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{file_path} was written in version {header['version']} with {header['byteorder']} "
+                             f"byte order, it can't be read here")
+
+        self.blocks_offset = self.file.tell()
+        self.table_name = header["table"]
+        self.row_count = header["row_count"]
+        self.columns = {column["name"]: column for column in header["columns"]}
+        self.field_names = tuple(self.columns.keys())
+
+        # Dictionaries are decoded once per opened table, every chunk of rows shares them
+        self.dictionaries = {}
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+
+        self.close()
+
+    def __len__(self):
+
+        return self.row_count
+
+    def get_block(self, column: dict, block_name: str):
+
+        offset, length = column[block_name]
+        return self.data[self.blocks_offset + offset:self.blocks_offset + offset + length]
+
+    def get_array(self, column: dict, block_name: str, type_code: str, start: int, end: int):
+
+        # Only the bytes of the rows in the range are copied out of the mapped file
+        offset = self.blocks_offset + column[block_name][0]
+        values = array(type_code)
+        values.frombytes(self.data[offset + start * values.itemsize:offset + end * values.itemsize])
+
+        return values
+
+    def decode_strings(self, column: dict, offsets_name: str, strings_name: str, start: int, end: int):
+
+        offsets = self.get_array(column, offsets_name, "I", start, end + 1)
+        if len(offsets) == 0:
+            return []
+        strings_offset = self.blocks_offset + column[strings_name][0]
+        strings = self.data[strings_offset + offsets[0]:strings_offset + offsets[-1]]
+
+        # Byte offsets are character offsets when every character is ascii, so the strings are decoded at once
+        text = strings.decode("utf-8")
+        if len(text) == len(strings):
+            return [text[offsets[index] - offsets[0]:offsets[index + 1] - offsets[0]]
+                    for index in range(len(offsets) - 1)]
+
+        return [strings[offsets[index] - offsets[0]:offsets[index + 1] - offsets[0]].decode("utf-8")
+                for index in range(len(offsets) - 1)]
+
+    def get_dictionary(self, column: dict):
+
+        if column["name"] not in self.dictionaries:
+            self.dictionaries[column["name"]] = self.decode_strings(column, "dictionary_offsets", "dictionary", 0,
+                                                                    column["dictionary_offsets"][1] // 4 - 1)
+
+        return self.dictionaries[column["name"]]
+
+    def read_column(self, field_name: str, start: int = 0, end: int = None):
+
+        # Values of one column, without reading the other columns
+        column = self.columns.get(field_name, None)
+        if column is None:
+            raise KeyError(field_name)
+        end = self.row_count if end is None else min(end, self.row_count)
+        start = min(start, end)
+
+        if column["encoding"] == "text":
+            decode = type_decoders[column["type"]]
+            values = [decode_value(decode, text)
+                      for text in self.decode_strings(column, "offsets", "values", start, end)]
+        elif column["type"] == "integer":
+            values = self.get_array(column, "values", "q", start, end).tolist()
+        elif column["type"] == "boolean":
+            values = [value == 1 for value in self.get_array(column, "values", "B", start, end)]
+        elif column["encoding"] == "dictionary":
+            dictionary = self.get_dictionary(column)
+            values = [dictionary[code] for code in self.get_array(column, "values", "I", start, end)]
+        else:
+            values = self.decode_strings(column, "offsets", "values", start, end)
+
+        if column["null_count"] > 0:
+            null_bitmap = self.get_block(column, "nulls")
+            values = [None if null_bitmap[index // 8] & (1 << (index % 8)) else value
+                      for index, value in zip(range(start, end), values)]
+
+        return values
+
+    def read_rows(self, field_names: iter = None, start: int = 0, end: int = None):
+
+        # Rows are tuples of native values, in the order of the given columns
+        field_names = self.field_names if field_names is None else tuple(field_names)
+        columns = [self.read_column(field_name, start, end) for field_name in field_names]
+        if len(columns) == 0:
+            return []
+
+        return list(zip(*columns))
+
+    def iterate_rows(self, field_names: iter = None, start: int = 0, end: int = None, chunk_size: int = 4096):
+
+        # Rows in chunks, so a large table is never decoded at once
+        end = self.row_count if end is None else min(end, self.row_count)
+        for chunk_start in range(start, end, chunk_size):
+            yield from self.read_rows(field_names, chunk_start, min(chunk_start + chunk_size, end))
+
+    def close(self):
+
+        if not self.data.closed:
+            self.data.close()
+        self.file.close()
@@ -0,0 +1,48 @@
+from queue import Queue
+from threading import Lock
+
+
+class ConnectionPool:
+
+    def __init__(self, connection_factory, size: int = 4):
+
+        # Connections are opened when they are first needed and reused after they are released
+        self.connection_factory = connection_factory
+        self.size = max(size, 1)
+        self.idle_connections = Queue()
+        self.connections = []
+        self.lock = Lock()
+
+    def acquire(self):
+
+        # Open a new connection while the pool isn't full, otherwise wait for a released one
+        with self.lock:
+            can_open = len(self.connections) < self.size and self.idle_connections.empty()
+            if can_open:
+                self.connections.append(None)
+        if not can_open:
+            return self.idle_connections.get()
+
+        try:
+            connection = self.connection_factory()
+        except Exception:
+            with self.lock:
+                self.connections.remove(None)
+            raise
+        with self.lock:
+            self.connections[self.connections.index(None)] = connection
+
+        return connection
+
+    def release(self, connection):
+
+        self.idle_connections.put(connection)
+
+    def close(self):
+
+        with self.lock:
+            for connection in self.connections:
+                if connection is not None:
+                    connection.close()
+            self.connections = []
+            self.idle_connections = Queue()
@@ -0,0 +1,431 @@
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from csv import reader
+from io import BytesIO, TextIOWrapper
+from json import loads
+from wowhead_scraper.columnar_table import ColumnarTable, find_columnar_file
+from wowhead_scraper.json_fixer import is_url_format
+from wowhead_scraper.logger import Logger
+from wowhead_scraper.row_codec import RowCodec, decode_value, encode_value
+
+
+def get_record_end(data: bytes, position: int, quote_count: int):
+
+    # A line break only ends a record when it isn't inside a quoted value, so when the number of quotes before it is even
+    line_break = data.find(b"\n", position)
+    while line_break != -1:
+        quote_count += data.count(b'"', position, line_break)
+        position = line_break
+        if quote_count % 2 == 0:
+            return line_break + 1, quote_count
+        line_break = data.find(b"\n", line_break + 1)
+
+    return len(data), quote_count + data.count(b'"', position)
+
+
+# Every worker process compiles the rules once, when it is started
+worker_validator = None
+
+
+def initialize_worker(table_rules: dict, enum_directory_path: str, maximum_reported_errors: int):
+
+    global worker_validator
+    worker_validator = DataValidator(None, table_rules, enum_directory_path, maximum_reported_errors)
+
+
+def validate_shard(table_name: str, file_path: str, header: list, start: int, end: int, report_missing_columns: bool):
+
+    # Shards of columnar files are ranges of rows, shards of psv files ranges of bytes
+    if file_path.endswith(".col"):
+        with ColumnarTable(file_path) as table:
+            return worker_validator.validate_rows(table_name,
+                                                  header,
+                                                  table.iterate_rows(start=start, end=end),
+                                                  report_missing_columns=report_missing_columns,
+                                                  collect_unique_values=True,
+                                                  decoded=True)
+
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    rows = reader(TextIOWrapper(BytesIO(data), newline=""), delimiter='|', lineterminator='\n')
+    return worker_validator.validate_rows(table_name,
+                                          header,
+                                          rows,
+                                          report_missing_columns=report_missing_columns,
+                                          collect_unique_values=True)
+
+
+class DataValidator:
+
+    # Messages of the rules, like they are logged
+    messages = {
+        "missing": "Expected value wasn't found",
+        "not_null": "Required value is not present",
+        "integer": "The value \"{value}\" is not an integer",
+        "minimum": "The value \"{value}\" is below the minimum",
+        "boolean": "The value \"{value}\" is not a boolean",
+        "url": "The value \"{value}\" is not in the url format",
+        "enum": "The value \"{value}\" is not present in {enum}",
+        "unique": "The value \"{value}\" is not unique",
+        "reference": "The value \"{value}\" only references quarantined rows"
+    }
+
+    def __init__(self,
+                 logger: Logger,
+                 table_rules: dict,
+                 enum_directory_path: str = "wowhead_scraper/json_data",
+                 maximum_reported_errors: int = 100,
+                 maximum_workers: int = 1,
+                 shard_size: int = 4 * 1024 * 1024):
+
+        # The rules are compiled once into checks per column, enums are loaded once
+        # With more than one worker the psv files are split into shards of rows, which are checked in worker processes
+        self.logger = logger
+        self.table_rules = table_rules
+        self.enum_directory_path = enum_directory_path
+        self.maximum_reported_errors = maximum_reported_errors
+        self.maximum_workers = maximum_workers
+        self.shard_size = shard_size
+        self.enums = {}
+        self.tables = {table_name: self.compile_table(RowCodec(table_name, table_rules[table_name]),
+                                                      table_rules[table_name])
+                       for table_name in table_rules}
+
+    def load_enum(self, enum_name: str):
+
+        # Enums are json files with the valid values as values
+        if enum_name not in self.enums:
+            try:
+                with open(f"{self.enum_directory_path}/{enum_name}.json", "r", newline="") as file:
+                    self.enums[enum_name] = frozenset(loads(file.read()).values())
+            except FileNotFoundError:
+                self.log_error(f"The enum type of \"{enum_name}\" can't be found in the json_data directory")
+                self.enums[enum_name] = None
+
+        return self.enums[enum_name]
+
+    def compile_table(self, codec: RowCodec, table_rules: dict):
+
+        # Values are decoded by the codec of the table, the checks get the decoded value
+        table_name = codec.table_name
+        columns = []
+        for field_name, field_rules in table_rules.items():
+
+            if field_rules is None:
+                if self.logger is not None:
+                    self.logger.warning(f"No validation rules were specified in data file: {table_name} "
+                                        f"for field {field_name}")
+                continue
+            checks = self.compile_field(field_rules)
+            columns.append({
+                "field_name": field_name,
+                "decoder": codec.decoders[codec.field_indexes[field_name]],
+                "checks": checks,
+                "rules": ("missing",) + tuple(rule for rule, check in checks) + ("unique",),
+                "unique": field_rules.get("unique", False),
+                "enum": field_rules.get("enum", None)
+            })
+
+        return columns
+
+    def compile_field(self, field_rules: dict):
+
+        # Every check returns whether a value passes, empty values only fail the not null rule
+        # A value that couldn't be decoded keeps its text, so it doesn't have the type of its column
+        checks = []
+        if field_rules.get("not_null", False):
+            checks.append(("not_null", lambda value: value is not None and value != ""))
+
+        type_rule = field_rules.get("type", None)
+        if type_rule == "integer":
+            checks.append(("integer", lambda value: value is None or type(value) is int))
+            minimum = field_rules.get("minimum", None)
+            if minimum is not None:
+                checks.append(("minimum", lambda value: type(value) is not int or value >= minimum))
+        elif type_rule == "boolean":
+            checks.append(("boolean", lambda value: value is None or type(value) is bool))
+
+        if field_rules.get("format", None) == "url":
+            checks.append(("url", lambda value: value is None or value == "" or is_url_format(encode_value(value))))
+
+        enum_name = field_rules.get("enum", None)
+        if enum_name is not None:
+            valid_values = self.load_enum(enum_name)
+            if valid_values is not None:
+                checks.append(("enum", lambda value: value is None or value == "" or
+                               encode_value(value) in valid_values))
+
+        return tuple(checks)
+
+    def validate(self, directory_path: str = "data"):
+
+        # Every table of the rules has to be there
+        file_paths = {}
+        missing_table_names = []
+        for table_name in self.tables:
+
+            # Tables are read from their columnar file when it is there and up to date
+            file_path = f"{directory_path}/{table_name}.psv"
+            columnar_file_path = find_columnar_file(file_path)
+            if columnar_file_path is None and not os.path.isfile(file_path):
+                missing_table_names.append(table_name)
+                self.log_error(f"Can't find required data file: {table_name}")
+                continue
+            file_paths[table_name] = columnar_file_path if columnar_file_path is not None else file_path
+
+        if self.maximum_workers > 1:
+            tables = self.validate_files_in_parallel(file_paths)
+        else:
+            tables = {table_name: self.validate_file(table_name, file_path)
+                      for table_name, file_path in file_paths.items()}
+        for table_name, table_report in tables.items():
+            self.log_table_errors(table_name, table_report)
+
+        error_count = sum([table["error_count"] for table in tables.values()])
+        report = {
+            "valid": error_count == 0 and len(missing_table_names) == 0,
+            "error_count": error_count,
+            "row_count": sum([table["row_count"] for table in tables.values()]),
+            "missing_tables": missing_table_names,
+            "tables": tables
+        }
+        if not report["valid"]:
+            self.log_error(f"Data validation failed with {error_count} errors "
+                           f"and {len(missing_table_names)} missing data files")
+
+        return report
+
+    def validate_file(self, table_name: str, file_path: str):
+
+        if file_path.endswith(".col"):
+            with ColumnarTable(file_path) as table:
+                return self.validate_rows(table_name, table.field_names, table.iterate_rows(), decoded=True)
+
+        with open(file_path, newline="") as file:
+            rows = reader(file, delimiter='|', lineterminator='\n')
+            return self.validate_rows(table_name, next(rows, ()), rows)
+
+    def validate_files_in_parallel(self, file_paths: dict):
+
+        # Large files are split into shards at record boundaries, every shard is checked in a worker process
+        shards = []
+        for table_name, file_path in file_paths.items():
+
+            header, ranges = self.get_shard_ranges(file_path)
+            for shard_index, (start, end) in enumerate(ranges):
+                shards.append((table_name, file_path, header, start, end, shard_index == 0))
+
+        with ProcessPoolExecutor(max_workers=self.maximum_workers,
+                                 initializer=initialize_worker,
+                                 initargs=(self.table_rules,
+                                           self.enum_directory_path,
+                                           self.maximum_reported_errors)) as executor:
+            futures = [executor.submit(validate_shard, *shard) for shard in shards]
+            shard_reports = {table_name: [] for table_name in file_paths}
+            for shard, future in zip(shards, futures):
+                shard_reports[shard[0]].append(future.result())
+
+        return {table_name: self.merge_shard_reports(table_name, table_shard_reports)
+                for table_name, table_shard_reports in shard_reports.items()}
+
+    def get_shard_ranges(self, file_path: str):
+
+        # Ranges of rows of a columnar file, which each hold about shard size bytes
+        if file_path.endswith(".col"):
+            with ColumnarTable(file_path) as table:
+                shard_row_count = max(len(table) * self.shard_size // max(os.path.getsize(file_path), 1), 1)
+                return table.field_names, [(start, min(start + shard_row_count, len(table)))
+                                           for start in range(0, max(len(table), 1), shard_row_count)]
+
+        # Ranges of bytes after the header, which each hold about shard size bytes of whole records
+        with open(file_path, "rb") as file:
+            data = file.read()
+
+        header_end, quote_count = get_record_end(data, 0, 0)
+        header = next(reader(TextIOWrapper(BytesIO(data[:header_end]), newline=""),
+                             delimiter='|',
+                             lineterminator='\n'), [])
+        ranges = []
+        start = header_end
+        while start < len(data):
+            shard_end = min(start + self.shard_size, len(data))
+            end, quote_count = get_record_end(data, shard_end, quote_count + data.count(b'"', start, shard_end))
+            ranges.append((start, end))
+            start = end
+
+        return header, ranges if len(ranges) > 0 else [(header_end, header_end)]
+
+    def merge_shard_reports(self, table_name: str, shard_reports: list):
+
+        # Row numbers of a shard start after the rows of the shards before it
+        # Values of unique columns that were first seen in an earlier shard are duplicates
+        table_report = self.create_table_report()
+        columns = {column["field_name"]: column for column in self.tables[table_name]}
+        first_rows = {field_name: {} for field_name, column in columns.items() if column["unique"]}
+        errors = []
+        row_offset = 0
+        for shard_report in shard_reports:
+
+            table_report["row_count"] += shard_report["row_count"]
+            table_report["error_count"] += shard_report["error_count"]
+            for rule, error_count in shard_report["errors_by_rule"].items():
+                table_report["errors_by_rule"][rule] = table_report["errors_by_rule"].get(rule, 0) + error_count
+            for error in shard_report["errors"]:
+                if error["row"] is not None:
+                    error["row"] += row_offset
+                errors.append(error)
+
+            for field_name, unique_values in shard_report["unique_values"].items():
+                for value, row_number in unique_values.items():
+                    if value in first_rows[field_name]:
+                        table_report["error_count"] += 1
+                        table_report["errors_by_rule"]["unique"] = table_report["errors_by_rule"].get("unique", 0) + 1
+                        errors.append(self.create_error("unique", row_number + row_offset, columns[field_name], value))
+                    else:
+                        first_rows[field_name][value] = row_number + row_offset
+
+            row_offset += shard_report["row_count"]
+
+        # Order the errors like they are found in one pass
+        column_positions = {field_name: position for position, field_name in enumerate(columns)}
+        errors.sort(key=lambda error: (error["row"] if error["row"] is not None else 0,
+                                       column_positions[error["field"]],
+                                       columns[error["field"]]["rules"].index(error["rule"])))
+        table_report["errors"] = errors[:self.maximum_reported_errors]
+
+        return table_report
+
+    def create_table_report(self):
+
+        return {
+            "row_count": 0,
+            "error_count": 0,
+            "errors_by_rule": {},
+            "errors": []
+        }
+
+    def create_error(self, rule: str, row_number, column: dict, value):
+
+        return {
+            "row": row_number,
+            "field": column["field_name"],
+            "rule": rule,
+            "value": value,
+            "message": self.messages[rule].format(value=value, enum=column["enum"])
+        }
+
+    def validate_rows(self,
+                      table_name: str,
+                      header: list,
+                      rows: iter,
+                      report_missing_columns: bool = True,
+                      collect_unique_values: bool = False,
+                      decoded: bool = False):
+
+        # Validate the rows in one pass, the row numbers start after the header
+        # Rows are psv values, or values in the types of their columns when they are decoded
+        table_report = self.create_table_report()
+        column_indexes = {field_name: index for index, field_name in enumerate(header)}
+
+        def add_error(rule: str, row_number, column: dict, value):
+
+            table_report["error_count"] += 1
+            table_report["errors_by_rule"][rule] = table_report["errors_by_rule"].get(rule, 0) + 1
+            if len(table_report["errors"]) < self.maximum_reported_errors:
+                table_report["errors"].append(self.create_error(rule, row_number, column, value))
+
+        # Columns that aren't in the header are reported once
+        # Unique columns remember the first row of every value
+        columns = []
+        unique_values = {}
+        for column in self.tables[table_name]:
+            if column["field_name"] not in column_indexes:
+                if report_missing_columns:
+                    add_error("missing", None, column, None)
+                continue
+            if column["unique"]:
+                unique_values[column["field_name"]] = {}
+            columns.append((column_indexes[column["field_name"]],
+                            column["decoder"],
+                            column["checks"],
+                            unique_values.get(column["field_name"], None),
+                            column))
+
+        for row_index, row in enumerate(rows):
+
+            table_report["row_count"] += 1
+            for column_index, decoder, checks, first_rows, column in columns:
+
+                if column_index >= len(row):
+                    add_error("missing", row_index + 1, column, None)
+                    continue
+
+                # Every psv value is decoded once, the checks share the decoded value
+                # Values of columnar files are already decoded, errors show them like they are written to psv files
+                value = row[column_index] if decoded else decode_value(decoder, row[column_index])
+                for rule, check in checks:
+                    if not check(value):
+                        add_error(rule, row_index + 1, column, encode_value(value))
+
+                if first_rows is not None and value is not None and value != "":
+                    if value in first_rows:
+                        add_error("unique", row_index + 1, column, encode_value(value))
+                    else:
+                        first_rows[value] = row_index + 1
+
+        if collect_unique_values:
+            table_report["unique_values"] = unique_values
+
+        return table_report
+
+    def get_unique_values(self, table_name: str, rows: iter = ()):
+
+        # Values of the unique columns of rows, which other rows can't have
+        return {column["field_name"]: set([row.get(column["field_name"], None) for row in rows]) - {None, ""}
+                for column in self.tables[table_name] if column["unique"]}
+
+    def check_rows(self, table_name: str, rows: iter, existing_rows: iter = (), unique_values: dict = None):
+
+        # Check rows before they are written, the values of unique columns can't be in the existing rows
+        # Rows are records of the entity store, their values are already converted by the codec of the table
+        # Returns the errors of every row, only rows without errors count for the unique columns
+        # Unique values of earlier checks can be given instead of the existing rows, they are updated in place
+        columns = self.tables[table_name]
+        if unique_values is None:
+            unique_values = self.get_unique_values(table_name, existing_rows)
+        row_errors = []
+        for row_index, row in enumerate(rows):
+
+            errors = []
+            for column in columns:
+
+                value = row.get(column["field_name"], None)
+                for rule, check in column["checks"]:
+                    if not check(value):
+                        errors.append(self.create_error(rule, row_index + 1, column, encode_value(value)))
+                if column["unique"] and value in unique_values[column["field_name"]]:
+                    errors.append(self.create_error("unique", row_index + 1, column, encode_value(value)))
+
+            if len(errors) == 0:
+                for field_name, values in unique_values.items():
+                    value = row.get(field_name, None)
+                    if value is not None and value != "":
+                        values.add(value)
+            row_errors.append(errors)
+
+        return row_errors
+
+    def log_table_errors(self, table_name: str, table_report: dict):
+
+        for error in table_report["errors"]:
+            self.log_error(f"{error['message']} in data file: {table_name} on row {error['row']} "
+                           f"for field {error['field']}")
+
+    def log_error(self, message: str):
+
+        # Worker processes don't have a logger, the errors they find are logged after the reports are merged
+        if self.logger is not None:
+            self.logger.error(message)
@@ -0,0 +1,185 @@
+import re
+
+from json import loads
+from threading import Lock
+from wowhead_scraper.exceptions import InvalidSiteVersionException
+from wowhead_scraper.row_codec import RowCodec
+
+# Types of the validation rules and the sql column types they are stored in
+sql_column_types = {
+    "integer": ("INT", "BIGINT", "MEDIUMINT", "SMALLINT"),
+    "boolean": ("TINYINT", "BOOLEAN", "BOOL"),
+    "string": ("VARCHAR", "CHAR", "TEXT", "MEDIUMTEXT", "LONGTEXT", "ENUM")
+}
+
+
+class DatabaseSchema:
+
+    def __init__(self,
+                 domain: str,
+                 validation_rules_path: str = "wowhead_scraper/json_data/validation_rules.json",
+                 setup_script_path: str = "wowhead_scraper/sql_scripts/setup.sql"):
+
+        # Columns and their types come from the validation rules, foreign keys from the setup script
+        # The row codecs convert the columns of every table, their types have to match the columns of the setup script
+        # Tables depend on the tables their columns reference in the validation rules and on their foreign keys,
+        # most psv tables aren't in the setup script, like location_vendor which is vendor_location there
+        self.domain = domain
+        self.table_rules = self.read_table_rules(validation_rules_path)
+        self.foreign_keys = self.read_foreign_keys(setup_script_path)
+        self.references = self.read_references()
+        self.row_codecs = {table_name: RowCodec(table_name, table_rules)
+                           for table_name, table_rules in self.table_rules.items()}
+        self.check_column_types(self.read_column_types(setup_script_path))
+
+    def read_table_rules(self, file_path: str):
+
+        with open(file_path, "r", newline="") as file:
+            validation_rules = loads(file.read())
+
+        table_rules = validation_rules.get(self.domain, None)
+        if table_rules is None:
+            raise InvalidSiteVersionException
+
+        return table_rules
+
+    def read_foreign_keys(self, file_path: str):
+
+        # Tables referenced by every table of the setup script
+        with open(file_path, "r") as file:
+            script = file.read()
+
+        foreign_keys = {}
+        for match in re.finditer(r"CREATE TABLE (?:IF NOT EXISTS )?(?:`\w+`\.)?`(\w+)`(.*?)ENGINE", script, re.DOTALL):
+
+            referenced_table_names = re.findall(r"REFERENCES (?:`\w+`\.)?`(\w+)`", match.group(2))
+            foreign_keys[match.group(1)] = tuple(sorted(set(referenced_table_names) - {match.group(1)}))
+
+        return foreign_keys
+
+    def read_references(self):
+
+        # Tables referenced by the columns of every table of the validation rules, like "references": "vendor.name"
+        references = {}
+        for table_name, table_rules in self.table_rules.items():
+
+            referenced_table_names = set()
+            for field_name, field_rules in table_rules.items():
+
+                reference = field_rules.get("references", None)
+                if reference is None:
+                    continue
+                referenced_table_name, _, referenced_field_name = reference.partition(".")
+                if referenced_field_name not in self.table_rules.get(referenced_table_name, {}):
+                    raise ValueError(f"{table_name}.{field_name} references {reference}, "
+                                     f"which isn't a column of the validation rules")
+                referenced_table_names.add(referenced_table_name)
+            references[table_name] = tuple(sorted(referenced_table_names - {table_name}))
+
+        return references
+
+    def get_referenced_table_names(self, table_name: str):
+
+        return tuple(sorted(set(self.references.get(table_name, ())) | set(self.foreign_keys.get(table_name, ()))))
+
+    def read_column_types(self, file_path: str):
+
+        # Sql types of the columns of every table of the setup script
+        with open(file_path, "r") as file:
+            script = file.read()
+
+        column_types = {}
+        for match in re.finditer(r"CREATE TABLE (?:IF NOT EXISTS )?(?:`\w+`\.)?`(\w+)`(.*?)ENGINE", script, re.DOTALL):
+            column_types[match.group(1)] = dict(re.findall(r"^\s*`(\w+)` (\w+)", match.group(2), re.MULTILINE))
+
+        return column_types
+
+    def check_column_types(self, column_types: dict):
+
+        # Columns that are in the validation rules and in the setup script need the same type
+        # Tables and columns the setup script doesn't have are remembered, so the loader can report them
+        mismatches = []
+        self.missing_table_names = []
+        self.missing_columns = {}
+        for table_name, codec in self.row_codecs.items():
+
+            if table_name not in column_types:
+                self.missing_table_names.append(table_name)
+                continue
+            for field_name, field_type in zip(codec.field_names, codec.field_types):
+
+                sql_type = column_types[table_name].get(field_name, None)
+                if sql_type is None:
+                    self.missing_columns.setdefault(table_name, []).append(field_name)
+                elif sql_type.upper() not in sql_column_types.get(field_type, ()):
+                    mismatches.append(f"{table_name}.{field_name} is {field_type} but {sql_type} in the setup script")
+
+        if len(mismatches) > 0:
+            raise ValueError(f"The validation rules don't match the setup script: {'; '.join(mismatches)}")
+
+    def get_schema_gaps(self, table_name: str):
+
+        # Why the setup script can't hold the rows of a table of the validation rules
+        if table_name in self.missing_table_names:
+            return f"The setup script has no table {table_name}"
+        if table_name in self.missing_columns:
+            return f"The setup script has no columns {', '.join(self.missing_columns[table_name])} in {table_name}"
+
+        return None
+
+    def get_row_codec(self, table_name: str):
+
+        # Every connector of the domain shares the codecs of the schema
+        self.get_table_rules(table_name)
+
+        return self.row_codecs[table_name]
+
+    def get_table_rules(self, table_name: str):
+
+        table_rules = self.table_rules.get(table_name, None)
+        if table_rules is None:
+            raise FileNotFoundError
+
+        return table_rules
+
+    def get_dependency_levels(self, table_names: iter):
+
+        # Tables only depend on the given tables they reference, tables of one level don't depend on each other
+        # A table without validation rules has unknown dependencies, so it can't be given a level
+        table_names = tuple(table_names)
+        unknown_table_names = [table_name for table_name in table_names if table_name not in self.table_rules]
+        if len(unknown_table_names) > 0:
+            raise ValueError(f"There are no validation rules for the tables: {', '.join(unknown_table_names)}")
+        levels = {}
+
+        def get_level(table_name: str, visited_table_names: tuple):
+
+            if table_name not in levels:
+                referenced_table_names = [referenced_table_name
+                                          for referenced_table_name in self.get_referenced_table_names(table_name)
+                                          if referenced_table_name in table_names and
+                                          referenced_table_name not in visited_table_names]
+                levels[table_name] = max([get_level(referenced_table_name, visited_table_names + (table_name,)) + 1
+                                          for referenced_table_name in referenced_table_names], default=0)
+
+            return levels[table_name]
+
+        for table_name in table_names:
+            get_level(table_name, ())
+
+        return [[table_name for table_name in table_names if levels[table_name] == level]
+                for level in range(max(levels.values(), default=-1) + 1)]
+
+
+# Every connector of a domain shares one schema, it is only read once
+schemas = {}
+schemas_lock = Lock()
+
+
+def get_database_schema(domain: str):
+
+    with schemas_lock:
+        if domain not in schemas:
+            schemas[domain] = DatabaseSchema(domain)
+
+        return schemas[domain]
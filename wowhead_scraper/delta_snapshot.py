@@ -0,0 +1,223 @@
+import os
+import time
+
+from hashlib import sha1
+from json import dumps, loads
+from threading import Lock
+from wowhead_scraper.logger import Logger
+
+
+def hash_content(content):
+
+    # Listview payloads are dicts, so sort the keys to get the same hash for the same content
+    return sha1(dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class DeltaSnapshot:
+
+    def __init__(self,
+                 logger: Logger,
+                 domain: str,
+                 file_path: str = "data/snapshot.json",
+                 changeset_file_path: str = "data/changeset.json"):
+
+        self.logger = logger
+        self.domain = domain
+        self.file_path = file_path
+        self.changeset_file_path = changeset_file_path
+
+        # Entities and table rows of the previous run, and of this run, by name
+        self.previous_created_at = None
+        self.previous_entities = {}
+        self.previous_tables = {}
+        self.entities = {}
+        self.tables = {}
+        self.entity_statistics = {}
+
+        # Stages that run at the same time share the snapshot
+        self.lock = Lock()
+
+        self.load()
+
+    def load(self):
+
+        if not os.path.isfile(self.file_path):
+            return
+
+        try:
+            with open(self.file_path, "r") as file:
+                snapshot = loads(file.read())
+        except ValueError:
+            self.logger.warning(f"Ignoring unreadable snapshot {self.file_path}.")
+            return
+
+        # Entities differ between site versions
+        if snapshot.get("domain", None) != self.domain:
+            return
+
+        self.previous_created_at = snapshot.get("created_at", None)
+        self.previous_entities = snapshot.get("entities", {})
+        self.previous_tables = snapshot.get("tables", {})
+
+    def has_previous(self):
+
+        return self.previous_created_at is not None
+
+    def get_unchanged_entities(self, entity_name: str, content_hashes: dict):
+
+        # Entities whose listview content didn't change since the previous run don't need their detail page again
+        previous_entities = self.previous_entities.get(entity_name, {})
+        unchanged_entities = {}
+        for key, content_hash in content_hashes.items():
+
+            previous_entity = previous_entities.get(key, None)
+            if previous_entity is not None and previous_entity["hash"] == content_hash:
+                unchanged_entities[key] = previous_entity["value"]
+
+        return unchanged_entities
+
+    def record_entities(self, entity_name: str, entities: dict, content_hashes: dict):
+
+        previous_entities = self.previous_entities.get(entity_name, {})
+        statistics = {
+            "new": 0,
+            "changed": 0,
+            "unchanged": 0
+        }
+        for key, content_hash in content_hashes.items():
+
+            if key not in previous_entities:
+                statistics["new"] += 1
+            elif previous_entities[key]["hash"] != content_hash:
+                statistics["changed"] += 1
+            else:
+                statistics["unchanged"] += 1
+
+        with self.lock:
+            self.entities[entity_name] = {key: {"hash": content_hashes[key], "value": entities[key]}
+                                          for key in content_hashes}
+            self.entity_statistics[entity_name] = statistics
+
+    def get_row_key(self, values: dict):
+
+        # Rows are compared by name, rows without a name are compared by their content
+        return str(values["name"]) if "name" in values else hash_content(values)
+
+    def record_tables(self, tables: dict):
+
+        for table_name, rows in tables.items():
+
+            # Compare the values like they are written to the psv files, so tables read back from them hash the same
+            values_list = [{field_name: "" if row[field_name] is None else str(row[field_name])
+                            for field_name in row.keys()} for row in rows]
+
+            # Rows with the same name are compared together
+            row_hashes = {}
+            for values in values_list:
+                row_hashes.setdefault(self.get_row_key(values), []).append(hash_content(values))
+            with self.lock:
+                self.tables[table_name] = {
+                    "hashes": {key: hash_content(sorted(hashes)) for key, hashes in row_hashes.items()},
+                    "rows": values_list
+                }
+
+    def get_table_changes(self, table_name: str):
+
+        previous_rows = self.previous_tables.get(table_name, {})
+        rows = self.tables[table_name]["hashes"]
+        added_keys = [key for key in rows if key not in previous_rows]
+        changed_keys = [key for key in rows if key in previous_rows and previous_rows[key] != rows[key]]
+        removed_keys = [key for key in previous_rows if key not in rows]
+
+        return {
+            "added": added_keys,
+            "changed": changed_keys,
+            "removed": removed_keys
+        }
+
+    def save(self):
+
+        directory_path = os.path.dirname(self.file_path)
+        if directory_path != "" and not os.path.isdir(directory_path):
+            os.makedirs(directory_path)
+
+        created_at = time.time()
+        with self.lock:
+
+            # Keep the entities of stages that didn't run, like stages skipped when resuming
+            entities = dict(self.previous_entities)
+            entities.update(self.entities)
+            tables = dict(self.previous_tables)
+            tables.update({table_name: table["hashes"] for table_name, table in self.tables.items()})
+            changeset = self.create_changeset(created_at)
+
+            # Write to a temporary file first, so a crash never leaves a half written snapshot behind
+            self.write_json_file(self.file_path, {
+                "domain": self.domain,
+                "created_at": created_at,
+                "entities": entities,
+                "tables": tables
+            })
+            self.write_json_file(self.changeset_file_path, changeset)
+
+            # The saved snapshot is the previous snapshot of the next save, like it is for the next run
+            self.previous_created_at = created_at
+            self.previous_entities = entities
+            self.previous_tables = tables
+            self.entities = {}
+            self.tables = {}
+            self.entity_statistics = {}
+
+        self.log_changeset(changeset)
+
+    def create_changeset(self, created_at: float):
+
+        # Rows that were added or changed are written in full, removed rows by their name
+        tables = {}
+        for table_name in sorted(self.tables):
+
+            changes = self.get_table_changes(table_name)
+            changed_keys = set(changes["added"]) | set(changes["changed"])
+            tables[table_name] = {
+                "added": len(changes["added"]),
+                "changed": len(changes["changed"]),
+                "removed": len(changes["removed"]),
+                "rows": [row for row in self.tables[table_name]["rows"] if self.get_row_key(row) in changed_keys],
+                "removed_names": changes["removed"]
+            }
+
+        return {
+            "domain": self.domain,
+            "previous_created_at": self.previous_created_at,
+            "created_at": created_at,
+            "entities": dict(self.entity_statistics),
+            "tables": tables
+        }
+
+    def clear(self):
+
+        with self.lock:
+            self.previous_created_at = None
+            self.previous_entities = {}
+            self.previous_tables = {}
+            self.entities = {}
+            self.tables = {}
+            self.entity_statistics = {}
+
+    def write_json_file(self, file_path: str, data: dict):
+
+        with open(f"{file_path}.tmp", "w") as file:
+            file.write(dumps(data, default=str))
+        os.replace(f"{file_path}.tmp", file_path)
+
+    def log_changeset(self, changeset: dict):
+
+        if changeset["previous_created_at"] is None:
+            self.logger.log(f"No previous snapshot, every row is in the changeset {self.changeset_file_path}.")
+        changed_tables = [f"{table_name} (+{table['added']} ~{table['changed']} -{table['removed']})"
+                          for table_name, table in changeset["tables"].items()
+                          if table["added"] + table["changed"] + table["removed"] > 0]
+        self.logger.log(f"Changed tables: {', '.join(changed_tables) if changed_tables else 'none'}.")
+        for entity_name, statistics in changeset["entities"].items():
+            self.logger.log(f"Detail pages of {entity_name}: {statistics['new']} new, {statistics['changed']} changed, "
+                            f"{statistics['unchanged']} unchanged.")
@@ -0,0 +1,57 @@
+class EntityIndex:
+
+    def __init__(self, rows: iter, id_key: str = "wowhead_id", name_key: str = "name", name_function=None):
+
+        # Index the rows of a psv file or in-memory table by wowhead id and by name, once
+        # Ids are converted to integers here, so lookups don't convert every row again
+        # Rows sharing an id or a name are kept in their original order
+        self.rows = tuple(rows)
+        self.rows_by_id = {}
+        self.rows_by_name = {}
+        for row in self.rows:
+
+            wowhead_id = self.convert_id(row.get(id_key, None))
+            if wowhead_id is not None:
+                self.rows_by_id.setdefault(wowhead_id, []).append(row)
+
+            name = name_function(row) if name_function is not None else row.get(name_key, None)
+            if name is not None:
+                self.rows_by_name.setdefault(name, []).append(row)
+
+    def __len__(self):
+
+        return len(self.rows)
+
+    def __iter__(self):
+
+        return iter(self.rows)
+
+    def convert_id(self, wowhead_id):
+
+        if wowhead_id is None or wowhead_id == "":
+            return None
+        try:
+            return int(wowhead_id)
+        except (TypeError, ValueError):
+            return None
+
+    def get_all_by_id(self, wowhead_id):
+
+        return tuple(self.rows_by_id.get(self.convert_id(wowhead_id), ()))
+
+    def get_by_id(self, wowhead_id, default=None):
+
+        # The last row wins, like the linear scans this replaces
+        rows = self.rows_by_id.get(self.convert_id(wowhead_id), None)
+
+        return rows[-1] if rows else default
+
+    def get_all_by_name(self, name: str):
+
+        return tuple(self.rows_by_name.get(name, ()))
+
+    def get_by_name(self, name: str, default=None):
+
+        rows = self.rows_by_name.get(name, None)
+
+        return rows[-1] if rows else default
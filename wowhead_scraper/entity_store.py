@@ -0,0 +1,349 @@
+import os
+
+from csv import reader
+from threading import RLock
+from wowhead_scraper.columnar_table import ColumnarTable, find_columnar_file, get_columnar_file_path, \
+    write_columnar_file
+from wowhead_scraper.entity_index import EntityIndex
+from wowhead_scraper.exceptions import InvalidSiteVersionException
+from wowhead_scraper.inline_validator import InlineValidator
+from wowhead_scraper.logger import Logger
+from wowhead_scraper.psv_sink import PsvSink
+from wowhead_scraper.row_codec import RowCodec
+
+
+class EntityRecord:
+
+    # Subclasses are created per table, with a slot for every column
+    __slots__ = ()
+    table_name = None
+    field_names = ()
+    field_keys = {}.keys()
+    field_set = frozenset()
+    codec = None
+
+    def __init__(self, values: dict):
+
+        # Refuse unknown columns, like the psv writer did
+        if len(values.keys() - self.field_set) > 0:
+            raise ValueError(f"Record for {self.table_name} contains unknown fields: "
+                             f"{', '.join(sorted(values.keys() - self.field_set))}")
+
+        # Values are stored in their column types, like they are read back from the psv file
+        for field_name, value in zip(self.field_names, self.codec.convert(self.codec.get_values(values))):
+            setattr(self, field_name, value)
+
+    @classmethod
+    def from_values(cls, values: tuple):
+
+        # Values that are already converted by the codec, like decoded psv rows
+        record = cls.__new__(cls)
+        for field_name, value in zip(cls.field_names, values):
+            setattr(record, field_name, value)
+
+        return record
+
+    def __getitem__(self, field_name: str):
+
+        try:
+            return getattr(self, field_name)
+        except AttributeError:
+            raise KeyError(field_name)
+
+    def get(self, field_name: str, default=None):
+
+        return getattr(self, field_name, default)
+
+    def keys(self):
+
+        # A keys view, so records can be written by a DictWriter like dicts
+        return self.field_keys
+
+    def to_tuple(self):
+
+        return tuple([getattr(self, field_name) for field_name in self.field_names])
+
+    def __repr__(self):
+
+        return f"{self.table_name}({', '.join([f'{name}={getattr(self, name)!r}' for name in self.field_names])})"
+
+
+def create_record_class(codec: RowCodec):
+
+    field_names = codec.field_names
+
+    return type(f"{codec.table_name.title().replace('_', '')}Record", (EntityRecord,), {
+        "__slots__": field_names,
+        "table_name": codec.table_name,
+        "field_names": field_names,
+        "field_keys": dict.fromkeys(field_names).keys(),
+        "field_set": frozenset(field_names),
+        "codec": codec
+    })
+
+
+class TableSink:
+
+    def __init__(self, entity_store, table_name: str, append: bool = False, buffer_size: int = 1024):
+
+        # Rows are turned into records in chunks while a stage produces them,
+        # the records only replace or extend the table of the store when the sink is committed
+        self.entity_store = entity_store
+        self.table_name = table_name
+        self.append = append
+        self.buffer_size = buffer_size
+        self.record_class = entity_store.get_record_class(table_name)
+        self.inline_validator = entity_store.inline_validator
+        self.unique_values = None
+        self.buffer = []
+        self.records = []
+        self.closed = False
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+
+        # Keep the previous table when the stage failed
+        if exception_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def write(self, row):
+
+        # Rows written one by one are checked when the buffer is full
+        self.buffer.append(row)
+        if len(self.buffer) >= self.buffer_size:
+            self.write_buffer()
+
+    def write_rows(self, rows: iter):
+
+        # Rows written together are checked at once, like the rows of one fetched chunk
+        self.buffer.extend(rows)
+        self.write_buffer()
+
+    def write_buffer(self):
+
+        rows = self.buffer
+        self.buffer = []
+        if len(rows) == 0:
+            return
+
+        # Values are converted once into records, the records are checked and kept like they are
+        # The values of unique columns are remembered between chunks, appended rows can't repeat the table either
+        records = [self.record_class(row) for row in rows]
+        if self.inline_validator is not None:
+            if self.unique_values is None:
+                self.unique_values = self.inline_validator.get_unique_values(
+                    self.table_name,
+                    self.entity_store.read(self.table_name) if self.append else ())
+            records = self.inline_validator.check(self.table_name, records, self.unique_values)
+        self.records.extend(records)
+
+    def get_reference_depth(self):
+
+        if self.inline_validator is None:
+            return 0
+
+        return self.inline_validator.get_reference_depth(self.table_name)
+
+    def get_records(self):
+
+        # Records of the rows written so far, before they are committed
+        self.write_buffer()
+
+        return self.records
+
+    def commit(self):
+
+        if self.closed:
+            return
+
+        self.write_buffer()
+        self.closed = True
+
+        # Rows that reference rejected rows are only known when the rows of the table are complete
+        if self.inline_validator is not None:
+            self.records = list(self.inline_validator.check_references(self.table_name, self.records))
+        self.entity_store.commit_records(self.table_name, self.records, self.append)
+
+    def abort(self):
+
+        self.closed = True
+        self.buffer = []
+        self.records = []
+
+
+class TableSinks(dict):
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+
+        # The tables of a stage are committed together, a failing commit aborts the sinks that follow it
+        # Tables are committed after the tables they reference, so rows that reference rejected rows are found
+        sinks = sorted(self.values(), key=lambda table_sink: table_sink.get_reference_depth())
+        for sink in sinks:
+
+            try:
+                sink.__exit__(exception_type, exception, traceback)
+            except Exception:
+                for other_sink in self.values():
+                    other_sink.abort()
+                raise
+
+
+class EntityStore:
+
+    def __init__(self,
+                 logger: Logger,
+                 table_rules: dict,
+                 directory_path: str = "data",
+                 inline_validator: InlineValidator = None,
+                 columnar: bool = False):
+
+        # Holds the tables of a run in memory, psv files are only a view that is written at stage boundaries
+        # With an inline validator, rows that break the validation rules are quarantined instead of written
+        # With columnar files, every table is also written to a typed columnar file, which is read instead of the psv
+        self.logger = logger
+        self.table_rules = table_rules
+        self.directory_path = directory_path
+        self.inline_validator = inline_validator
+        self.columnar = columnar
+        self.record_classes = {}
+        self.tables = {}
+        self.indexes = {}
+        self.changed_table_names = set()
+
+        # Stages that run at the same time share the store
+        self.lock = RLock()
+
+    def get_record_class(self, table_name: str):
+
+        # The columns and their types come from the validation rules
+        with self.lock:
+            if table_name not in self.record_classes:
+                if self.table_rules is None:
+                    raise InvalidSiteVersionException
+                if table_name not in self.table_rules:
+                    raise FileNotFoundError
+                self.record_classes[table_name] = create_record_class(RowCodec(table_name,
+                                                                               self.table_rules[table_name]))
+
+            return self.record_classes[table_name]
+
+    def get_file_path(self, table_name: str):
+
+        return f"{self.directory_path}/{table_name}.psv"
+
+    def open_sink(self, table_name: str, append: bool = False):
+
+        # Stages write their rows into sinks as they produce them
+        return TableSink(self, table_name, append)
+
+    def open_sinks(self, table_names: iter, append_table_names: iter = ()):
+
+        return TableSinks({table_name: self.open_sink(table_name, table_name in append_table_names)
+                           for table_name in table_names})
+
+    def write(self, table_name: str, rows: iter):
+
+        with self.open_sink(table_name) as sink:
+            sink.write_rows(rows)
+
+    def append(self, table_name: str, rows: iter):
+
+        with self.open_sink(table_name, append=True) as sink:
+            sink.write_rows(rows)
+
+    def commit_records(self, table_name: str, records: list, append: bool = False):
+
+        with self.lock:
+            if append:
+                self.read(table_name)
+                self.tables[table_name].extend(records)
+            else:
+                self.tables[table_name] = records
+            self.indexes.pop(table_name, None)
+            self.changed_table_names.add(table_name)
+
+    def read(self, table_name: str):
+
+        # Tables of earlier runs are loaded from their psv file the first time they are needed
+        with self.lock:
+            if table_name not in self.tables:
+                self.tables[table_name] = self.load(table_name)
+
+            return tuple(self.tables[table_name])
+
+    def get_index(self, table_name: str):
+
+        # Build the id and name indexes of a table once, until the table changes
+        with self.lock:
+            if table_name not in self.indexes:
+                self.indexes[table_name] = EntityIndex(self.read(table_name))
+
+            return self.indexes[table_name]
+
+    def load(self, table_name: str):
+
+        record_class = self.get_record_class(table_name)
+        columnar_file_path = find_columnar_file(self.get_file_path(table_name))
+        if columnar_file_path is not None:
+            return self.load_columnar(record_class, columnar_file_path)
+
+        with open(self.get_file_path(table_name), newline="") as file:
+            file_reader = reader(file, delimiter='|', lineterminator='\n')
+            header = next(file_reader, None)
+            if header is not None and tuple(header) != record_class.field_names:
+                self.logger.warning(f"The columns of {self.get_file_path(table_name)} don't match the "
+                                    f"validation rules, reading them by name.")
+                decoders = record_class.codec.get_decoders(header)
+                return [record_class(dict(zip(header, record_class.codec.decode_psv(row, decoders))))
+                        for row in file_reader]
+
+            return [record_class.from_values(record_class.codec.decode_psv(row)) for row in file_reader]
+
+    def load_columnar(self, record_class, file_path: str):
+
+        # The values of columnar files are already typed, so they aren't converted again
+        # Rows are read in chunks, so only the records and one chunk of columns are in memory
+        with ColumnarTable(file_path) as table:
+            if table.field_names != record_class.field_names:
+                self.logger.warning(f"The columns of {file_path} don't match the validation rules, "
+                                    f"reading them by name.")
+                return [record_class(dict(zip(table.field_names, row))) for row in table.iterate_rows()]
+
+            return [record_class.from_values(row) for row in table.iterate_rows()]
+
+    def flush(self):
+
+        # Stream every table that changed since the last flush to its psv file,
+        # a crash while writing leaves the psv file of the previous flush in place
+        with self.lock:
+            for table_name in sorted(self.changed_table_names):
+
+                record_class = self.get_record_class(table_name)
+                with PsvSink(self.get_file_path(table_name), record_class.field_names) as sink:
+                    sink.write_rows(self.tables[table_name])
+
+                # The columnar file is written from the psv file that was just written, or removed
+                columnar_file_path = get_columnar_file_path(self.get_file_path(table_name))
+                if self.columnar:
+                    write_columnar_file(columnar_file_path, record_class.codec, self.tables[table_name],
+                                        self.get_file_path(table_name))
+                elif os.path.isfile(columnar_file_path):
+                    os.remove(columnar_file_path)
+
+            self.changed_table_names = set()
+
+    def clear(self):
+
+        with self.lock:
+            self.tables = {}
+            self.indexes = {}
+            self.changed_table_names = set()
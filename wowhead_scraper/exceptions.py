@@ -13,3 +13,39 @@ class InvalidSiteVersionException(Exception):
 
 class CantConvertJSONStringException(Exception):
     pass
+
+
+class PageNotFoundException(Exception):
+    pass
+
+
+class UnexpectedStatusCodeException(Exception):
+    pass
+
+
+class TooManyRetriesException(Exception):
+    pass
+
+
+class InvalidArchiveModeException(Exception):
+    pass
+
+
+class PageNotInArchiveException(Exception):
+    pass
+
+
+class InvalidShadowTableException(Exception):
+    pass
+
+
+class ErrorBudgetExceededException(Exception):
+    pass
+
+
+class InvalidArgumentException(Exception):
+    pass
+
+
+class DuplicateNaturalKeyException(Exception):
+    pass
@@ -0,0 +1,219 @@
+import requests
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from threading import Lock
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from wowhead_scraper.exceptions import PageNotFoundException, TooManyRetriesException, \
+    UnexpectedStatusCodeException
+from wowhead_scraper.logger import Logger
+from wowhead_scraper.page_archive import PageArchive
+from wowhead_scraper.rate_limiter import RateLimiter, RetryPolicy, TokenBucketRateLimiter, parse_retry_after
+from wowhead_scraper.response_cache import ResponseCache
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+
+    def __init__(self, *args, **kwargs):
+
+        # Count every socket that gets opened, including reconnects of dropped keep-alive connections
+        self.connections_opened = 0
+        self.lock = Lock()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": self.create_counting_pool_class(HTTPConnectionPool, HTTPConnection),
+            "https": self.create_counting_pool_class(HTTPSConnectionPool, HTTPSConnection)
+        }
+
+    def create_counting_pool_class(self, pool_class, connection_class):
+
+        adapter = self
+
+        class CountingConnection(connection_class):
+
+            def connect(self):
+
+                super().connect()
+                with adapter.lock:
+                    adapter.connections_opened += 1
+
+        class CountingConnectionPool(pool_class):
+
+            ConnectionCls = CountingConnection
+
+        return CountingConnectionPool
+
+
+class Fetcher:
+
+    def __init__(self,
+                 logger: Logger,
+                 connections_per_host: int = 4,
+                 maximum_concurrency: int = 4,
+                 connect_timeout: float = 10.0,
+                 read_timeout: float = 30.0,
+                 rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None,
+                 response_cache: ResponseCache = None,
+                 page_archive: PageArchive = None):
+
+        self.logger = logger
+        self.timeout = (connect_timeout, read_timeout)
+        self.maximum_concurrency = maximum_concurrency
+        self.rate_limiter = rate_limiter if rate_limiter is not None else TokenBucketRateLimiter(logger)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.response_cache = response_cache
+        self.page_archive = page_archive
+
+        # Create a keep-alive session, so connections to wowhead are reused between requests
+        # Block when all connections to a host are in use instead of opening extra ones
+        self.adapter = CountingHTTPAdapter(pool_connections=4,
+                                           pool_maxsize=connections_per_host,
+                                           pool_block=True)
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers.update({
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Accept-Language": "en-GB,en;q=0.5",
+            "Upgrade-Insecure-Requests": "1",
+            "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:87.0) Gecko/20100101 Firefox/87.0"
+        })
+
+        self.requests_sent = 0
+
+    def get(self, url: str, headers: dict = None):
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        with self.adapter.lock:
+            self.requests_sent += 1
+
+        return response
+
+    def get_page(self, url: str):
+
+        # Replay pages from the archive without waiting
+        if self.page_archive is not None and self.page_archive.mode == "replay":
+            return self.page_archive.read(url)
+
+        page = self.download_page(url)
+
+        # Record every page that was fetched
+        if self.page_archive is not None and self.page_archive.mode == "record":
+            self.page_archive.record(url, page)
+
+        return page
+
+    def download_page(self, url: str):
+
+        # Serve fresh pages from the cache, revalidate stale ones
+        cached_entry = None
+        if self.response_cache is not None:
+            cached_entry = self.response_cache.get(url)
+            if cached_entry is not None and cached_entry["is_fresh"]:
+                return cached_entry["body"]
+        conditional_headers = self.response_cache.get_conditional_headers(cached_entry) \
+            if self.response_cache is not None else {}
+
+        for attempt in range(self.retry_policy.maximum_retries + 1):
+
+            # Wait for the rate limiter to allow a request
+            self.rate_limiter.acquire()
+
+            try:
+                response = self.get(url, headers=conditional_headers)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as exception:
+                self.logger.warning(f"Request to {url} failed on attempt {attempt + 1}: {exception}")
+                response = None
+
+            if response is not None:
+                status_code = response.status_code
+
+                # Success
+                if status_code == 200:
+                    self.rate_limiter.record_success()
+                    if self.response_cache is not None:
+                        self.response_cache.store(url,
+                                                  response.text,
+                                                  response.headers.get("ETag", None),
+                                                  response.headers.get("Last-Modified", None))
+                    return response.text
+
+                # Cached page is still up to date
+                if status_code == 304 and cached_entry is not None:
+                    self.rate_limiter.record_success()
+                    self.response_cache.refresh(url)
+                    return cached_entry["body"]
+
+                # Throttled or server error, so slow down and try again
+                if status_code == 429 or status_code >= 500:
+                    self.rate_limiter.record_throttle(status_code,
+                                                      parse_retry_after(response.headers.get("Retry-After", None)))
+
+                # The page doesn't exist, so retrying won't help
+                elif status_code in (404, 410):
+                    raise PageNotFoundException(f"The page {url} returned status code {status_code}")
+
+                else:
+                    raise UnexpectedStatusCodeException(f"The page {url} returned status code {status_code}")
+
+            # Back off before the next attempt
+            if attempt < self.retry_policy.maximum_retries:
+                time.sleep(self.retry_policy.get_delay(attempt))
+
+        raise TooManyRetriesException(f"Giving up on {url} after {self.retry_policy.maximum_retries + 1} attempts")
+
+    def get_pages(self, urls: iter):
+
+        urls = tuple(urls)
+        if len(urls) <= 1 or self.maximum_concurrency <= 1:
+            return tuple([self.get_page(url) for url in urls])
+
+        # Fetch the pages concurrently, the shared rate limiter still decides when each request is sent
+        # Results are returned in the same order as the urls
+        with ThreadPoolExecutor(max_workers=min(self.maximum_concurrency, len(urls))) as executor:
+            pages = tuple(executor.map(self.get_page, urls))
+
+        return pages
+
+    def get_connection_statistics(self):
+
+        # Every request that didn't open a new connection reused one
+        connections_opened = self.adapter.connections_opened
+        connections_reused = max(self.requests_sent - connections_opened, 0)
+        reuse_ratio = connections_reused / self.requests_sent if self.requests_sent > 0 else 0.0
+
+        return {
+            "requests_sent": self.requests_sent,
+            "connections_opened": connections_opened,
+            "connections_reused": connections_reused,
+            "reuse_ratio": reuse_ratio
+        }
+
+    def log_connection_statistics(self):
+
+        statistics = self.get_connection_statistics()
+        self.logger.log(f"Sent {statistics['requests_sent']} requests over "
+                        f"{statistics['connections_opened']} connections, "
+                        f"{statistics['connections_reused']} requests reused a connection "
+                        f"({round(statistics['reuse_ratio'] * 100, 1)}%).")
+
+    def log_statistics(self):
+
+        self.log_connection_statistics()
+        self.rate_limiter.log_state()
+        if self.response_cache is not None:
+            self.response_cache.log_statistics()
+
+    def close(self):
+
+        self.session.close()
+        if self.page_archive is not None:
+            self.page_archive.close()
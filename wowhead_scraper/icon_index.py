@@ -0,0 +1,159 @@
+import os
+import re
+import time
+
+from json import dumps, loads
+from threading import Lock
+from wowhead_scraper.json_fixer import parse_js_literal
+from wowhead_scraper.logger import Logger
+from wowhead_scraper.response_cache import ResponseCache
+
+
+class IconIndex:
+
+    # Version of the index file, files of other versions are ignored
+    version = 2
+
+    # Type ids wowhead uses in WH.Gatherer.addData
+    gatherer_types = {
+        1: "npc",
+        3: "item",
+        6: "spell"
+    }
+
+    def __init__(self,
+                 logger: Logger,
+                 domain: str,
+                 file_path: str = "data/icon_index.json",
+                 resource_ttls: dict = None):
+
+        self.logger = logger
+        self.domain = domain
+        self.file_path = file_path
+
+        # Icons expire like the cached pages they were found on, so a changed icon is found again
+        self.resource_ttls = dict(ResponseCache.default_resource_ttls)
+        if resource_ttls is not None:
+            self.resource_ttls.update(resource_ttls)
+
+        # Icon names and the time they were found, by type and wowhead id, and by type and normalized name
+        # Items and spells can have the same name, so names are only compared within their type
+        self.icons_by_id = {}
+        self.icons_by_name = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+        # Reuse the icons of previous runs
+        self.load()
+
+    def normalize_name(self, name: str):
+
+        # Names can still contain the quoting of the old json fixer, so undo it before comparing
+        name = name.replace("''", "'").replace("`", '"')
+        name = re.sub(r"([,:])\s+", r"\1", name)
+
+        return " ".join(name.split()).casefold()
+
+    def add(self, type_name: str, wowhead_id, name: str, icon_name: str):
+
+        if icon_name is None:
+            return
+
+        entry = [icon_name, time.time()]
+        with self.lock:
+            if wowhead_id is not None:
+                self.icons_by_id[f"{type_name}:{wowhead_id}"] = entry
+            if name is not None:
+                self.icons_by_name[f"{type_name}:{self.normalize_name(name)}"] = entry
+
+    def add_gatherer_data(self, type_id: int, gatherer_json: str):
+
+        # Returns the icons of this blob by name or wowhead id, like they were found on the page
+        icons = {}
+        type_name = self.gatherer_types.get(type_id, str(type_id))
+        gatherer_data = parse_js_literal(gatherer_json)
+        for wowhead_id in gatherer_data:
+
+            name = gatherer_data[wowhead_id].get("name_enus", None)
+            icon_name = gatherer_data[wowhead_id].get("icon", None)
+            if icon_name is None:
+                continue
+            self.add(type_name, wowhead_id, name, icon_name)
+            icons[name if name is not None else wowhead_id] = icon_name
+
+        return icons
+
+    def get(self, type_name: str, wowhead_id=None, name: str = None):
+
+        # Look up by wowhead id first, names aren't unique
+        entry = None
+        if wowhead_id is not None:
+            entry = self.icons_by_id.get(f"{type_name}:{wowhead_id}", None)
+        if entry is None and name is not None:
+            entry = self.icons_by_name.get(f"{type_name}:{self.normalize_name(name)}", None)
+        icon_name = entry[0] if entry is not None else None
+
+        with self.lock:
+            if icon_name is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return icon_name
+
+    def load(self):
+
+        if not os.path.isfile(self.file_path):
+            return
+
+        try:
+            with open(self.file_path, "r") as file:
+                data = loads(file.read())
+        except ValueError:
+            self.logger.warning(f"Ignoring unreadable icon index {self.file_path}.")
+            return
+
+        # Icons differ between site versions
+        if data.get("version", None) != self.version or data.get("domain", None) != self.domain:
+            return
+
+        # Leave out the icons that were found longer ago than their pages are cached
+        self.icons_by_id = self.remove_expired(data.get("ids", {}))
+        self.icons_by_name = self.remove_expired(data.get("names", {}))
+        expired_count = len(data.get("ids", {})) - len(self.icons_by_id)
+        if expired_count > 0:
+            self.logger.log(f"Icon index: {expired_count} icons expired.")
+
+    def remove_expired(self, entries: dict):
+
+        current_time = time.time()
+        return {key: entry for key, entry in entries.items()
+                if current_time - entry[1] < self.resource_ttls.get(key.split(":", 1)[0], self.resource_ttls["page"])}
+
+    def save(self):
+
+        directory_path = os.path.dirname(self.file_path)
+        if directory_path != "" and not os.path.isdir(directory_path):
+            os.makedirs(directory_path)
+
+        # Write to a temporary file first, so a crash never leaves a half written index behind
+        with self.lock:
+            with open(f"{self.file_path}.tmp", "w") as file:
+                file.write(dumps({
+                    "version": self.version,
+                    "domain": self.domain,
+                    "ids": self.icons_by_id,
+                    "names": self.icons_by_name
+                }))
+            os.replace(f"{self.file_path}.tmp", self.file_path)
+
+    def clear(self):
+
+        self.icons_by_id = {}
+        self.icons_by_name = {}
+
+    def log_statistics(self):
+
+        self.logger.log(f"Icon index: {len(self.icons_by_id)} icons, {self.hits} hits, {self.misses} misses.")
@@ -0,0 +1,184 @@
+from threading import Lock, local
+from wowhead_scraper.data_validator import DataValidator
+from wowhead_scraper.exceptions import ErrorBudgetExceededException
+from wowhead_scraper.logger import Logger
+from wowhead_scraper.psv_sink import PsvSink
+from wowhead_scraper.row_codec import encode_value
+
+quarantine_modes = ("report",
+                    "drop")
+
+
+class InlineValidator:
+
+    def __init__(self,
+                 logger: Logger,
+                 data_validator: DataValidator,
+                 error_budget: int = None,
+                 quarantine_mode: str = "report",
+                 directory_path: str = "data/quarantine"):
+
+        # Rows are checked when a stage writes them, bad rows are written to quarantine files with their reasons
+        # In report mode the bad rows are kept in the tables, in drop mode they are kept out of the tables,
+        # together with the rows of other tables that reference them
+        # With an error budget, a stage fails as soon as it quarantined more rows than the budget allows
+        if quarantine_mode not in quarantine_modes:
+            raise ValueError(f"Invalid quarantine mode: {quarantine_mode}")
+        self.logger = logger
+        self.data_validator = data_validator
+        self.error_budget = error_budget
+        self.quarantine_mode = quarantine_mode
+        self.directory_path = directory_path
+        self.quarantined_rows = {}
+        self.stage_error_counts = {}
+
+        # The columns of every table that reference a column of another table, like "references": "vendor.name"
+        # Values of referenced columns are remembered when their rows are rejected or kept
+        self.references = self.read_references()
+        self.referenced_columns = {}
+        for references in self.references.values():
+            for column, reference in references:
+
+                referenced_table_name, _, referenced_field_name = reference.partition(".")
+                self.referenced_columns.setdefault(referenced_table_name, set()).add(referenced_field_name)
+        self.rejected_values = {}
+        self.kept_values = {}
+
+        # Stages run in their own threads, so the current stage is remembered per thread
+        self.current_stage = local()
+        self.lock = Lock()
+
+    def read_references(self):
+
+        references = {}
+        for table_name, columns in self.data_validator.tables.items():
+
+            table_rules = self.data_validator.table_rules[table_name]
+            for column in columns:
+
+                reference = table_rules[column["field_name"]].get("references", None)
+                if reference is not None:
+                    references.setdefault(table_name, []).append((column, reference))
+
+        return references
+
+    def get_reference_depth(self, table_name: str, visited_table_names: tuple = ()):
+
+        # Tables are checked after the tables they reference, so their rejected rows are known
+        depths = [self.get_reference_depth(reference.partition(".")[0], visited_table_names + (table_name,)) + 1
+                  for column, reference in self.references.get(table_name, ())
+                  if reference.partition(".")[0] not in visited_table_names + (table_name,)]
+
+        return max(depths, default=0)
+
+    def start_stage(self, stage_name: str):
+
+        self.current_stage.name = stage_name
+        with self.lock:
+            self.stage_error_counts[stage_name] = 0
+
+    def get_stage_name(self):
+
+        return getattr(self.current_stage, "name", None)
+
+    def get_unique_values(self, table_name: str, existing_rows: iter = ()):
+
+        return self.data_validator.get_unique_values(table_name, existing_rows)
+
+    def check(self, table_name: str, rows: iter, unique_values: dict = None):
+
+        # Returns the rows that are kept, only the rows that passed the validation rules in drop mode
+        # The unique values of the rows checked before are given when a table is checked in chunks
+        rows = tuple(rows)
+        row_errors = self.data_validator.check_rows(table_name, rows, unique_values=unique_values)
+
+        return self.reject(table_name, rows, row_errors)
+
+    def check_references(self, table_name: str, rows: iter):
+
+        # Checked when the rows of a table are complete, so the rows of the tables it references are known
+        # In drop mode rows that reference a value only rejected rows have are rejected as well
+        if self.quarantine_mode != "drop":
+            return rows
+
+        rows = tuple(rows)
+        references = self.references.get(table_name, ())
+        row_errors = []
+        for row_index, row in enumerate(rows):
+
+            errors = []
+            for column, reference in references:
+
+                value = row.get(column["field_name"], None)
+                with self.lock:
+                    is_rejected = value is not None and value in self.rejected_values.get(reference, ()) and \
+                        value not in self.kept_values.get(reference, ())
+                if is_rejected:
+                    errors.append(self.data_validator.create_error("reference", row_index + 1, column,
+                                                                   encode_value(value)))
+            row_errors.append(errors)
+        rows = self.reject(table_name, rows, row_errors)
+
+        # The values of the kept rows are still in the table, rows referencing them stay
+        with self.lock:
+            for field_name in self.referenced_columns.get(table_name, ()):
+                self.kept_values.setdefault(f"{table_name}.{field_name}", set()).update(
+                    [row.get(field_name, None) for row in rows])
+
+        return rows
+
+    def reject(self, table_name: str, rows: tuple, row_errors: list):
+
+        rejected_rows = [(row, errors) for row, errors in zip(rows, row_errors) if len(errors) > 0]
+        if len(rejected_rows) == 0:
+            return rows
+
+        self.quarantine(table_name, rejected_rows)
+        stage_name = self.get_stage_name()
+        with self.lock:
+            error_count = self.stage_error_counts.get(stage_name, 0) + len(rejected_rows)
+            self.stage_error_counts[stage_name] = error_count
+        self.logger.warning(f"Quarantined {len(rejected_rows)} rows of {table_name}, stage {stage_name} has "
+                            f"quarantined {error_count} rows"
+                            f"{f' of {self.error_budget}' if self.error_budget is not None else ''}.")
+        if self.error_budget is not None and error_count > self.error_budget:
+            self.logger.error(f"Stage {stage_name} exceeded its error budget of {self.error_budget} rows.")
+            raise ErrorBudgetExceededException(f"Stage {stage_name} quarantined {error_count} rows, "
+                                               f"the error budget is {self.error_budget} rows. "
+                                               f"See {self.directory_path} for the reasons.")
+
+        # Bad rows are only reported, unless they are dropped
+        if self.quarantine_mode != "drop":
+            return rows
+
+        with self.lock:
+            for field_name in self.referenced_columns.get(table_name, ()):
+                self.rejected_values.setdefault(f"{table_name}.{field_name}", set()).update(
+                    [row.get(field_name, None) for row, errors in rejected_rows])
+
+        return tuple([row for row, errors in zip(rows, row_errors) if len(errors) == 0])
+
+    def quarantine(self, table_name: str, rejected_rows: list):
+
+        # The quarantine file of a table has its columns and the reasons the rows were rejected
+        field_names = tuple(self.data_validator.table_rules[table_name].keys())
+        with self.lock:
+            quarantined_rows = self.quarantined_rows.setdefault(table_name, [])
+            for row, errors in rejected_rows:
+
+                quarantined_row = {field_name: row.get(field_name, None) for field_name in field_names}
+                quarantined_row["reasons"] = "; ".join([f"{error['field']}: {error['message']}" for error in errors])
+                quarantined_rows.append(quarantined_row)
+                for error in errors:
+                    self.logger.error(f"{error['message']} in rows of {table_name} for field {error['field']}")
+
+            with PsvSink(f"{self.directory_path}/{table_name}.psv", field_names + ("reasons",)) as sink:
+                sink.write_rows(quarantined_rows)
+
+    def clear(self):
+
+        with self.lock:
+            self.quarantined_rows = {}
+            self.stage_error_counts = {}
+            self.rejected_values = {}
+            self.kept_values = {}
@@ -1,74 +1,216 @@
-from json import loads
+from json import JSONDecodeError, JSONDecoder, loads
+from json.scanner import make_scanner
 import re
 from wowhead_scraper.exceptions import CantConvertJSONStringException
 
 
-def fix_json(faulty_json: str):
+def fix_json(faulty_json: str, compatibility: bool = True):
 
-    # Remove extraCols
-    fixed_json = faulty_json.split(',"extraCols"')[0]
+    # Parse the javascript literal, by default the quoting of strings is kept the same as it used to be
+    return parse_js_literal(faulty_json, compatibility=compatibility)
 
-    # Replace escaped double quotes with backtick
-    fixed_json = re.sub(r"\\\"", r"`", fixed_json, flags=re.MULTILINE)
 
-    # Add whitespaces after comma and colon
-    fixed_json = re.sub(r",(\S)", r", \1", fixed_json, flags=re.MULTILINE)
-    fixed_json = re.sub(r":(\S)", r": \1", fixed_json, flags=re.MULTILINE)
+def parse_js_literal(text: str, compatibility: bool = False):
 
-    # Replace single quote with two single quotes
-    fixed_json = re.sub(r"([^']?)'([^']?)", r"\1''\2", fixed_json, flags=re.MULTILINE)
-
-    # Add missing quotes
-    # Keys
-    looking_for_missing_quotes = True
-    while looking_for_missing_quotes:
-        fixed_json, substitutions = re.subn(r"(\[|{|, )([^{}\[\]\":, ]+): ([^~]*?)(, |}|])",
-                                            r'\1"\2": \3\4',
-                                            fixed_json,
-                                            flags=re.MULTILINE)
-        if substitutions <= 0:
-            looking_for_missing_quotes = False
-
-    # Values, but not: numeric, boolean, or null
-    fixed_json = re.sub(r"\"([^{}\[\]\":, ]+)\": (?!true)(?!false)(?!null)([^{}\[\]\"\d]+)(, |}|])",
-                        r'"\1": "\2"\3',
-                        fixed_json,
-                        flags=re.MULTILINE)
-
-    # Turn json string into Python data
+    parser = JSLiteralParser(text, compatibility)
     try:
-        fixed_json = loads(fixed_json)
-        return fixed_json
-    except Exception:
-        raise CantConvertJSONStringException
-
-
-def fix_data_key(string_with_data: str):
-
-    # Wrap data key in double quotes and add space after colon if not present
-    fixed_string = re.sub(r"[\"']?data[\"']?:[\s]?", r'"data": ', string_with_data, flags=re.MULTILINE)
-
-    return fixed_string
-
-
-def find_icons(icon_json: str):
-
-    icons = {}
-    icon_dict = loads(icon_json)
-    for icon in icon_dict:
-        name = icon_dict[icon].get("name_enus", None)
-        # Use either name or wowhead id as identifier
-        if name is not None:
-            identifier = name
-        else:
-            identifier = icon
-        icon_name = icon_dict[icon].get("icon", None)
-        if icon_name is None:
-            continue
+        return parser.parse()
+    except (IndexError, ValueError) as exception:
+        raise CantConvertJSONStringException(f"Can't parse javascript literal at position {parser.index}: "
+                                             f"{exception}")
+
+
+# Every token of the javascript literals wowhead uses, the group that matched tells what kind of token it is
+token_pattern = re.compile(r"""\s*(?:
+    ([{}\[\],:])                                  # punctuation
+    |"((?:[^"\\]|\\.)*)"                          # double quoted string
+    |'((?:[^'\\]|\\.)*)'                          # single quoted string
+    |(-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)        # number
+    |([A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*)       # identifier, like true or LANG.tab_items
+)""", re.DOTALL | re.VERBOSE)
+whitespace_pattern = re.compile(r"\s*")
+escape_pattern = re.compile(r"\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)", re.DOTALL)
+comma_spacing_pattern = re.compile(r",(\S)")
+colon_spacing_pattern = re.compile(r":(\S)")
+escapes = {
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+    "0": "\0"
+}
+keywords = {
+    "true": True,
+    "false": False,
+    "null": None,
+    "undefined": None
+}
+
+# Plain JSON values are handed to the scanner of the json module, which is written in C
+json_scanner = make_scanner(JSONDecoder())
+json_value_starts = frozenset('{["-0123456789')
+json_object_start_pattern = re.compile(r'{\s*["}]')
+
+
+class JSLiteralParser:
+
+    def __init__(self, text: str, compatibility: bool = False):
+
+        self.text = text
+        self.index = 0
+        self.compatibility = compatibility
+        # Failed attempts of the json scanner may cost at most one extra pass over the text
+        self.json_scanner_budget = len(text)
+
+    def parse(self):
+
+        # Walk the tokens once, open objects and arrays are kept on a stack instead of recursing
+        # Each frame holds the container, the key that waits for its value and whether its colon was read
+        # Anything after the first complete value, like trailing extraCols, is ignored
+        stack = []
+        text = self.text
+        match_token = token_pattern.match
+        while True:
+
+            # Values that are plain JSON are decoded in one go
+            if self.json_scanner_budget > 0 and (not stack or isinstance(stack[-1][0], list) or stack[-1][2]):
+                value, end = self.scan_json_value()
+                if end is not None:
+                    self.index = end
+                    if not stack:
+                        return value
+                    self.add_value(stack[-1], value)
+                    continue
+
+            match = match_token(text, self.index)
+            if match is None:
+                if whitespace_pattern.match(text, self.index).end() >= len(text):
+                    raise ValueError("unexpected end of text")
+                raise ValueError(f"unexpected character {text[self.index:self.index + 1]!r}")
+            self.index = match.end()
+            token_type = match.lastindex
+
+            if token_type == 1:
+                punctuation = match.group(1)
+                if punctuation == "{":
+                    stack.append([{}, None, False])
+                    continue
+                if punctuation == "[":
+                    stack.append([[], None, False])
+                    continue
+                if punctuation == ",":
+                    continue
+                if punctuation == ":":
+                    if not stack or stack[-1][1] is None or stack[-1][2]:
+                        raise ValueError("unexpected ':'")
+                    stack[-1][2] = True
+                    continue
+
+                # Closing brace or bracket
+                if not stack or isinstance(stack[-1][0], dict) != (punctuation == "}"):
+                    raise ValueError(f"unexpected {punctuation!r}")
+                if stack[-1][1] is not None:
+                    raise ValueError(f"missing value of key {stack[-1][1]!r}")
+                value = stack.pop()[0]
+            elif token_type == 2 or token_type == 3:
+                value = self.decode_string(match.group(token_type))
+            elif token_type == 4:
+                number = match.group(4)
+                value = float(number) if "." in number or "e" in number or "E" in number else int(number)
+            else:
+                # Unquoted values, like LANG.tab_items, become strings, unquoted keys stay as they are
+                value = match.group(5)
+                if not stack or isinstance(stack[-1][0], list) or stack[-1][1] is not None:
+                    value = keywords.get(value, value)
+
+            if not stack:
+                return value
+            self.add_value(stack[-1], value)
+
+    def add_value(self, frame: list, value):
+
+        container = frame[0]
+        if isinstance(container, list):
+            container.append(value)
+        elif frame[1] is None:
+            if isinstance(value, (dict, list)):
+                raise ValueError("object used as key")
+            frame[1] = str(value)
+        elif not frame[2]:
+            raise ValueError(f"expected ':' after key {frame[1]!r}")
         else:
-            icons[identifier] = icon_name
-
-    return icons
+            container[frame[1]] = value
+            frame[1] = None
+            frame[2] = False
+
+    def scan_json_value(self):
+
+        text = self.text
+        index = whitespace_pattern.match(text, self.index).end()
+        if index >= len(text) or text[index] not in json_value_starts:
+            return None, None
+        if text[index] == "{" and json_object_start_pattern.match(text, index) is None:
+            return None, None
+
+        # Values with unquoted keys, single quotes or trailing commas aren't JSON and are tokenized instead
+        # The error of a failed attempt counts the lines up to its position, which is taken from the budget
+        try:
+            value, end = json_scanner(text, index)
+        except (StopIteration, RecursionError):
+            return None, None
+        except JSONDecodeError as exception:
+            self.json_scanner_budget -= exception.pos
+            return None, None
+
+        # The quirks keep plain JSON valid and only change strings, so the changed source can be decoded again
+        if self.compatibility and '"' in text[index:end]:
+            source = text[index:end]
+            changed_source = apply_quoting_quirks(source)
+            if changed_source != source:
+                try:
+                    value = loads(changed_source)
+                except (ValueError, RecursionError):
+                    return None, None
+
+        return value, end
+
+    def decode_string(self, content: str):
+
+        if self.compatibility:
+            content = apply_quoting_quirks(content)
+
+        if "\\" in content:
+            content = escape_pattern.sub(self.unescape, content)
+
+        return content
+
+    def unescape(self, match):
+
+        escape = match.group(1)
+        if escape[0] in "ux" and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+
+        return escapes.get(escape, escape)
+
+
+def apply_quoting_quirks(text: str):
+
+    # Reproduce the old regex repairs: escaped double quotes became backticks,
+    # commas and colons got a space after them and single quotes were doubled
+    # Unlike the old repairs, single quoted strings lose their quotes instead of keeping them doubled in the value,
+    # and strings with commas or colons after unquoted keys are parsed instead of failing
+    if '\\"' in text:
+        text = text.replace('\\"', "`")
+    if "," in text:
+        text = comma_spacing_pattern.sub(r", \1", text)
+    if ":" in text:
+        text = colon_spacing_pattern.sub(r": \1", text)
+    if "'" in text:
+        text = text.replace("'", "''")
+
+    return text
 
 
 def is_url_format(value: str):
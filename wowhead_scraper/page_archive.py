@@ -0,0 +1,167 @@
+import hashlib
+import os
+import zipfile
+import zlib
+
+from json import dumps, loads
+from struct import Struct
+from threading import Lock
+from wowhead_scraper.exceptions import InvalidArchiveModeException, PageNotInArchiveException
+from wowhead_scraper.logger import Logger
+
+# Local header in front of every zip entry, the entries of a crashed recording are found through it
+local_header_struct = Struct("<4s2B4HL2L2H")
+local_header_signature = b"PK\x03\x04"
+
+
+class PageArchive:
+
+    modes = ("record", "replay")
+
+    def __init__(self, logger: Logger, file_path: str, mode: str, flush_interval: int = 50):
+
+        if mode not in self.modes:
+            raise InvalidArchiveModeException(f"Unknown archive mode: {mode}")
+
+        self.logger = logger
+        self.file_path = file_path
+        self.mode = mode
+        self.flush_interval = flush_interval
+        self.lock = Lock()
+        self.unflushed_index = {}
+
+        # An archive without a zip directory was left by a crashed recording, its complete entries are kept
+        if os.path.isfile(file_path) and not self.is_readable():
+            self.repair()
+
+        # Record into an archive, the pages of an earlier recording are kept so a resumed scrape records into it,
+        # or open an existing one for replaying
+        if mode == "record":
+            directory_path = os.path.dirname(file_path)
+            if directory_path != "" and not os.path.isdir(directory_path):
+                os.makedirs(directory_path)
+            self.archive = zipfile.ZipFile(file_path, "a", compression=zipfile.ZIP_DEFLATED)
+        else:
+            self.archive = zipfile.ZipFile(file_path, "r")
+        self.index = self.read_index()
+        self.entry_names = set(self.archive.namelist())
+        self.next_index_part = self.get_next_index_part()
+        self.logger.log(f"Opened page archive {file_path} in {mode} mode with {len(self.index)} pages.")
+
+    def is_readable(self):
+
+        try:
+            with zipfile.ZipFile(self.file_path, "r") as archive:
+                archive.namelist()
+        except zipfile.BadZipFile:
+            return False
+
+        return True
+
+    def repair(self):
+
+        # Read the entries one after another until the first one which wasn't written completely
+        with open(self.file_path, "rb") as file:
+            data = file.read()
+        entries = []
+        offset = 0
+        while offset + local_header_struct.size <= len(data):
+
+            (signature, version, system, flags, compression, time, date, crc, compressed_size, size, name_length,
+             extra_length) = local_header_struct.unpack_from(data, offset)
+            if signature != local_header_signature:
+                break
+            name_offset = offset + local_header_struct.size
+            data_offset = name_offset + name_length + extra_length
+            compressed_body = data[data_offset:data_offset + compressed_size]
+            try:
+                body = zlib.decompress(compressed_body, -15) if compression == zipfile.ZIP_DEFLATED \
+                    else compressed_body
+            except zlib.error:
+                break
+            if len(body) != size or zlib.crc32(body) != crc:
+                break
+            entries.append((data[name_offset:name_offset + name_length].decode("utf-8"), body))
+            offset = data_offset + compressed_size
+
+        # Write a temporary archive first, so the damaged one is only replaced by a complete one
+        temporary_file_path = f"{self.file_path}.tmp"
+        with zipfile.ZipFile(temporary_file_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for entry_name, body in entries:
+                archive.writestr(entry_name, body)
+        os.replace(temporary_file_path, self.file_path)
+        self.logger.warning(f"Repaired page archive {self.file_path}, kept {len(entries)} entries.")
+
+    def read_index(self):
+
+        # The url index is written in parts while recording, archives of older versions have one index.json
+        index = {}
+        for entry_name in self.archive.namelist():
+
+            if entry_name == "index.json" or entry_name.startswith("index/"):
+                index.update(loads(self.archive.read(entry_name).decode("utf-8")))
+
+        return index
+
+    def get_next_index_part(self):
+
+        # Index parts are numbered one after another, a recording into an existing archive continues after its parts
+        part_numbers = [int(entry_name[6:-5]) for entry_name in self.entry_names
+                        if entry_name.startswith("index/") and entry_name.endswith(".json") and
+                        entry_name[6:-5].isdigit()]
+
+        return max(part_numbers) + 1 if len(part_numbers) > 0 else 0
+
+    def get_entry_name(self, url: str):
+
+        return f"pages/{hashlib.sha256(url.encode('utf-8')).hexdigest()}.html"
+
+    def record(self, url: str, body: str):
+
+        with self.lock:
+            # Every url is only stored once
+            if url in self.index:
+                return
+            # Pages of a repaired archive can be there without their url in the index
+            entry_name = self.get_entry_name(url)
+            if entry_name not in self.entry_names:
+                self.archive.writestr(entry_name, body.encode("utf-8"))
+                self.entry_names.add(entry_name)
+            self.index[url] = entry_name
+            self.unflushed_index[url] = entry_name
+            if len(self.unflushed_index) >= self.flush_interval:
+                self.flush()
+
+    def flush(self):
+
+        # Write the urls of the pages recorded since the last flush into their own index part,
+        # so the pages of a crashed recording can still be replayed after the archive is repaired
+        if len(self.unflushed_index) == 0:
+            return
+        self.archive.writestr(f"index/{self.next_index_part}.json", dumps(self.unflushed_index))
+        self.next_index_part += 1
+        self.archive.fp.flush()
+        self.unflushed_index = {}
+
+    def read(self, url: str):
+
+        # Fail loudly, a replayed scrape must never fall back to the network
+        entry_name = self.index.get(url, None)
+        if entry_name is None:
+            raise PageNotInArchiveException(f"The page {url} isn't in the archive {self.file_path}")
+
+        with self.lock:
+            return self.archive.read(entry_name).decode("utf-8")
+
+    def close(self):
+
+        with self.lock:
+            if self.archive is None:
+                return
+
+            # Write the rest of the url index
+            if self.mode == "record":
+                self.flush()
+                self.logger.log(f"Recorded {len(self.index)} pages into page archive {self.file_path}.")
+            self.archive.close()
+            self.archive = None
@@ -0,0 +1,266 @@
+import html
+import re
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Comments are matched as well, so scripts inside them are skipped like a html parser would
+element_pattern = re.compile(r"<!--.*?-->|<(script|h1)\b([^>]*)>(.*?)</\1\s*>", re.DOTALL | re.IGNORECASE)
+element_bytes_pattern = re.compile(rb"<!--.*?-->|<(script|h1)\b([^>]*)>(.*?)</\1\s*>", re.DOTALL | re.IGNORECASE)
+class_pattern = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+tag_pattern = re.compile(r"<[^>]*>")
+
+# Whitespace that a html parser collapses when a text contains nothing else
+ascii_spaces = " \n\t\f\r"
+
+# Patterns for the javascript inside the scripts
+listview_start_pattern = re.compile(r"new Listview\(\s*{")
+listview_variable_pattern = re.compile(r"var listview(\w+) = ([^;]+);")
+gatherer_data_pattern = re.compile(r"WH\.Gatherer.addData\((\d+), \d+, ([^;]+)\);")
+icon_create_pattern = re.compile(
+    r"WH\.ge\('ic(\d+)'\)\.appendChild\(Icon\.create\('([a-z0-9_]+)'[{}\[\]:\"'`,._\- &a-zA-Z0-9\\/]+\)\);")
+property_key_pattern = re.compile(r"""\s*(?:"([^"]*)"|'([^']*)'|([A-Za-z_$][\w$]*))\s*:""")
+
+
+def extract_page(page, heading_class: str = "heading-size-1", use_lxml: bool = False):
+
+    # Only read the inline scripts and the first heading, instead of building the whole document tree
+    if use_lxml and etree is not None:
+        return extract_page_with_lxml(page, heading_class)
+
+    is_bytes = isinstance(page, bytes)
+    pattern = element_bytes_pattern if is_bytes else element_pattern
+    scripts = []
+    heading = None
+    for match in pattern.finditer(page):
+
+        tag_name = match.group(1)
+        if tag_name is None:
+            continue
+
+        attributes = match.group(2)
+        content = match.group(3)
+        if is_bytes:
+            tag_name = tag_name.decode("utf-8")
+            attributes = attributes.decode("utf-8", errors="replace")
+            content = content.decode("utf-8", errors="replace")
+
+        # Empty scripts, like scripts with a src attribute, have no text
+        if tag_name.lower() == "script":
+            if content != "":
+                scripts.append(collapse_whitespace(content))
+        else:
+            heading_scripts, heading_text = read_heading(content)
+            scripts.extend(heading_scripts)
+            if heading is None and has_class(attributes, heading_class):
+                heading = heading_text
+
+    return {
+        "scripts": tuple(scripts),
+        "heading": heading
+    }
+
+
+def extract_page_with_lxml(page, heading_class: str = "heading-size-1", chunk_size: int = 64 * 1024):
+
+    if isinstance(page, str):
+        page = page.encode("utf-8")
+
+    # Stream the page through lxml in chunks and drop every element once it has been handled
+    parser = etree.HTMLPullParser(events=("start", "end"), encoding="utf-8")
+    scripts = []
+    heading = None
+    open_headings = 0
+    for offset in range(0, len(page) + 1, chunk_size):
+
+        if offset < len(page):
+            parser.feed(page[offset:offset + chunk_size])
+        else:
+            parser.close()
+
+        for event, element in parser.read_events():
+
+            # Keep the children of headings until the heading text has been read
+            if element.tag == "h1":
+                open_headings += 1 if event == "start" else -1
+            if event == "start":
+                continue
+
+            # Scripts are always cleared, so the text of a heading doesn't contain them
+            if element.tag == "script":
+                if element.text:
+                    scripts.append(collapse_whitespace(element.text))
+                element.clear(keep_tail=True)
+            elif element.tag == "h1" and heading is None and \
+                    heading_class in (element.get("class") or "").split():
+                heading = "".join([collapse_whitespace(text) for text in element.itertext()])
+            if open_headings == 0:
+                element.clear(keep_tail=True)
+
+    return {
+        "scripts": tuple(scripts),
+        "heading": heading
+    }
+
+
+def read_heading(content: str):
+
+    # Returns the scripts inside a heading and its text without them, like a html parser reads it
+    scripts = []
+    segments = []
+    position = 0
+    for match in element_pattern.finditer(content):
+
+        segments.append(content[position:match.start()])
+        position = match.end()
+        if match.group(1) is not None and match.group(1).lower() == "script" and match.group(3) != "":
+            scripts.append(collapse_whitespace(match.group(3)))
+    segments.append(content[position:])
+
+    texts = [collapse_whitespace(html.unescape(text)) for segment in segments for text in tag_pattern.split(segment)]
+
+    return scripts, "".join(texts)
+
+
+def collapse_whitespace(text: str):
+
+    if text == "" or text.strip(ascii_spaces) != "":
+        return text
+
+    return "\n" if "\n" in text else " "
+
+
+def has_class(attributes: str, class_name: str):
+
+    match = class_pattern.search(attributes)
+    if match is None:
+        return False
+
+    class_value = next(group for group in match.groups() if group is not None)
+
+    return class_name in class_value.split()
+
+
+def index_listviews(scripts: iter):
+
+    # Tokenize every new Listview({...}) call once and index them by their id
+    listviews = {}
+    for script in scripts:
+
+        for match in listview_start_pattern.finditer(script):
+
+            properties = scan_object_properties(script, match.end() - 1)
+            if properties is None:
+                continue
+            listview_id = properties.get("id", None)
+            listview_data = properties.get("data", None)
+            if listview_id is None or listview_data is None:
+                continue
+            listviews[listview_id.strip("'\"")] = {
+                "data": listview_data,
+                "script": script
+            }
+
+    return listviews
+
+
+def index_listview_variables(scripts: iter):
+
+    # Index every var listview<name> = [...]; assignment by name
+    listview_variables = {}
+    for script in scripts:
+
+        for match in listview_variable_pattern.finditer(script):
+            listview_variables[match.group(1)] = {
+                "data": match.group(2),
+                "script": script
+            }
+
+    return listview_variables
+
+
+def find_gatherer_data(script: str):
+
+    # Returns the type id and the json of every blob
+    return [(int(type_id), gatherer_json) for type_id, gatherer_json in gatherer_data_pattern.findall(script)]
+
+
+def find_icon_name(scripts: iter, wowhead_id: int):
+
+    icon_name = None
+    for script in scripts:
+
+        for match in icon_create_pattern.finditer(script):
+            if match.group(1) == str(wowhead_id):
+                icon_name = match.group(2)
+
+    return icon_name
+
+
+def scan_object_properties(text: str, start: int):
+
+    # Walk a javascript object literal from its opening brace and return the source of its top level values
+    properties = {}
+    depth = 0
+    index = start
+    value_key = None
+    value_start = None
+    while index < len(text):
+
+        character = text[index]
+        if character in "'\"`":
+            index = skip_string(text, index)
+            continue
+
+        if character in "{[(":
+            depth += 1
+            if depth == 1:
+                value_key, index = read_property_key(text, index + 1)
+                value_start = index
+                continue
+        elif character in "}])":
+            depth -= 1
+            if depth == 0:
+                if value_key is not None:
+                    properties[value_key] = text[value_start:index].strip()
+                return properties
+        elif character == "," and depth == 1:
+            if value_key is not None:
+                properties[value_key] = text[value_start:index].strip()
+            value_key, index = read_property_key(text, index + 1)
+            value_start = index
+            continue
+
+        index += 1
+
+    # The object literal was never closed
+    return None
+
+
+def read_property_key(text: str, index: int):
+
+    match = property_key_pattern.match(text, index)
+    if match is None:
+        return None, index
+
+    key = next(group for group in match.groups() if group is not None)
+
+    return key, match.end()
+
+
+def skip_string(text: str, index: int):
+
+    quote = text[index]
+    index += 1
+    while index < len(text):
+
+        if text[index] == "\\":
+            index += 2
+            continue
+        if text[index] == quote:
+            return index + 1
+        index += 1
+
+    return index
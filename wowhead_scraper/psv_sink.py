@@ -0,0 +1,76 @@
+import os
+
+from csv import DictWriter
+
+
+class PsvSink:
+
+    def __init__(self, file_path: str, field_names: iter, buffer_size: int = 1024):
+
+        # Rows are written to a temporary file, which only replaces the psv file when the sink is committed
+        self.file_path = file_path
+        self.temporary_file_path = f"{file_path}.tmp"
+        self.field_names = tuple(field_names)
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.row_count = 0
+
+        directory_path = os.path.dirname(self.file_path)
+        if directory_path != "" and not os.path.isdir(directory_path):
+            os.makedirs(directory_path)
+
+        self.file = open(self.temporary_file_path, "w", newline="")
+        self.writer = DictWriter(self.file, fieldnames=self.field_names, delimiter='|', lineterminator='\n')
+        self.writer.writeheader()
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+
+        # Keep the previous psv file when the stage failed
+        if exception_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def write(self, row):
+
+        # Rows can be dicts or entity records, anything with keys and get
+        self.buffer.append(row)
+        if len(self.buffer) >= self.buffer_size:
+            self.write_buffer()
+
+    def write_rows(self, rows: iter):
+
+        for row in rows:
+            self.write(row)
+
+    def write_buffer(self):
+
+        self.writer.writerows(self.buffer)
+        self.row_count += len(self.buffer)
+        self.buffer = []
+
+    def commit(self):
+
+        if self.file.closed:
+            return
+
+        try:
+            self.write_buffer()
+        except Exception:
+            self.abort()
+            raise
+        self.file.close()
+        os.replace(self.temporary_file_path, self.file_path)
+
+    def abort(self):
+
+        if self.file.closed:
+            return
+
+        self.buffer = []
+        self.file.close()
+        os.remove(self.temporary_file_path)
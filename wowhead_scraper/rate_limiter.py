@@ -0,0 +1,169 @@
+import random
+import time
+
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from wowhead_scraper.logger import Logger
+
+
+class RateLimiter:
+
+    def __init__(self, logger: Logger):
+
+        self.logger = logger
+        self.lock = Lock()
+        self.requests_allowed = 0
+        self.throttled_responses = 0
+        self.total_wait_time = 0.0
+
+    def acquire(self):
+
+        # Don't limit requests at all
+        with self.lock:
+            self.requests_allowed += 1
+
+        return 0.0
+
+    def record_success(self):
+
+        pass
+
+    def record_throttle(self, status_code: int, retry_after: float = None):
+
+        with self.lock:
+            self.throttled_responses += 1
+
+    def get_state(self):
+
+        with self.lock:
+            return {
+                "requests_allowed": self.requests_allowed,
+                "throttled_responses": self.throttled_responses,
+                "total_wait_time": round(self.total_wait_time, 3)
+            }
+
+    def log_state(self):
+
+        state = self.get_state()
+        state_string = ", ".join([f"{key}: {value}" for key, value in state.items()])
+        self.logger.log(f"Rate limiter state: {state_string}.")
+
+
+class TokenBucketRateLimiter(RateLimiter):
+
+    def __init__(self,
+                 logger: Logger,
+                 rate: float = 0.5,
+                 burst: int = 2,
+                 minimum_rate: float = 0.05,
+                 maximum_rate: float = 4.0,
+                 rate_increase: float = 0.05,
+                 rate_decrease_factor: float = 0.5):
+
+        super().__init__(logger)
+
+        # Rates are in requests per second
+        self.rate = rate
+        self.burst = burst
+        self.minimum_rate = minimum_rate
+        self.maximum_rate = maximum_rate
+        self.rate_increase = rate_increase
+        self.rate_decrease_factor = rate_decrease_factor
+
+        # Start with a full bucket
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+
+    def refill(self, now: float):
+
+        self.tokens = min(float(self.burst), self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self):
+
+        with self.lock:
+            now = time.monotonic()
+            self.refill(now)
+
+            # Take a token, if the bucket is empty it goes into debt and the caller waits until it's paid off
+            self.tokens -= 1
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+            # Wait for a Retry-After pause to pass
+            wait_time = max(wait_time, self.paused_until - now)
+
+            self.requests_allowed += 1
+            self.total_wait_time += wait_time
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+        return wait_time
+
+    def record_success(self):
+
+        # Additive increase
+        with self.lock:
+            self.rate = min(self.maximum_rate, self.rate + self.rate_increase)
+
+    def record_throttle(self, status_code: int, retry_after: float = None):
+
+        # Multiplicative decrease
+        with self.lock:
+            self.throttled_responses += 1
+            previous_rate = self.rate
+            self.rate = max(self.minimum_rate, self.rate * self.rate_decrease_factor)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after is not None:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+        message = f"Got status code {status_code}, lowering request rate from {round(previous_rate, 3)} " \
+                  f"to {round(self.rate, 3)} requests per second"
+        if retry_after is not None:
+            message += f" and pausing requests for {retry_after} seconds"
+        self.logger.warning(f"{message}.")
+
+    def get_state(self):
+
+        state = super().get_state()
+        with self.lock:
+            state.update({
+                "rate": round(self.rate, 3),
+                "burst": self.burst,
+                "tokens": round(self.tokens, 3)
+            })
+
+        return state
+
+
+class RetryPolicy:
+
+    def __init__(self, maximum_retries: int = 5, base_delay: float = 1.0, maximum_delay: float = 60.0):
+
+        self.maximum_retries = maximum_retries
+        self.base_delay = base_delay
+        self.maximum_delay = maximum_delay
+
+    def get_delay(self, attempt: int):
+
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.maximum_delay, self.base_delay * 2 ** attempt))
+
+
+def parse_retry_after(value: str):
+
+    if value is None:
+        return None
+
+    # Retry-After is either a number of seconds or a http date
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_date = parsedate_to_datetime(value)
+        return max(retry_date.timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
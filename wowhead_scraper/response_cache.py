@@ -0,0 +1,222 @@
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import time
+
+from json import dumps, loads
+from threading import Lock
+from wowhead_scraper.logger import Logger
+
+
+class ResponseCache:
+
+    # Time to live in seconds per resource type
+    default_resource_ttls = {
+        "item": 7 * 24 * 60 * 60,
+        "npc": 7 * 24 * 60 * 60,
+        "spell": 7 * 24 * 60 * 60,
+        "listview": 24 * 60 * 60,
+        "page": 24 * 60 * 60
+    }
+
+    def __init__(self,
+                 logger: Logger,
+                 domain: str,
+                 directory_path: str = "data/cache",
+                 resource_ttls: dict = None,
+                 maximum_size: int = 512 * 1024 * 1024):
+
+        self.logger = logger
+        self.domain = domain
+        self.directory_path = f"{directory_path}/{domain}"
+        self.resource_ttls = dict(self.default_resource_ttls)
+        if resource_ttls is not None:
+            self.resource_ttls.update(resource_ttls)
+        self.maximum_size = maximum_size
+        self.lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+        # Check if cache directory exists
+        if not os.path.isdir(self.directory_path):
+            os.makedirs(self.directory_path)
+
+        # The size of the cache is only determined when the first response is stored,
+        # so opening a large cache to read from it doesn't walk all of its entries
+        self.size = None
+
+    def get_size(self):
+
+        with self.lock:
+            if self.size is None:
+                self.size = sum([entry["size"] for entry in self.get_entries()])
+
+            return self.size
+
+    def get_key(self, url: str):
+
+        return hashlib.sha256(f"{self.domain}|{url}".encode("utf-8")).hexdigest()
+
+    def get_entry_path(self, key: str):
+
+        return f"{self.directory_path}/{key[0:2]}/{key}"
+
+    def get_resource_type(self, url: str):
+
+        match = re.search(r"/(item|npc|spell)=", url)
+        if match is not None:
+            return match.group(1)
+        if "?filter=" in url:
+            return "listview"
+
+        return "page"
+
+    def get(self, url: str):
+
+        entry_path = self.get_entry_path(self.get_key(url))
+        try:
+            with open(f"{entry_path}.json", "r") as file:
+                metadata = loads(file.read())
+            with gzip.open(f"{entry_path}.gz", "rb") as file:
+                body = file.read().decode("utf-8")
+        except (FileNotFoundError, OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        # Mark entry as recently used
+        os.utime(f"{entry_path}.json")
+
+        ttl = self.resource_ttls[self.get_resource_type(url)]
+        metadata["body"] = body
+        metadata["is_fresh"] = time.time() - metadata["stored_at"] < ttl
+        if metadata["is_fresh"]:
+            with self.lock:
+                self.hits += 1
+
+        return metadata
+
+    def get_conditional_headers(self, entry: dict):
+
+        headers = {}
+        if entry is None:
+            return headers
+
+        if entry.get("etag", None) is not None:
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified", None) is not None:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def store(self, url: str, body: str, etag: str = None, last_modified: str = None):
+
+        key = self.get_key(url)
+        entry_path = self.get_entry_path(key)
+        if not os.path.isdir(os.path.dirname(entry_path)):
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        self.get_size()
+        previous_size = self.get_entry_size(entry_path)
+
+        # Write to temporary files first, so a crash never leaves a half written entry behind
+        compressed_body = gzip.compress(body.encode("utf-8"))
+        metadata = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "size": len(compressed_body)
+        }
+        with open(f"{entry_path}.gz.tmp", "wb") as file:
+            file.write(compressed_body)
+        with open(f"{entry_path}.json.tmp", "w") as file:
+            file.write(dumps(metadata))
+        os.replace(f"{entry_path}.gz.tmp", f"{entry_path}.gz")
+        os.replace(f"{entry_path}.json.tmp", f"{entry_path}.json")
+
+        with self.lock:
+            self.size += metadata["size"] - previous_size
+
+        if self.size > self.maximum_size:
+            self.evict()
+
+    def refresh(self, url: str):
+
+        # The page didn't change, so it's fresh again
+        entry_path = self.get_entry_path(self.get_key(url))
+        with open(f"{entry_path}.json", "r") as file:
+            metadata = loads(file.read())
+        metadata["stored_at"] = time.time()
+        with open(f"{entry_path}.json", "w") as file:
+            file.write(dumps(metadata))
+
+        with self.lock:
+            self.revalidations += 1
+
+    def get_entry_size(self, entry_path: str):
+
+        try:
+            with open(f"{entry_path}.json", "r") as file:
+                return loads(file.read())["size"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return 0
+
+    def get_entries(self):
+
+        entries = []
+        for directory in os.listdir(self.directory_path):
+
+            directory_path = f"{self.directory_path}/{directory}"
+            if not os.path.isdir(directory_path):
+                continue
+
+            for file_name in os.listdir(directory_path):
+
+                if not file_name.endswith(".json"):
+                    continue
+                entry_path = f"{directory_path}/{file_name[0:-5]}"
+                entries.append({
+                    "path": entry_path,
+                    "size": self.get_entry_size(entry_path),
+                    "last_used": os.path.getmtime(f"{entry_path}.json")
+                })
+
+        return entries
+
+    def evict(self):
+
+        with self.lock:
+
+            # Remove least recently used entries until the cache is below 90% of its maximum size
+            entries = sorted(self.get_entries(), key=lambda entry: entry["last_used"])
+            target_size = self.maximum_size * 0.9
+            for entry in entries:
+
+                if self.size <= target_size:
+                    break
+
+                for extension in (".json", ".gz"):
+                    if os.path.isfile(f"{entry['path']}{extension}"):
+                        os.remove(f"{entry['path']}{extension}")
+                self.size -= entry["size"]
+                self.evictions += 1
+
+        self.logger.log(f"Evicted cached responses, the cache is now {self.size} bytes.")
+
+    def clear(self):
+
+        with self.lock:
+            shutil.rmtree(self.directory_path, ignore_errors=True)
+            os.makedirs(self.directory_path)
+            self.size = 0
+
+    def log_statistics(self):
+
+        self.logger.log(f"Response cache: {self.hits} hits, {self.misses} misses, "
+                        f"{self.revalidations} revalidations, {self.evictions} evictions, {self.get_size()} bytes.")
@@ -0,0 +1,165 @@
+def decode_integer(text: str):
+
+    return int(text) if text != "" else None
+
+
+def decode_boolean(text: str):
+
+    if text == "":
+        return None
+    if text == "True":
+        return True
+    if text == "False":
+        return False
+
+    raise ValueError(f"Invalid boolean: {text}")
+
+
+def decode_string(text: str):
+
+    return text if text != "" else None
+
+
+def decode_required_string(text: str):
+
+    # Required strings can be empty, they aren't null
+    return text
+
+
+def encode_value(value):
+
+    # Like the psv writer, None is written as an empty value
+    return "" if value is None else str(value)
+
+
+def unquote_value(value):
+
+    # Scraped strings keep their single quotes doubled, like they were when the rows were inserted as sql literals,
+    # the database stores them with single quotes
+    return value.replace("''", "'") if type(value) is str else value
+
+
+def decode_value(decode, text: str):
+
+    # A value that can't be converted into the type of its column is kept as it is, the validation rules report it
+    try:
+        return decode(text)
+    except ValueError:
+        return text
+
+
+# Decoders of the column types, strings of columns that aren't required are null when they are empty
+type_decoders = {
+    "integer": decode_integer,
+    "boolean": decode_boolean,
+    "string": decode_string
+}
+
+
+def read_integer(value):
+
+    return int(value) if value is not None else None
+
+
+def read_boolean(value):
+
+    # Databases store booleans as tinyint
+    return bool(value) if value is not None else None
+
+
+def read_string(value):
+
+    return str(value) if value is not None else None
+
+
+class RowCodec:
+
+    def __init__(self, table_name: str, table_rules: dict):
+
+        # The type of every column comes from the validation rules, its converters are picked once
+        # Converted rows are written as psv values and sql parameters, columnar files store them in binary
+        self.table_name = table_name
+        self.field_names = tuple(table_rules.keys())
+        self.field_indexes = {field_name: index for index, field_name in enumerate(self.field_names)}
+        field_rules_list = [field_rules if field_rules is not None else {} for field_rules in table_rules.values()]
+        self.field_types = tuple([field_rules.get("type", "string") for field_rules in field_rules_list])
+        self.decoders = tuple([self.get_decoder(field_rules) for field_rules in field_rules_list])
+        self.readers = tuple([self.get_reader(field_type) for field_type in self.field_types])
+        self.native_types = tuple([{"integer": int, "boolean": bool}.get(field_type, str)
+                                   for field_type in self.field_types])
+
+    def get_decoder(self, field_rules: dict):
+
+        field_type = field_rules.get("type", "string")
+        if field_type == "integer":
+            return decode_integer
+        if field_type == "boolean":
+            return decode_boolean
+        if field_rules.get("not_null", False):
+            return decode_required_string
+
+        return decode_string
+
+    def get_reader(self, field_type: str):
+
+        if field_type == "integer":
+            return read_integer
+        if field_type == "boolean":
+            return read_boolean
+
+        return read_string
+
+    def get_indexes(self, field_names: iter):
+
+        unknown_field_names = [field_name for field_name in field_names if field_name not in self.field_indexes]
+        if len(unknown_field_names) > 0:
+            raise ValueError(f"The table {self.table_name} has no columns: {', '.join(unknown_field_names)}")
+
+        return tuple([self.field_indexes[field_name] for field_name in field_names])
+
+    def get_decoders(self, field_names: iter):
+
+        # Decoders of the columns of a psv header, which can have fewer columns or another order
+        return tuple([self.decoders[index] for index in self.get_indexes(field_names)])
+
+    def get_readers(self, field_names: iter):
+
+        return tuple([self.readers[index] for index in self.get_indexes(field_names)])
+
+    def decode_psv(self, row: iter, decoders: tuple = None):
+
+        # Psv values are strings, every value is converted once into its native type
+        return tuple([decode_value(decode, text)
+                      for decode, text in zip(decoders if decoders is not None else self.decoders, row)])
+
+    def unquote(self, row: iter):
+
+        # Values of decoded psv rows like the database stores them
+        return tuple([unquote_value(value) for value in row])
+
+    def read_sql(self, row: iter, readers: tuple = None):
+
+        # Values read from the database compare like decoded psv values
+        return tuple([read(value) for read, value in zip(readers if readers is not None else self.readers, row)])
+
+    def get_values(self, row):
+
+        # Values of a dict or record in the order of the columns
+        return tuple([row.get(field_name, None) for field_name in self.field_names])
+
+    def convert(self, values: iter):
+
+        # Values of scraped rows can be strings or numbers, they are stored like they are read back from psv files
+        # Values that already have the type of their column are kept, the others are converted once,
+        # a value that can't be converted is kept as it is, so the validation rules report it instead of the store
+        converted_values = []
+        for decode, native_type, value in zip(self.decoders, self.native_types, values):
+
+            if type(value) is native_type and (value != "" or decode is decode_required_string):
+                converted_values.append(value)
+            elif value is None:
+                converted_values.append(None)
+            else:
+                converted_values.append(decode_value(decode, encode_value(value)))
+
+        return tuple(converted_values)
@@ -1,23 +1,55 @@
 import os
-import re
 import sys
 
-import requests
 import shutil
 import time
 
-from bs4 import BeautifulSoup
-from csv import DictReader, DictWriter, reader
 from json import loads
 from wowhead_scraper.exceptions import InvalidSiteVersionException
-from wowhead_scraper.json_fixer import find_icons, fix_data_key, fix_json, is_url_format
+from wowhead_scraper.fetcher import Fetcher
+from wowhead_scraper.checkpoint_manifest import CheckpointManifest
+from wowhead_scraper.columnar_table import ColumnarTable, find_columnar_file
+from wowhead_scraper.data_validator import DataValidator
+from wowhead_scraper.delta_snapshot import DeltaSnapshot, hash_content
+from wowhead_scraper.entity_index import EntityIndex
+from wowhead_scraper.entity_store import EntityStore, TableSink
+from wowhead_scraper.icon_index import IconIndex
+from wowhead_scraper.inline_validator import InlineValidator
+from wowhead_scraper.json_fixer import fix_json
 from wowhead_scraper.logger import Logger
+from wowhead_scraper.page_extractor import extract_page, find_gatherer_data, find_icon_name, index_listviews, \
+    index_listview_variables
+from wowhead_scraper.page_archive import PageArchive
+from wowhead_scraper.rate_limiter import RateLimiter, RetryPolicy
+from wowhead_scraper.response_cache import ResponseCache
+from wowhead_scraper.stage_scheduler import StageScheduler
 from wowhead_scraper.time import log_time
 
 
 class WowheadScraper:
 
-    def __init__(self, site_version):
+    def __init__(self,
+                 site_version,
+                 connections_per_host: int = 4,
+                 maximum_concurrency: int = 4,
+                 connect_timeout: float = 10.0,
+                 read_timeout: float = 30.0,
+                 rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None,
+                 use_cache: bool = True,
+                 cache_resource_ttls: dict = None,
+                 cache_maximum_size: int = 512 * 1024 * 1024,
+                 archive_mode: str = None,
+                 archive_path: str = None,
+                 wowhead_url: str = None,
+                 resume: bool = False,
+                 maximum_parallel_stages: int = 4,
+                 delta: bool = False,
+                 validation_workers: int = 1,
+                 inline_validation: bool = True,
+                 error_budget: int = None,
+                 quarantine_mode: str = "report",
+                 columnar: bool = False):
 
         # Init logger
         self.logger = Logger()
@@ -37,12 +69,131 @@ class WowheadScraper:
         self.logger.log(f"Scraper is using domain: {self.domain}")
 
         # Define constants
-        self.wowhead_url = f"https://{self.domain}.wowhead.com"
+        # A different url can be given to scrape a local stand-in server
+        self.wowhead_url = wowhead_url if wowhead_url is not None else f"https://{self.domain}.wowhead.com"
         self.logger.log(f"The url to wowhead is: {self.wowhead_url}")
         self.sources = self.read_json_file("wowhead_scraper/json_data/sources")
         self.item_slots = self.read_json_file("wowhead_scraper/json_data/item_slots")
         self.validation_rules = self.read_json_file("wowhead_scraper/json_data/validation_rules")
 
+        # Init response cache, which stores fetched pages in the data directory
+        response_cache = None
+        if use_cache:
+            response_cache = ResponseCache(self.logger,
+                                           self.domain,
+                                           resource_ttls=cache_resource_ttls,
+                                           maximum_size=cache_maximum_size)
+
+        # Init page archive, which records fetched pages or replays them without network access
+        page_archive = None
+        if archive_mode is not None:
+            if archive_path is None:
+                archive_path = f"archives/{self.domain}.zip"
+            page_archive = PageArchive(self.logger, archive_path, archive_mode)
+
+        # Init fetcher, which keeps connections to wowhead alive between requests
+        self.fetcher = Fetcher(self.logger,
+                               connections_per_host=connections_per_host,
+                               maximum_concurrency=maximum_concurrency,
+                               connect_timeout=connect_timeout,
+                               read_timeout=read_timeout,
+                               rate_limiter=rate_limiter,
+                               retry_policy=retry_policy,
+                               response_cache=response_cache,
+                               page_archive=page_archive)
+
+        # Init icon index, which remembers the icons of every parsed page across stages and runs
+        # Its icons expire after the time to live of the cached pages
+        self.icon_index = IconIndex(self.logger, self.domain, resource_ttls=cache_resource_ttls)
+
+        # Init data validator, which compiles the validation rules when they are first needed
+        # With more than one validation worker the psv files are checked in worker processes
+        self.data_validator = None
+        self.validation_workers = validation_workers
+
+        # Init inline validator, which checks the rows of every stage before they are written
+        # Bad rows go to quarantine files with their reasons, they are only kept out of the tables in drop mode
+        # With an error budget, a stage fails when it has more bad rows than the budget
+        self.inline_validator = None
+        if inline_validation and self.validation_rules.get(self.domain, None) is not None:
+            self.inline_validator = InlineValidator(self.logger,
+                                                    self.get_data_validator(),
+                                                    error_budget=error_budget,
+                                                    quarantine_mode=quarantine_mode)
+
+        # Init entity store, which keeps the scraped tables in memory and writes them to psv files
+        # Optionally every table is also written to a typed columnar file, which is read instead of the psv file
+        self.entity_store = EntityStore(self.logger,
+                                        self.validation_rules.get(self.domain, None),
+                                        inline_validator=self.inline_validator,
+                                        columnar=columnar)
+
+        # Init checkpoint manifest, which records finished stages and entities so a restarted run can resume
+        self.resume = resume
+        self.checkpoints = CheckpointManifest(self.logger, self.domain)
+
+        # Init delta snapshot, which remembers the detail pages of every entity by the hash of its listview content
+        # In delta mode only the detail pages of new and changed entities are fetched
+        self.delta = delta
+        self.snapshot = DeltaSnapshot(self.logger, self.domain)
+        if self.delta and not self.snapshot.has_previous():
+            self.logger.log("There is no previous snapshot, so every detail page is fetched.")
+
+        # Define stages by name, with the tables they read and write and the action and description that are logged
+        # Stages that don't depend on each other run at the same time
+        self.maximum_parallel_stages = maximum_parallel_stages
+        self.stages = {
+            # Prepare data directory for scraping
+            "prepare_data": self.create_stage(self.prepare_data_for_scraping, "prepare", "data cache",
+                                              (),
+                                              ("source",)),
+            # Get main professions from professions index
+            # Get secondary professions from secondary skills
+            "professions": self.create_stage(self.scrape_professions, "scrape", "professions",
+                                             (),
+                                             ("profession", "specialisation")),
+            # Get locations from index
+            "locations": self.create_stage(self.scrape_locations, "scrape", "locations",
+                                           (),
+                                           ("location",)),
+            # Get vendors from npcs search page with vendors filter
+            "vendors": self.create_stage(self.scrape_vendors, "scrape", "vendors",
+                                         ("location",),
+                                         ("vendor", "location_vendor")),
+            # Get reagents from items search page with reagent filter
+            "reagents": self.create_stage(self.scrape_reagents, "scrape", "reagents",
+                                          (),
+                                          ("reagent", "reagent_source", "reagent_vendor")),
+            # Get enchantments from spells search page with enchantment and has reagents filter
+            "enchantments": self.create_stage(self.scrape_enchantments, "scrape", "enchantments",
+                                              (),
+                                              ("enchantment",)),
+            # Get crafted items from items search page with crafted by profession filter for each profession
+            # Also include >= 0 sale price filter to include sale price in results
+            "craftable_items": self.create_stage(self.scrape_craftable_items, "scrape", "craftable items",
+                                                 ("profession",),
+                                                 ("craftable_item",)),
+            # Get profession data from profession page for each profession
+            # Including: trainers, recipes, and recipe items
+            # Unknown reagents are appended to the reagents
+            "profession_data": self.create_stage(self.scrape_profession_data, "scrape", "profession data",
+                                                 ("profession", "location", "enchantment", "craftable_item",
+                                                  "reagent"),
+                                                 ("trainer", "profession_trainer", "recipe_item", "recipe",
+                                                  "reagent_recipe", "recipe_trainer", "reagent")),
+            # Get recipe specialisations
+            "specialisation_recipes": self.create_stage(self.scrape_specialisation_recipes, "scrape",
+                                                        "profession specialisations",
+                                                        ("specialisation",),
+                                                        ("recipe_specialisation",))
+        }
+
+    def close(self):
+
+        # Close connections and finish the page archive
+        self.fetcher.close()
+        self.icon_index.save()
+
     def get_all(self):
 
         professions = self.get_profession_data()["professions"]
@@ -66,88 +217,24 @@ class WowheadScraper:
         # Log starting message
         self.logger.log("Starting...")
 
-        # Clear data directory
-        clear_data_results = self.clear_data()
-        log_time(self.logger,
-                 clear_data_results["start_time"],
-                 clear_data_results["end_time"],
-                 "clear",
-                 "data cache")
-
-        # Prepare data directory for scraping
-        prepare_data_results = self.prepare_data_for_scraping()
-        log_time(self.logger,
-                 prepare_data_results["start_time"],
-                 prepare_data_results["end_time"],
-                 "prepare",
-                 "data cache")
-
-        # Get main professions from professions index
-        # Get secondary professions from secondary skills
-        professions_results = self.scrape_professions()
-        log_time(self.logger,
-                 professions_results["start_time"],
-                 professions_results["end_time"],
-                 "scrape",
-                 "professions")
-
-        # Get locations from index
-        locations_results = self.scrape_locations()
-        log_time(self.logger,
-                 locations_results["start_time"],
-                 locations_results["end_time"],
-                 "scrape",
-                 "locations")
-
-        # Get vendors from npcs search page with vendors filter
-        vendors_results = self.scrape_vendors()
-        log_time(self.logger,
-                 vendors_results["start_time"],
-                 vendors_results["end_time"],
-                 "scrape",
-                 "vendors")
-
-        # Get reagents from items search page with reagent filter
-        reagents_results = self.scrape_reagents()
-        log_time(self.logger,
-                 reagents_results["start_time"],
-                 reagents_results["end_time"],
-                 "scrape",
-                 "reagents")
-
-        # Get enchantments from spells search page with enchantment and has reagents filter
-        enchantments_results = self.scrape_enchantments()
-        log_time(self.logger,
-                 enchantments_results["start_time"],
-                 enchantments_results["end_time"],
-                 "scrape",
-                 "enchantments")
-
-        # Get crafted items from items search page with crafted by profession filter for each profession
-        # Also include >= 0 sale price filter to include sale price in results
-        craftable_items_results = self.scrape_craftable_items()
-        log_time(self.logger,
-                 craftable_items_results["start_time"],
-                 craftable_items_results["end_time"],
-                 "scrape",
-                 "craftable items")
+        # Clear data directory, but keep the cached pages
+        # When resuming, keep the data of the stages that already finished as well
+        if self.resume and self.checkpoints.has_checkpoints():
+            self.logger.log("Resuming from the checkpoint manifest.")
+        else:
+            clear_data_results = self.clear_data(keep_cache=True)
+            log_time(self.logger,
+                     clear_data_results["start_time"],
+                     clear_data_results["end_time"],
+                     "clear",
+                     "data cache")
 
-        # Get profession data from profession page for each profession
-        # Including: trainers, recipes, and recipe items
-        profession_data_results = self.scrape_profession_data()
-        log_time(self.logger,
-                 profession_data_results["start_time"],
-                 profession_data_results["end_time"],
-                 "scrape",
-                 "profession data")
+        # Run the stages, every stage starts as soon as the stages it depends on are done
+        stage_timings = StageScheduler(self.logger, self.stages, self.maximum_parallel_stages).run(self.run_stage)
+        start_time = min([timing["start_time"] for timing in stage_timings.values()])
 
-        # Get recipe specialisations
-        recipe_specialisation_results = self.scrape_specialisation_recipes()
-        log_time(self.logger,
-                 recipe_specialisation_results["start_time"],
-                 recipe_specialisation_results["end_time"],
-                 "scrape",
-                 "profession specialisations")
+        # Write the snapshot for the next delta run and the changes since the previous one
+        self.save_snapshot([table_name for stage in self.stages.values() for table_name in stage["outputs"]])
 
         # Check if the scraped data meets the database schema
         check_data_results = self.check_data()
@@ -157,21 +244,138 @@ class WowheadScraper:
                  "check",
                  "scraped data")
 
+        # Log how often connections were reused and how requests were throttled
+        self.fetcher.log_statistics()
+
+        # Keep the icons for the next run
+        self.icon_index.save()
+        self.icon_index.log_statistics()
+
         # Log total time
         log_time(self.logger,
-                 professions_results["start_time"],
+                 start_time,
                  check_data_results["end_time"],
                  "scrape",
                  "scraped data")
 
         results = {
-            "start_time": professions_results["start_time"],
+            "start_time": start_time,
             "end_time": check_data_results["end_time"]
         }
 
         return results
 
-    def clear_data(self):
+    def create_stage(self, stage_function, action: str, description: str, inputs: tuple, outputs: tuple):
+
+        return {
+            "function": stage_function,
+            "action": action,
+            "description": description,
+            "inputs": inputs,
+            "outputs": outputs
+        }
+
+    def scrape_stage(self, stage_name: str):
+
+        # A single stage writes the snapshot as well, the tables and entities of the other stages are kept,
+        # so the next delta run only reports what changed since this one
+        results = self.run_stage(stage_name)
+        self.save_snapshot(self.stages[stage_name]["outputs"])
+
+        return results
+
+    def save_snapshot(self, table_names: iter):
+
+        table_names = sorted(set(table_names))
+        self.snapshot.record_tables({table_name: self.entity_store.read(table_name) for table_name in table_names})
+        self.snapshot.save()
+
+    def run_stage(self, stage_name: str):
+
+        stage = self.stages[stage_name]
+        action = stage["action"]
+        description = stage["description"]
+
+        # Skip stages that finished before a restart with the same inputs, their tables are read back from the psv files
+        # The tables a stage writes itself don't count as its inputs
+        input_hash = self.checkpoints.hash_inputs([self.entity_store.get_file_path(table_name)
+                                                   for table_name in stage["inputs"]
+                                                   if table_name not in stage["outputs"]])
+        if self.resume and self.checkpoints.is_stage_finished(stage_name, input_hash):
+            self.logger.log(f"Skipping {action} {description}, it finished before.")
+            skip_time = time.time()
+            return {
+                "start_time": skip_time,
+                "end_time": skip_time
+            }
+
+        self.checkpoints.start_stage(stage_name, self.resume)
+        if self.inline_validator is not None:
+            self.inline_validator.start_stage(stage_name)
+        results = stage["function"]()
+        log_time(self.logger,
+                 results["start_time"],
+                 results["end_time"],
+                 action,
+                 description)
+        self.checkpoints.finish_stage(stage_name, input_hash)
+
+        return results
+
+    def scrape_checkpointed_entities(self,
+                                     stage_name: str,
+                                     entity_name: str,
+                                     keys: iter,
+                                     scrape_function,
+                                     contents: dict = None,
+                                     chunk_size: int = 32,
+                                     entity_function=None):
+
+        # Reuse the entities that were scraped before a restart and scrape the rest in chunks,
+        # every chunk is recorded as soon as it is done, so a crash only loses the current chunk
+        keys = tuple(keys)
+        next_index = 0
+
+        # Entities are handed to the entity function in the order of the keys as soon as they are there,
+        # so the rows of a stage are produced chunk by chunk
+        def hand_over_entities():
+
+            nonlocal next_index
+            while entity_function is not None and next_index < len(keys) and keys[next_index] in entities:
+                entity_function(next_index, entities[keys[next_index]])
+                next_index += 1
+
+        # The content of an entity is the listview data its detail page is fetched for, without it only the key counts
+        # Checkpointed entities whose content changed since they were scraped are scraped again
+        content_hashes = {key: hash_content(contents[key] if contents is not None else key)
+                          for key in dict.fromkeys(keys)}
+        entities = self.checkpoints.get_entities(stage_name, entity_name, content_hashes) if self.resume else {}
+        missing_keys = [key for key in dict.fromkeys(keys) if key not in entities]
+        if len(keys) > len(missing_keys):
+            self.logger.log(f"Reusing {len(set(keys)) - len(missing_keys)} checkpointed {entity_name}.")
+        if self.delta:
+            unchanged_entities = self.snapshot.get_unchanged_entities(
+                entity_name,
+                {key: content_hashes[key] for key in missing_keys})
+            entities.update(unchanged_entities)
+            missing_keys = [key for key in missing_keys if key not in unchanged_entities]
+            self.logger.log(f"Reusing {len(unchanged_entities)} unchanged {entity_name} of the previous snapshot, "
+                            f"getting {len(missing_keys)} new or changed {entity_name}.")
+        hand_over_entities()
+
+        for offset in range(0, len(missing_keys), chunk_size):
+
+            chunk_keys = missing_keys[offset:offset + chunk_size]
+            chunk_entities = dict(zip(chunk_keys, scrape_function(chunk_keys)))
+            self.checkpoints.record_entities(stage_name, entity_name, chunk_entities, content_hashes)
+            entities.update(chunk_entities)
+            hand_over_entities()
+
+        self.snapshot.record_entities(entity_name, entities, content_hashes)
+
+        return tuple([entities[key] for key in keys])
+
+    def clear_data(self, keep_cache: bool = False):
 
         # Start timer
         start_time = time.time()
@@ -181,7 +385,19 @@ class WowheadScraper:
             os.makedirs("data")
 
         # Delete all files and directories
-        self.clear_directory("data/")
+        if not keep_cache:
+            if self.fetcher.response_cache is not None:
+                self.fetcher.response_cache.clear()
+            self.icon_index.clear()
+            self.snapshot.clear()
+        excluded_names = ("cache",
+                          os.path.basename(self.icon_index.file_path),
+                          os.path.basename(self.snapshot.file_path)) if keep_cache else ()
+        self.entity_store.clear()
+        if self.inline_validator is not None:
+            self.inline_validator.clear()
+        self.checkpoints.reset()
+        self.clear_directory("data/", excluded_names)
 
         # End timer
         end_time = time.time()
@@ -200,10 +416,10 @@ class WowheadScraper:
         start_time = time.time()
 
         # Create sources psv file
-        sources = tuple([{"name": source} for source in self.sources.values()])
-        self.create_psv_file("data/source",
-                             self.get_header_names(self.domain, "source"),
-                             sources)
+        self.entity_store.write("source", [{"name": source} for source in self.sources.values()])
+
+        # Write the changed tables to their psv files
+        self.entity_store.flush()
 
         # End timer
         end_time = time.time()
@@ -249,14 +465,35 @@ class WowheadScraper:
         # Start timer
         start_time = time.time()
 
-        # Scrape main professions
+        # Rows are written into the professions and specialisations tables as they are found
+        with self.entity_store.open_sinks(("profession", "specialisation")) as sinks:
+
+            # Scrape main professions
+            self.scrape_main_professions(sinks["profession"], sinks["specialisation"])
+
+            # Scrape secondary professions
+            self.scrape_secondary_professions(sinks["profession"])
+
+        # Write the changed tables to their psv files
+        self.entity_store.flush()
+
+        # End timer
+        end_time = time.time()
+
+        results = {
+            "start_time": start_time,
+            "end_time": end_time
+        }
+
+        return results
+
+    def scrape_main_professions(self, professions: TableSink, specialisations: TableSink):
+
         main_professions_data = self.get_main_professions()["main_professions"]
-        main_professions = []
-        specialisations = []
         for profession in main_professions_data:
 
             name = profession["name"].rstrip()
-            main_professions.append({
+            professions.write({
                 "name": name,
                 "wowhead_id": profession["id"],
                 "wowhead_link_url": "{wowhead_url}/{name}".format(
@@ -284,7 +521,7 @@ class WowheadScraper:
                 if spell["name"] != profession["name"] and \
                         spell.get("specialization", None) is not None:
                     name = spell["name"].rstrip()
-                    specialisations.append({
+                    specialisations.write({
                         "name": name,
                         "wowhead_id": spell["id"],
                         "wowhead_link_url": "{wowhead_url}/spell={id}/{name}".format(
@@ -298,23 +535,19 @@ class WowheadScraper:
                         "profession_name": profession["name"]
                     })
 
-        # Turn main professions and specialisations list into tuple
-        main_professions = tuple(main_professions)
-        specialisations = tuple(specialisations)
+    def scrape_secondary_professions(self, professions: TableSink):
 
-        # Scrape secondary professions
         secondary_professions_data = self.get_secondary_professions()["secondary_professions"]
         known_secondary_professions = ("Cooking",
                                        "First Aid",
                                        "Fishing")
-        secondary_professions = []
         for profession in secondary_professions_data:
 
             if profession["name"] in known_secondary_professions:
                 name = ((profession["name"]
                          .rstrip())
                         .replace("'", "''"))
-                secondary_professions.append({
+                professions.write({
                     "name": name,
                     "wowhead_id": profession["id"],
                     "wowhead_link_url": "{wowhead_url}/{name}".format(
@@ -328,30 +561,6 @@ class WowheadScraper:
                     "is_main_profession": False
                 })
 
-        # Turn secondary professions list into tuple
-        secondary_professions = tuple(secondary_professions)
-
-        # Create professions psv file
-        professions = main_professions + secondary_professions
-        self.create_psv_file("data/profession",
-                             self.get_header_names(self.domain, "profession"),
-                             professions)
-
-        # Create specialisations psv file
-        self.create_psv_file("data/specialisation",
-                             self.get_header_names(self.domain, "specialisation"),
-                             specialisations)
-
-        # End timer
-        end_time = time.time()
-
-        results = {
-            "start_time": start_time,
-            "end_time": end_time
-        }
-
-        return results
-
     def get_locations(self):
 
         return self.scrape_table_page("/zones",
@@ -382,45 +591,13 @@ class WowheadScraper:
             4: "PvP"
         }
 
-        locations = []
-        for location in locations_data:
-
-            # Determine location category index
-            location["category"] = int(location["category"])
-            if location["category"] == -1:
-                location_category_index = 0
-            # 0 is a location in the Eastern Kingdom and 1 is a location in Kalimdor
-            elif location["category"] == 0 or location["category"] == 1:
-                location_category_index = 1
-            else:
-                location_category_index = location["category"]
-
-            # Format data
-            name = location["name"].rstrip()
-            locations.append({
-                "name": name,
-                "wowhead_id": location["id"],
-                "wowhead_link_url": "{wowhead_url}/{name}".format(
-                    wowhead_url=self.wowhead_url,
-                    name=(((location["name"]
-                            .lower())
-                           .replace("'", ""))
-                          .replace(" ", "-"))
-                ),
-                "location_type": location_types[location_category_index],
-                "faction_status": faction_states[location["territory"]],
-                "required_level": location.get("reqlevel", None),
-                "minimum_level": location.get("minlevel", None),
-                "maximum_level": location.get("maxlevel", None)
-            })
+        with self.entity_store.open_sink("location") as locations:
+            for location in locations_data:
 
-        # Turn locations list into tuple
-        locations = tuple(locations)
+                self.write_location(locations, location, location_types, faction_states)
 
-        # Create locations psv file
-        self.create_psv_file("data/location",
-                             self.get_header_names(self.domain, "location"),
-                             locations)
+        # Write the changed tables to their psv files
+        self.entity_store.flush()
 
         # End timer
         end_time = time.time()
@@ -432,6 +609,37 @@ class WowheadScraper:
 
         return results
 
+    def write_location(self, locations: TableSink, location: dict, location_types: dict, faction_states: dict):
+
+        # Determine location category index
+        location["category"] = int(location["category"])
+        if location["category"] == -1:
+            location_category_index = 0
+        # 0 is a location in the Eastern Kingdom and 1 is a location in Kalimdor
+        elif location["category"] == 0 or location["category"] == 1:
+            location_category_index = 1
+        else:
+            location_category_index = location["category"]
+
+        # Format data
+        name = location["name"].rstrip()
+        locations.write({
+            "name": name,
+            "wowhead_id": location["id"],
+            "wowhead_link_url": "{wowhead_url}/{name}".format(
+                wowhead_url=self.wowhead_url,
+                name=(((location["name"]
+                        .lower())
+                       .replace("'", ""))
+                      .replace(" ", "-"))
+            ),
+            "location_type": location_types[location_category_index],
+            "faction_status": faction_states[location["territory"]],
+            "required_level": location.get("reqlevel", None),
+            "minimum_level": location.get("minlevel", None),
+            "maximum_level": location.get("maxlevel", None)
+        })
+
     def get_vendors(self):
 
         return self.scrape_table_page("/npcs?filter=29;1;0",
@@ -446,63 +654,17 @@ class WowheadScraper:
         start_time = time.time()
 
         # Read locations
-        known_locations = self.get_data_tuple_from_psv("data/location")
+        known_locations = self.entity_store.get_index("location")
 
         # Scrape vendors
         vendors_data = self.get_vendors()["vendors"]
-        vendors = []
-        vendor_location = []
-        for vendor in vendors_data:
-
-            # Get reactions
-            reactions = self.process_reactions(vendor)
-
-            # Find location names
-            locations = []
-            for location in vendor.get("location", []):
+        with self.entity_store.open_sinks(("vendor", "location_vendor")) as sinks:
+            for vendor in vendors_data:
 
-                for known_location in known_locations:
+                self.write_vendor(sinks["vendor"], sinks["location_vendor"], vendor, known_locations)
 
-                    if int(known_location["wowhead_id"]) == location:
-                        locations.append(known_location["name"])
-
-            locations = tuple(locations)
-
-            # Format data
-            name = vendor["name"].rstrip()
-            vendors.append({
-                "name": name,
-                "wowhead_id": vendor["id"],
-                "wowhead_link_url": "{wowhead_url}/npc={id}/{name}".format(
-                    wowhead_url=self.wowhead_url,
-                    id=vendor["id"],
-                    name=(((vendor["name"]
-                            .lower())
-                           .replace("'", ""))
-                          .replace(" ", "-"))
-                ),
-                "reaction_to_alliance": reactions["alliance"],
-                "reaction_to_horde": reactions["horde"]
-            })
-
-            for location in locations:
-                vendor_location.append({
-                    "vendor_name": vendor["name"],
-                    "location_name": location
-                })
-
-        vendors = tuple(vendors)
-        vendor_location = tuple(vendor_location)
-
-        # Create vendors psv file
-        self.create_psv_file("data/vendor",
-                             self.get_header_names(self.domain, "vendor"),
-                             vendors)
-
-        # Create vendor location psv file
-        self.create_psv_file("data/location_vendor",
-                             self.get_header_names(self.domain, "location_vendor"),
-                             vendor_location)
+        # Write the changed tables to their psv files
+        self.entity_store.flush()
 
         # End timer
         end_time = time.time()
@@ -514,6 +676,43 @@ class WowheadScraper:
 
         return results
 
+    def write_vendor(self, vendors: TableSink, vendor_location: TableSink, vendor: dict, known_locations: EntityIndex):
+
+        # Get reactions
+        reactions = self.process_reactions(vendor)
+
+        # Find location names
+        locations = []
+        for location in vendor.get("location", []):
+
+            for known_location in known_locations.get_all_by_id(location):
+                locations.append(known_location["name"])
+
+        locations = tuple(locations)
+
+        # Format data
+        name = vendor["name"].rstrip()
+        vendors.write({
+            "name": name,
+            "wowhead_id": vendor["id"],
+            "wowhead_link_url": "{wowhead_url}/npc={id}/{name}".format(
+                wowhead_url=self.wowhead_url,
+                id=vendor["id"],
+                name=(((vendor["name"]
+                        .lower())
+                       .replace("'", ""))
+                      .replace(" ", "-"))
+            ),
+            "reaction_to_alliance": reactions["alliance"],
+            "reaction_to_horde": reactions["horde"]
+        })
+
+        for location in locations:
+            vendor_location.write({
+                "vendor_name": vendor["name"],
+                "location_name": location
+            })
+
     def get_reagents(self):
 
         return self.scrape_listview_page("items",
@@ -528,71 +727,40 @@ class WowheadScraper:
         # Start timer
         start_time = time.time()
 
-        result = self.get_reagents()
-        reagents_data = result["reagents"]
-        icons = result["icons"]
-        reagents = []
-        reagent_sources = []
-        reagent_vendors = ()
-        for index, reagent in enumerate(reagents_data):
-
-            # Log status update
-            self.logger.log(f"Getting reagent {index + 1} of {len(reagents_data)}.")
-
-            # If reagent is buyable, then get vendors
-            if 5 in reagent.get("source", []):
-                reagent_details = self.scrape_reagent_details(reagent["name"],
-                                                              "/item={id}/{name}".format(
-                                                                  wowhead_url=self.wowhead_url,
-                                                                  id=reagent["id"],
-                                                                  name=(((reagent["name"]
-                                                                          .lower())
-                                                                         .replace("'", ""))
-                                                                        .replace(" ", "-"))
-                                                              ))
-
-                reagent_vendors += reagent_details["reagent_vendors"]
-
-            # Format data
-            name = reagent["name"].rstrip()
-            reagents.append({
-                "name": name,
-                "wowhead_id": reagent["id"],
-                "wowhead_link_url": "{wowhead_url}/item={id}/{name}".format(
-                    wowhead_url=self.wowhead_url,
-                    id=reagent["id"],
-                    name=(((reagent["name"]
-                            .lower())
-                           .replace("'", ""))
-                          .replace(" ", "-"))
-                ),
-                "icon_link_url": self.format_icon_link(icons[reagent["name"].replace("''", "'")])
-            })
-
-            # Format sources
-            for source in reagent.get("source", []):
-                source = str(source)
-                reagent_sources.append({
-                    "reagent_name": reagent["name"],
-                    "source_name": self.sources[source],
-                })
-
-        reagents = tuple(reagents)
-        reagent_sources = tuple(reagent_sources)
-
-        # Create reagents psv file
-        self.create_psv_file("data/reagent",
-                             self.get_header_names(self.domain, "reagent"),
-                             reagents)
-
-        # Create reagent sources psv file
-        self.create_psv_file("data/reagent_source",
-                             self.get_header_names(self.domain, "reagent_source"),
-                             reagent_sources)
-
-        self.create_psv_file("data/reagent_vendor",
-                             self.get_header_names(self.domain, "reagent_vendor"),
-                             reagent_vendors)
+        reagents_data = self.get_reagents()["reagents"]
+
+        # If reagent is buyable, then get vendors
+        buyable_reagents = tuple(filter(lambda elem: 5 in elem.get("source", []), reagents_data))
+        self.logger.log(f"Getting vendors of {len(buyable_reagents)} buyable reagents.")
+        sold_by_urls = {str(reagent["id"]): "/item={id}/{name}".format(
+            id=reagent["id"],
+            name=(((reagent["name"]
+                    .lower())
+                   .replace("'", ""))
+                  .replace(" ", "-"))
+        ) for reagent in buyable_reagents}
+        with self.entity_store.open_sinks(("reagent", "reagent_source", "reagent_vendor")) as sinks:
+
+            # The vendors of every chunk of reagents are written as soon as the chunk is scraped
+            self.scrape_checkpointed_entities(
+                "reagents",
+                "reagent_vendors",
+                [str(reagent["id"]) for reagent in buyable_reagents],
+                lambda reagent_ids: [page["sold_by"] for page in self.scrape_table_pages(
+                    [sold_by_urls[reagent_id] for reagent_id in reagent_ids],
+                    ("sold-by",),
+                    ("sold_by",))],
+                {str(reagent["id"]): reagent for reagent in buyable_reagents},
+                entity_function=lambda index, reagent_sold_by_data: sinks["reagent_vendor"].write_rows(
+                    self.process_reagent_vendors(buyable_reagents[index]["name"],
+                                                 reagent_sold_by_data)["reagent_vendors"]))
+
+            for reagent in reagents_data:
+
+                self.write_reagent(sinks["reagent"], sinks["reagent_source"], reagent)
+
+        # Write the changed tables to their psv files
+        self.entity_store.flush()
 
         # End timer
         end_time = time.time()
@@ -604,14 +772,35 @@ class WowheadScraper:
 
         return results
 
-    def scrape_reagent_details(self, reagent_name: str, relative_reagent_link: str):
+    def write_reagent(self, reagents: TableSink, reagent_sources: TableSink, reagent: dict):
+
+        # Format data
+        name = reagent["name"].rstrip()
+        reagents.write({
+            "name": name,
+            "wowhead_id": reagent["id"],
+            "wowhead_link_url": "{wowhead_url}/item={id}/{name}".format(
+                wowhead_url=self.wowhead_url,
+                id=reagent["id"],
+                name=(((reagent["name"]
+                        .lower())
+                       .replace("'", ""))
+                      .replace(" ", "-"))
+            ),
+            "icon_link_url": self.get_icon_link_url("item", reagent["id"], reagent["name"])
+        })
+
+        # Format sources
+        for source in reagent.get("source", []):
+            source = str(source)
+            reagent_sources.write({
+                "reagent_name": reagent["name"],
+                "source_name": self.sources[source],
+            })
+
+    def process_reagent_vendors(self, reagent_name: str, sold_by_data: iter):
 
-        # Get vendors of reagent
         reagent_vendors = []
-        sold_by_data = self.scrape_table_page(relative_reagent_link,
-                                              ("sold-by",),
-                                              ("sold_by",)
-                                              )["sold_by"]
         for vendor in sold_by_data:
             reagent_vendors.append({
                 "vendor_name": vendor["name"],
@@ -642,34 +831,30 @@ class WowheadScraper:
 
         enchantment_data = self.get_enchantments()["enchantments"]
 
-        enchantments = []
-        for enchantment in enchantment_data:
-            name = enchantment["name"].rstrip()
-            enchantments.append({
-                "name": name,
-                "wowhead_id": enchantment["id"],
-                "wowhead_link_url": "{wowhead_url}/spell={id}/{name}".format(
-                    wowhead_url=self.wowhead_url,
-                    id=enchantment["id"],
-                    name=((((enchantment["name"]
-                             .lower())
-                            .replace(" - ", " "))
-                           .replace(" ", "-"))
-                          .replace("'", "''"))
-                ),
-                "icon_link_url": self.format_icon_link("spell_holy_greaterheal"),
-                "item_category": ((enchantment["name"]
-                                   .replace("Enchant ", ""))
-                                  .split(" - ")
-                                  )[0]
-            })
-
-        enchantments = tuple(enchantments)
+        with self.entity_store.open_sink("enchantment") as enchantments:
+            for enchantment in enchantment_data:
+                name = enchantment["name"].rstrip()
+                enchantments.write({
+                    "name": name,
+                    "wowhead_id": enchantment["id"],
+                    "wowhead_link_url": "{wowhead_url}/spell={id}/{name}".format(
+                        wowhead_url=self.wowhead_url,
+                        id=enchantment["id"],
+                        name=((((enchantment["name"]
+                                 .lower())
+                                .replace(" - ", " "))
+                               .replace(" ", "-"))
+                              .replace("'", "''"))
+                    ),
+                    "icon_link_url": self.format_icon_link("spell_holy_greaterheal"),
+                    "item_category": ((enchantment["name"]
+                                       .replace("Enchant ", ""))
+                                      .split(" - ")
+                                      )[0]
+                })
 
-        # Create enchantment psv file
-        self.create_psv_file("data/enchantment",
-                             self.get_header_names(self.domain, "enchantment"),
-                             enchantments)
+        # Write the changed tables to their psv files
+        self.entity_store.flush()
 
         # End timer
         end_time = time.time()
@@ -683,7 +868,7 @@ class WowheadScraper:
 
     def get_craftable_items(self):
 
-        professions = self.get_data_tuple_from_psv("data/profession")
+        professions = self.entity_store.read("profession")
 
         craftable_items = {}
         icons = {}
@@ -698,17 +883,14 @@ class WowheadScraper:
             "Mining": 9,
             "Tailoring": 10
         }
-        for profession in professions:
-
-            filter_id = filter_ids.get(profession["name"], None)
-            if filter_id is None:
-                continue
-            else:
-                result = self.scrape_listview_page("items",
-                                                   "craftable_items",
-                                                   f"/items?filter=86:64;{filter_id}:2;0:0")
-                craftable_items[profession["name"]] = result["craftable_items"]
-                icons.update(result["icons"])
+        crafting_professions = tuple(filter(lambda elem: elem["name"] in filter_ids, professions))
+        results = self.scrape_listview_pages("items",
+                                             "craftable_items",
+                                             [f"/items?filter=86:64;{filter_ids[profession['name']]}:2;0:0"
+                                              for profession in crafting_professions])
+        for profession, result in zip(crafting_professions, results):
+            craftable_items[profession["name"]] = result["craftable_items"]
+            icons.update(result["icons"])
 
         return {
             "craftable_items": craftable_items,
@@ -721,51 +903,47 @@ class WowheadScraper:
         # Start timer
         start_time = time.time()
 
-        result = self.get_craftable_items()
-        craftable_items_data = result["craftable_items"]
-        icons = result["icons"]
+        craftable_items_data = self.get_craftable_items()["craftable_items"]
 
-        craftable_items = []
-        craftable_item_ids = []
-        for profession_name in craftable_items_data:
+        craftable_item_ids = set()
+        with self.entity_store.open_sink("craftable_item") as craftable_items:
+            for profession_name in craftable_items_data:
 
-            for craftable_item in craftable_items_data[profession_name]:
+                for craftable_item in craftable_items_data[profession_name]:
 
-                # Check for duplicate items
-                if craftable_item["id"] in craftable_item_ids:
-                    continue
-
-                # Process icon link url
-                # icon = craftable_item.get("sourcemore", [{}])[0].get("icon", None)
-                # icon_link_url = None if icon is None else self.format_icon_link(icon)
+                    # Check for duplicate items
+                    if craftable_item["id"] in craftable_item_ids:
+                        continue
 
-                # Add data to lists
-                craftable_item_ids.append(craftable_item["id"])
+                    # Process icon link url
+                    # icon = craftable_item.get("sourcemore", [{}])[0].get("icon", None)
+                    # icon_link_url = None if icon is None else self.format_icon_link(icon)
 
-                name = craftable_item["name"].rstrip()
-                slot = str(craftable_item["slot"])
-                craftable_items.append({
-                    "name": name,
-                    "wowhead_id": craftable_item["id"],
-                    "wowhead_link_url": "{wowhead_url}/item={id}/{name}".format(
-                        wowhead_url=self.wowhead_url,
-                        id=craftable_item["id"],
-                        name=(((craftable_item["name"]
-                                .lower())
-                               .replace(" ", "-"))
-                              .replace("'", "''"))
-                    ),
-                    "icon_link_url": self.format_icon_link(icons[craftable_item["name"].replace("''", "'")]),
-                    "item_slot": self.item_slots[slot],
-                    "sell_price": craftable_item.get("sellprice", None)
-                })
+                    # Add data to lists
+                    craftable_item_ids.add(craftable_item["id"])
 
-        craftable_items = tuple(craftable_items)
+                    name = craftable_item["name"].rstrip()
+                    slot = str(craftable_item["slot"])
+                    craftable_items.write({
+                        "name": name,
+                        "wowhead_id": craftable_item["id"],
+                        "wowhead_link_url": "{wowhead_url}/item={id}/{name}".format(
+                            wowhead_url=self.wowhead_url,
+                            id=craftable_item["id"],
+                            name=(((craftable_item["name"]
+                                    .lower())
+                                   .replace(" ", "-"))
+                                  .replace("'", "''"))
+                        ),
+                        "icon_link_url": self.get_icon_link_url("item",
+                                                                craftable_item["id"],
+                                                                craftable_item["name"]),
+                        "item_slot": self.item_slots[slot],
+                        "sell_price": craftable_item.get("sellprice", None)
+                    })
 
-        # Create craftable item psv file
-        self.create_psv_file("data/craftable_item",
-                             self.get_header_names(self.domain, "craftable_item"),
-                             craftable_items)
+        # Write the changed tables to their psv files
+        self.entity_store.flush()
 
         # End timer
         end_time = time.time()
@@ -779,7 +957,7 @@ class WowheadScraper:
 
     def get_profession_data(self):
 
-        professions = self.get_data_tuple_from_psv("data/profession")
+        professions = self.entity_store.read("profession")
 
         professions_data = {}
         for profession in professions:
@@ -815,273 +993,209 @@ class WowheadScraper:
         start_time = time.time()
 
         profession_data = self.get_profession_data()["professions"]
-        locations = self.get_data_tuple_from_psv("data/location")
-        enchantments = self.get_data_tuple_from_psv("data/enchantment")
-        craftable_items = self.get_data_tuple_from_psv("data/craftable_item")
-        reagents = self.get_data_tuple_from_psv("data/reagent")
-
-        trainers = []
-        profession_trainers = []
-        recipe_items = []
-        recipes = []
-        reagent_recipes = []
-        recipe_trainers = []
-        for profession_name in profession_data:
-
-            for index, trainer in enumerate(profession_data[profession_name].get("trainers", [])):
-
-                # Log status update
-                self.logger.log(f"Getting {profession_name} trainer {index + 1} of "
-                                f"{len(profession_data[profession_name]['trainers'])}.")
-
-                # Get reactions
-                reactions = self.process_reactions(trainer)
-
-                # Get location
-                location = {
-                    "name": "Unknown"
-                }
-                if trainer.get("location", None) is not None:
-                    for known_location in locations:
-
-                        if int(known_location["wowhead_id"]) == trainer["location"][0]:
-                            location = known_location
-
-                name = trainer["name"].rstrip()
-                trainers.append({
-                    "name": name,
-                    "wowhead_id": trainer["id"],
-                    "wowhead_link_url": "{wowhead_url}/npc={id}/{name}".format(
-                        wowhead_url=self.wowhead_url,
+        locations = self.entity_store.get_index("location")
+        enchantments = self.entity_store.get_index("enchantment")
+        craftable_items = self.entity_store.get_index("craftable_item")
+        reagents = self.entity_store.get_index("reagent")
+
+        # Rows are written into the tables as they are produced, the tables are replaced when the stage is done
+        with self.entity_store.open_sinks(("trainer",
+                                           "profession_trainer",
+                                           "recipe_trainer",
+                                           "recipe_item",
+                                           "reagent",
+                                           "recipe",
+                                           "reagent_recipe"),
+                                          append_table_names=("reagent",)) as sinks:
+
+            trainer_names = []
+            trainer_recipe_urls = []
+            trainer_recipe_contents = {}
+            for profession_name in profession_data:
+
+                for trainer in profession_data[profession_name].get("trainers", []):
+
+                    # Get reactions
+                    reactions = self.process_reactions(trainer)
+
+                    # Get location
+                    location = {
+                        "name": "Unknown"
+                    }
+                    if trainer.get("location", None) is not None:
+                        location = locations.get_by_id(trainer["location"][0], location)
+
+                    name = trainer["name"].rstrip()
+                    sinks["trainer"].write({
+                        "name": name,
+                        "wowhead_id": trainer["id"],
+                        "wowhead_link_url": "{wowhead_url}/npc={id}/{name}".format(
+                            wowhead_url=self.wowhead_url,
+                            id=trainer["id"],
+                            name=(((trainer["name"]
+                                    .lower())
+                                   .replace(" ", "-"))
+                                  .replace("'", "''"))
+                        ),
+                        "reaction_to_alliance": reactions["alliance"],
+                        "reaction_to_horde": reactions["horde"],
+                        "location_name": location["name"]
+                    })
+
+                    sinks["profession_trainer"].write({
+                        "trainer_name": trainer["name"],
+                        "profession_name": profession_name
+                    })
+
+                    trainer_recipe_url = "/npc={id}/{name}".format(
                         id=trainer["id"],
-                        name=(((trainer["name"]
+                        name=(((location["name"]
                                 .lower())
                                .replace(" ", "-"))
                               .replace("'", "''"))
-                    ),
-                    "reaction_to_alliance": reactions["alliance"],
-                    "reaction_to_horde": reactions["horde"],
-                    "location_name": location["name"]
-                })
-
-                profession_trainers.append({
-                    "trainer_name": trainer["name"],
-                    "profession_name": profession_name
-                })
-
-                current_trainer_recipes = self.scrape_table_page("/npc={id}/{name}".format(
-                    wowhead_url=self.wowhead_url,
-                    id=trainer["id"],
-                    name=(((location["name"]
-                            .lower())
-                           .replace(" ", "-"))
-                          .replace("'", "''"))
-                ),
-                    ("teaches-recipe",),
-                    ("recipes",)
-                )["recipes"]
-                for recipe in current_trainer_recipes:
-
-                    if recipe.get("reagents", None) is not None:
-                        recipe_trainers.append({
-                            "recipe_name": recipe["name"],
-                            "trainer_name": trainer["name"]
-                        })
-
-        trainers = tuple(trainers)
-        profession_trainers = tuple(profession_trainers)
-        recipe_trainers = tuple(recipe_trainers)
-
-        for profession_name in profession_data:
-
-            icons = profession_data[profession_name].get("icons", {})
-            for recipe_item in profession_data[profession_name].get("recipe_items", []):
-                name = recipe_item["name"].rstrip()
-                icon_name = icons[((name
-                                    .replace("''", "'"))
-                                   .replace("`", '"'))]
-                icon_link_url = self.format_icon_link(icon_name)
-                recipe_items.append({
-                    "name": name,
-                    "wowhead_id": recipe_item["id"],
-                    "wowhead_link_url": "{wowhead_url}/item={id}/{name}".format(
-                        wowhead_url=self.wowhead_url,
-                        id=recipe_item["id"],
-                        name=((((((recipe_item["name"]
-                                   .lower())
-                                  .replace(":", ""))
-                                 .replace(" - ", " "))
-                                .replace(" ", "-"))
-                               .replace("'", "''"))
-                              .replace("`", '"'))
-                    ),
-                    "icon_link_url": icon_link_url,
-                    "required_skill_level": recipe_item["skill"],
-                    "profession_name": profession_name
-                })
-
-        recipe_items = tuple(recipe_items)
-
-        unknown_reagents = []
-        unknown_reagent_ids = {}
-        for profession_name in profession_data:
-
-            icons = profession_data[profession_name].get("icons", {})
-            for recipe in profession_data[profession_name].get("recipes", []):
-
-                # Get skill categories
-                difficulty_data = self.process_difficulty(recipe)
-
-                # Check if recipe is trained by recipe item
-                recipe_item_name = None
-                for recipe_item in recipe_items:
-
-                    recipe_item_name_without_prefix = recipe_item["name"].split(": ")[1] \
-                        if len(recipe_item["name"].split(": ")) > 1 \
-                        else recipe_item["name"]
-                    if recipe_item_name_without_prefix == recipe["name"]:
-                        recipe_item_name = recipe_item["name"]
-
-                # Check if recipe produces a craftable item or an enchantment
-                enchantment_name = None
-                for enchantment in enchantments:
-
-                    if enchantment["name"] == recipe["name"]:
-                        enchantment_name = enchantment["name"]
-
-                craftable_item_name = None
-                for craftable_item in craftable_items:
-
-                    if craftable_item["name"] == recipe["name"]:
-                        craftable_item_name = craftable_item["name"]
-
-                name = recipe["name"].rstrip()
-                icon_name = icons[((name
-                                    .replace("''", "'"))
-                                   .replace("`", '"'))]
-                icon_link_url = self.format_icon_link(icon_name)
-                minimum_amount_created = recipe.get("creates", [1, 1, 1])[1]
-                if minimum_amount_created < 1:
-                    minimum_amount_created = 1
-                maximum_amount_created = recipe.get("creates", [1, 1, 1])[2]
-                if maximum_amount_created < 1:
-                    maximum_amount_created = minimum_amount_created
-                recipes.append({
-                    "name": f"{name} - {profession_name}",
-                    "wowhead_id": recipe["id"],
-                    "wowhead_link_url": "{wowhead_url}/spell={id}/{name}".format(
-                        wowhead_url=self.wowhead_url,
-                        id=recipe["id"],
-                        name=(((((name
-                                  .lower())
-                                 .replace(" - ", " "))
-                                .replace(" ", "-"))
-                               .replace("'", ""))
-                              .replace("`", ""))
-                    ),
-                    "icon_link_url": icon_link_url,
-                    "difficulty_requirement": difficulty_data["requirement"],
-                    "difficulty_category_1": difficulty_data["categories"][0],
-                    "difficulty_category_2": difficulty_data["categories"][1],
-                    "difficulty_category_3": difficulty_data["categories"][2],
-                    "difficulty_category_4": difficulty_data["categories"][3],
-                    "minimum_amount_created": minimum_amount_created,
-                    "maximum_amount_created": maximum_amount_created,
-                    "training_cost": recipe.get("trainingcost", None),
-                    "profession_name": profession_name,
-                    "recipe_item_name": recipe_item_name,
-                    "craftable_item_name": craftable_item_name,
-                    "enchantment_name": enchantment_name
-                })
-
-                for reagent in recipe.get("reagents", []):
-
-                    reagent_name = None
-                    for known_reagent in reagents:
-
-                        if int(known_reagent["wowhead_id"]) == reagent[0]:
-                            reagent_name = known_reagent["name"]
-
-                    # If reagent is unknown, add it to reagents
-                    if reagent_name is None and \
-                            unknown_reagent_ids.get(reagent[0], None) is None:
-
-                        # Get unknown reagent
-                        unknown_reagent_data = self.scrape_details_page("/item={id}".format(
-                            id=reagent[0]
+                    )
+                    trainer_names.append(trainer["name"])
+                    trainer_recipe_urls.append(trainer_recipe_url)
+                    trainer_recipe_contents[trainer_recipe_url] = trainer
+
+            # Get the recipes every trainer teaches
+            self.logger.log(f"Getting recipes of {len(trainer_names)} trainers.")
+            # Only the names of the recipes with reagents are kept, which is all the checkpoint needs
+            self.scrape_checkpointed_entities(
+                "profession_data",
+                "trainer_recipes",
+                trainer_recipe_urls,
+                lambda urls: [[recipe["name"] for recipe in page["recipes"]
+                               if recipe.get("reagents", None) is not None]
+                              for page in self.scrape_table_pages(urls,
+                                                                  ("teaches-recipe",),
+                                                                  ("recipes",))],
+                trainer_recipe_contents,
+                entity_function=lambda index, recipe_names: sinks["recipe_trainer"].write_rows([{
+                    "recipe_name": recipe_name,
+                    "trainer_name": trainer_names[index]
+                } for recipe_name in recipe_names]))
+
+            for profession_name in profession_data:
+
+                for recipe_item in profession_data[profession_name].get("recipe_items", []):
+                    name = recipe_item["name"].rstrip()
+                    icon_link_url = self.get_icon_link_url("item", recipe_item["id"], name)
+                    sinks["recipe_item"].write({
+                        "name": name,
+                        "wowhead_id": recipe_item["id"],
+                        "wowhead_link_url": "{wowhead_url}/item={id}/{name}".format(
+                            wowhead_url=self.wowhead_url,
+                            id=recipe_item["id"],
+                            name=((((((recipe_item["name"]
+                                       .lower())
+                                      .replace(":", ""))
+                                     .replace(" - ", " "))
+                                    .replace(" ", "-"))
+                                   .replace("'", "''"))
+                                  .replace("`", '"'))
                         ),
-                            reagent[0])
-
-                        # Set reagent name
-                        reagent_name = unknown_reagent_data["name"]
-
-                        # Add new reagent data
-                        unknown_reagents.append({
-                            "name": reagent_name,
-                            "wowhead_id": reagent[0],
-                            "wowhead_link_url": "{wowhead_url}/item={id}/{name}".format(
-                                wowhead_url=self.wowhead_url,
-                                id=reagent[0],
-                                name=(((((reagent_name
-                                          .lower())
-                                         .replace("[", ""))
-                                        .replace("]", ""))
-                                       .replace("'", ""))
-                                      .replace(" ", "-"))
-                            ),
-                            "icon_link_url": unknown_reagent_data["icon_link_url"]
-                        })
-
-                        unknown_reagent_ids[reagent[0]] = reagent_name
-
-                    elif reagent_name is None:
-                        reagent_name = unknown_reagent_ids.get(reagent[0], None)
-
-                    reagent_recipes.append({
-                        "recipe_name": recipe["name"],
-                        "reagent_name": reagent_name,
-                        "amount": reagent[1]
+                        "icon_link_url": icon_link_url,
+                        "required_skill_level": recipe_item["skill"],
+                        "profession_name": profession_name
                     })
 
-        unknown_reagents = tuple(unknown_reagents)
-
-        # Append unknown reagent data
-        self.append_data_to_psv_file("data/reagent",
-                                     self.get_header_names(self.domain, "reagent"),
-                                     unknown_reagents)
-
-        recipes = tuple(recipes)
-        reagent_recipes = tuple(reagent_recipes)
-
-        # Create trainer psv file
-        self.create_psv_file("data/trainer",
-                             self.get_header_names(self.domain, "trainer"),
-                             trainers)
-
-        # Create profession trainer psv file
-        self.create_psv_file("data/profession_trainer",
-                             self.get_header_names(self.domain, "profession_trainer"),
-                             profession_trainers)
-
-        # Create recipe item psv file
-        self.create_psv_file("data/recipe_item",
-                             self.get_header_names(self.domain, "recipe_item"),
-                             recipe_items)
+            recipe_item_index = EntityIndex(sinks["recipe_item"].get_records(),
+                                            name_function=lambda row: self.remove_recipe_item_prefix(row["name"]))
+
+            # Find the reagents that aren't known yet, so the reagent recipes can be written with their names
+            unknown_reagent_ids = []
+            seen_unknown_reagent_ids = set()
+            for profession_name in profession_data:
+
+                for recipe in profession_data[profession_name].get("recipes", []):
+
+                    for reagent in recipe.get("reagents", []):
+
+                        if reagents.get_by_id(reagent[0]) is None and \
+                                reagent[0] not in seen_unknown_reagent_ids:
+                            unknown_reagent_ids.append(reagent[0])
+                            seen_unknown_reagent_ids.add(reagent[0])
+
+            # Get unknown reagents
+            self.logger.log(f"Getting {len(unknown_reagent_ids)} unknown reagents.")
+            unknown_reagent_names = {}
+            self.scrape_checkpointed_entities(
+                "profession_data",
+                "unknown_reagents",
+                [str(reagent_id) for reagent_id in unknown_reagent_ids],
+                lambda reagent_ids: self.scrape_details_pages(["/item={id}".format(id=reagent_id)
+                                                               for reagent_id in reagent_ids],
+                                                              [int(reagent_id) for reagent_id in reagent_ids]),
+                entity_function=lambda index, unknown_reagent_data: self.write_unknown_reagent(
+                    sinks["reagent"], unknown_reagent_names, unknown_reagent_ids[index], unknown_reagent_data))
+
+            for profession_name in profession_data:
+
+                for recipe in profession_data[profession_name].get("recipes", []):
+
+                    # Get skill categories
+                    difficulty_data = self.process_difficulty(recipe)
+
+                    # Check if recipe is trained by recipe item
+                    recipe_item = recipe_item_index.get_by_name(recipe["name"])
+                    recipe_item_name = recipe_item["name"] if recipe_item is not None else None
+
+                    # Check if recipe produces a craftable item or an enchantment
+                    enchantment = enchantments.get_by_name(recipe["name"])
+                    enchantment_name = enchantment["name"] if enchantment is not None else None
+
+                    craftable_item = craftable_items.get_by_name(recipe["name"])
+                    craftable_item_name = craftable_item["name"] if craftable_item is not None else None
+
+                    name = recipe["name"].rstrip()
+                    icon_link_url = self.get_icon_link_url("spell", recipe["id"], name)
+                    minimum_amount_created = recipe.get("creates", [1, 1, 1])[1]
+                    if minimum_amount_created < 1:
+                        minimum_amount_created = 1
+                    maximum_amount_created = recipe.get("creates", [1, 1, 1])[2]
+                    if maximum_amount_created < 1:
+                        maximum_amount_created = minimum_amount_created
+                    sinks["recipe"].write({
+                        "name": f"{name} - {profession_name}",
+                        "wowhead_id": recipe["id"],
+                        "wowhead_link_url": "{wowhead_url}/spell={id}/{name}".format(
+                            wowhead_url=self.wowhead_url,
+                            id=recipe["id"],
+                            name=(((((name
+                                      .lower())
+                                     .replace(" - ", " "))
+                                    .replace(" ", "-"))
+                                   .replace("'", ""))
+                                  .replace("`", ""))
+                        ),
+                        "icon_link_url": icon_link_url,
+                        "difficulty_requirement": difficulty_data["requirement"],
+                        "difficulty_category_1": difficulty_data["categories"][0],
+                        "difficulty_category_2": difficulty_data["categories"][1],
+                        "difficulty_category_3": difficulty_data["categories"][2],
+                        "difficulty_category_4": difficulty_data["categories"][3],
+                        "minimum_amount_created": minimum_amount_created,
+                        "maximum_amount_created": maximum_amount_created,
+                        "training_cost": recipe.get("trainingcost", None),
+                        "profession_name": profession_name,
+                        "recipe_item_name": recipe_item_name,
+                        "craftable_item_name": craftable_item_name,
+                        "enchantment_name": enchantment_name
+                    })
 
-        # Create recipe psv file
-        self.create_psv_file("data/recipe",
-                             self.get_header_names(self.domain, "recipe"),
-                             recipes)
+                    for reagent in recipe.get("reagents", []):
 
-        # Create reagent recipe psv file
-        self.create_psv_file("data/reagent_recipe",
-                             self.get_header_names(self.domain, "reagent_recipe"),
-                             reagent_recipes)
+                        known_reagent = reagents.get_by_id(reagent[0])
+                        sinks["reagent_recipe"].write({
+                            "recipe_name": recipe["name"],
+                            "reagent_name": known_reagent["name"] if known_reagent is not None
+                            else unknown_reagent_names[reagent[0]],
+                            "amount": reagent[1]
+                        })
 
-        # Create recipe trainer psv file
-        self.create_psv_file("data/recipe_trainer",
-                             self.get_header_names(self.domain, "recipe_trainer"),
-                             recipe_trainers)
+        # Write the changed tables to their psv files
+        self.entity_store.flush()
 
         # End timer
         end_time = time.time()
@@ -1093,9 +1207,34 @@ class WowheadScraper:
 
         return results
 
+    def write_unknown_reagent(self,
+                              reagents: TableSink,
+                              reagent_names: dict,
+                              reagent_id: int,
+                              reagent_data: dict):
+
+        # Add new reagent data
+        reagent_name = reagent_data["name"]
+        reagents.write({
+            "name": reagent_name,
+            "wowhead_id": reagent_id,
+            "wowhead_link_url": "{wowhead_url}/item={id}/{name}".format(
+                wowhead_url=self.wowhead_url,
+                id=reagent_id,
+                name=(((((reagent_name
+                          .lower())
+                         .replace("[", ""))
+                        .replace("]", ""))
+                       .replace("'", ""))
+                      .replace(" ", "-"))
+            ),
+            "icon_link_url": reagent_data["icon_link_url"]
+        })
+        reagent_names[reagent_id] = reagent_name
+
     def get_specialisation_recipes(self):
 
-        specialisations = self.get_data_tuple_from_psv("data/specialisation")
+        specialisations = self.entity_store.read("specialisation")
 
         recipe_specialisations = {}
 
@@ -1125,23 +1264,19 @@ class WowheadScraper:
 
         recipe_specialisation_data = self.get_specialisation_recipes()["recipe_specialisations"]
 
-        recipe_specialisations = []
-        for specialisation in recipe_specialisation_data:
-
-            # TODO Wait for other specialisation endpoints to become available
-            if "Engineer" in specialisation:
-                for recipe in recipe_specialisation_data[specialisation]:
-                    recipe_specialisations.append({
-                        "recipe_name": recipe["name"],
-                        "specialisation_name": specialisation
-                    })
+        with self.entity_store.open_sink("recipe_specialisation") as recipe_specialisations:
+            for specialisation in recipe_specialisation_data:
 
-        recipe_specialisations = tuple(recipe_specialisations)
+                # TODO Wait for other specialisation endpoints to become available
+                if "Engineer" in specialisation:
+                    for recipe in recipe_specialisation_data[specialisation]:
+                        recipe_specialisations.write({
+                            "recipe_name": recipe["name"],
+                            "specialisation_name": specialisation
+                        })
 
-        # Create recipe specialisation psv file
-        self.create_psv_file("data/recipe_specialisation",
-                             self.get_header_names(self.domain, "recipe_specialisation"),
-                             recipe_specialisations)
+        # Write the changed tables to their psv files
+        self.entity_store.flush()
 
         # End timer
         end_time = time.time()
@@ -1153,20 +1288,23 @@ class WowheadScraper:
 
         return results
 
-    # TODO Write check data method
     def check_data(self):
 
         # Start timer
         start_time = time.time()
 
-
+        # Check the psv files against the validation rules
+        report = self.check_validation_rules(self.domain)
+        self.logger.log(f"Checked {report['row_count']} rows of {len(report['tables'])} tables, "
+                        f"found {report['error_count']} errors.")
 
         # End timer
         end_time = time.time()
 
         results = {
             "start_time": start_time,
-            "end_time": end_time
+            "end_time": end_time,
+            "report": report
         }
 
         return results
@@ -1212,6 +1350,11 @@ class WowheadScraper:
 
         return reactions
 
+    def remove_recipe_item_prefix(self, name: str):
+
+        # Recipe items are named like "Recipe: Elixir of Minor Defense"
+        return name.split(": ")[1] if len(name.split(": ")) > 1 else name
+
     def process_difficulty(self, recipe_dict: dict):
 
         # Get difficulty requirement
@@ -1246,45 +1389,32 @@ class WowheadScraper:
 
         return f"https://wow.zamimg.com/images/wow/icons/small/{name}.jpg"
 
+    def get_icon_link_url(self, type_name: str, wowhead_id, name: str):
+
+        # A missing icon leaves the link empty instead of aborting the stage
+        icon_name = self.icon_index.get(type_name, wowhead_id, name)
+        if icon_name is None:
+            self.logger.warning(f"No icon found for {type_name} {wowhead_id} ({name}).")
+            return None
+
+        return self.format_icon_link(icon_name)
+
     # IO functions
     def remove_file(self, file_path: str):
 
         os.remove(file_path)
 
-    def clear_directory(self, directory_path: str):
+    def clear_directory(self, directory_path: str, excluded_names: tuple = ()):
 
         for fileOrDir in os.listdir(directory_path):
 
+            if fileOrDir in excluded_names:
+                continue
             if os.path.isdir(directory_path + fileOrDir):
                 shutil.rmtree(directory_path + fileOrDir)
             else:
                 self.remove_file(directory_path + fileOrDir)
 
-    def create_psv_file(self, file_path: str, field_names: iter, data_tuple: iter):
-
-        with open(f"{file_path}.psv", "w", newline="") as file:
-            writer = DictWriter(file, fieldnames=field_names, delimiter='|', lineterminator='\n')
-            writer.writeheader()
-            writer.writerows(data_tuple)
-
-    def append_data_to_psv_file(self, file_path: str, field_names: iter, data_tuple: iter):
-
-        with open(f"{file_path}.psv", "a", newline="") as file:
-            writer = DictWriter(file, fieldnames=field_names, delimiter='|', lineterminator='\n')
-            writer.writerows(data_tuple)
-
-    def get_data_tuple_from_psv(self, file_path: str):
-
-        data = []
-        with open(f"{file_path}.psv", newline="") as file:
-            reader = DictReader(file, delimiter='|', lineterminator='\n')
-            for row in reader:
-                data.append(row)
-
-        data = tuple(data)
-
-        return data
-
     def read_json_file(self, file_path: str):
 
         with open(f"{file_path}.json", "r", newline="") as file:
@@ -1296,262 +1426,150 @@ class WowheadScraper:
     # Page scrape functions
     def scrape_table_page(self, relative_url: str, table_ids: tuple, data_keys: tuple):
 
-        url = f"{self.wowhead_url}{relative_url}"
-        html = self.get_page(url)
-        html = BeautifulSoup(html, "html.parser")
-        script_tags = html.find_all("script", text=True)
+        html = self.get_page(f"{self.wowhead_url}{relative_url}")
+
+        return self.parse_table_page(html, table_ids, data_keys)
+
+    def scrape_table_pages(self, relative_urls: iter, table_ids: tuple, data_keys: tuple):
+
+        pages = self.get_pages([f"{self.wowhead_url}{relative_url}" for relative_url in relative_urls])
+
+        return tuple([self.parse_table_page(html, table_ids, data_keys) for html in pages])
+
+    def parse_table_page(self, html: str, table_ids: tuple, data_keys: tuple):
+
+        scripts = extract_page(html)["scripts"]
+        listviews = index_listviews(scripts)
+        script_icons = self.index_icons(scripts)
         data = {}
-        icons_found = False
-        for index, table_id in enumerate(table_ids):
-            for tag in script_tags:
-
-                tag_text = tag.contents[0]
-                tag_text = fix_data_key(tag_text)
-                if re.search(fr"new Listview(?:[^~]*?{table_id})[^~]*?\"data\": ([^;]*])[^;]*}}\);",
-                             tag_text,
-                             re.MULTILINE):
-                    if not icons_found:
-                        data["icons"] = {}
-                        icon_jsons = re.findall(r"WH\.Gatherer.addData\(\d+, \d+, ([^;]+)\);",
-                                                tag_text,
-                                                re.MULTILINE)
-                        if icon_jsons is not None:
-                            for icon_json in icon_jsons:
-                                data["icons"].update(find_icons(icon_json))
-                        icons_found = True
-                    json_data = re.search(fr"new Listview(?:[^~]*?{table_id})[^~]*?\"data\": ([^;]*])[^;]*}}\);",
-                                          tag_text,
-                                          re.MULTILINE).group(1)
-                    data[data_keys[index]] = fix_json(json_data)
+        for table_id, data_key in zip(table_ids, data_keys):
+
+            listview = listviews.get(table_id, None)
+            if listview is None:
+                continue
+
+            # Use the icons of the script with the first table that was found
+            if "icons" not in data:
+                data["icons"] = script_icons[listview["script"]]
+            data[data_key] = fix_json(listview["data"])
 
         return data
 
     def scrape_listview_page(self, listview_name: str, data_key: str, relative_url: str):
 
-        url = f"{self.wowhead_url}{relative_url}"
-        html = self.get_page(url)
-        html = BeautifulSoup(html, "html.parser")
-        script_tags = html.find_all("script", text=True)
+        html = self.get_page(f"{self.wowhead_url}{relative_url}")
+
+        return self.parse_listview_page(html, listview_name, data_key)
+
+    def scrape_listview_pages(self, listview_name: str, data_key: str, relative_urls: iter):
+
+        pages = self.get_pages([f"{self.wowhead_url}{relative_url}" for relative_url in relative_urls])
+
+        return tuple([self.parse_listview_page(html, listview_name, data_key) for html in pages])
+
+    def parse_listview_page(self, html: str, listview_name: str, data_key: str):
+
+        scripts = extract_page(html)["scripts"]
+        listview = index_listview_variables(scripts).get(listview_name, None)
+        script_icons = self.index_icons(scripts)
         data = {}
-        for tag in script_tags:
-
-            tag_text = tag.contents[0]
-            if re.search(fr"var listview{listview_name} = ([^;]+);",
-                         tag_text,
-                         re.MULTILINE):
-                data["icons"] = {}
-                icon_jsons = re.findall(r"WH\.Gatherer.addData\(\d+, \d+, ([^;]+)\);",
-                                        tag_text,
-                                        re.MULTILINE)
-                if icon_jsons is not None:
-                    for icon_json in icon_jsons:
-                        data["icons"].update(find_icons(icon_json))
-                json_data = re.search(fr"var listview{listview_name} = ([^;]+);",
-                                      tag_text,
-                                      re.MULTILINE).group(1)
-                data[data_key] = fix_json(json_data)
+        if listview is not None:
+            data["icons"] = script_icons[listview["script"]]
+            data[data_key] = fix_json(listview["data"])
 
         return data
 
     def scrape_details_page(self, relative_url: str, wowhead_id: int):
 
-        url = f"{self.wowhead_url}{relative_url}"
-        html = self.get_page(url)
-        html = BeautifulSoup(html, "html.parser")
+        html = self.get_page(f"{self.wowhead_url}{relative_url}")
+
+        return self.parse_details_page(html, wowhead_id)
+
+    def scrape_details_pages(self, relative_urls: iter, wowhead_ids: iter):
+
+        pages = self.get_pages([f"{self.wowhead_url}{relative_url}" for relative_url in relative_urls])
+
+        return tuple([self.parse_details_page(html, wowhead_id) for html, wowhead_id in zip(pages, wowhead_ids)])
+
+    def parse_details_page(self, html: str, wowhead_id: int, type_name: str = "item"):
+
+        page = extract_page(html)
 
         # Get name
-        name = (((html
-                  .find_all(name="h1", class_="heading-size-1"))[0]
-                 .get_text())
-                .rstrip())
-
-        # Get icon
-        script_tags = html.find_all("script", text=True)
-        icon_name = None
-        for tag in script_tags:
-
-            tag_text = tag.contents[0]
-            if re.search(
-                    fr"WH\.ge\('ic{str(wowhead_id)}'\)\.appendChild\(Icon\.create\('([a-z0-9_]+)'[{{}}\[\]:\"'`,._\- &a-zA-Z0-9\\/]+\)\);",
-                    tag_text,
-                    re.MULTILINE):
-                icon_name = re.search(
-                    fr"WH\.ge\('ic{str(wowhead_id)}'\)\.appendChild\(Icon\.create\('([a-z0-9_]+)'[{{}}\[\]:\"'`,._\- &a-zA-Z0-9\\/]+\)\);",
-                    tag_text,
-                    re.MULTILINE).group(1)
+        name = page["heading"].rstrip()
+
+        # Get icon, only search the scripts when the icon index doesn't know it yet
+        icon_name = self.icon_index.get(type_name, wowhead_id)
+        if icon_name is None:
+            icon_name = find_icon_name(page["scripts"], wowhead_id)
+            self.icon_index.add(type_name, wowhead_id, name, icon_name)
 
         return {
             "name": name,
             "icon_link_url": self.format_icon_link(icon_name)
         }
 
-    # Web functions
-    def get_page(self, url):
+    def index_icons(self, scripts: iter):
 
-        request = None
-        status_is_not_200 = True
-        while status_is_not_200:
-
-            # Add 10 second grace period per request, to not overload the wowhead servers
-            time.sleep(10)
-
-            # Create request
-            headers = {
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Accept-Language": "en-GB,en;q=0.5",
-                "Host": "classic.wowhead.com",
-                "Upgrade-Insecure-Requests": "1",
-                "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:87.0) Gecko/20100101 Firefox/87.0"
-            }
-            request = requests.get(url, headers=headers)
+        # Add the icons of every script to the icon index and return them per script
+        script_icons = {}
+        for script in scripts:
 
-            # If GET request succeeds, then stop trying
-            if request.status_code == 200:
-                status_is_not_200 = False
+            script_icons[script] = {}
+            for type_id, gatherer_json in find_gatherer_data(script):
+                script_icons[script].update(self.icon_index.add_gatherer_data(type_id, gatherer_json))
 
-        return request.text
+        return script_icons
 
-    # Utility functions
-    def get_header_names(self, version: str, file_path: str):
+    # Web functions
+    def get_page(self, url):
 
-        data_files = self.validation_rules.get(version, None)
-        if data_files is None:
-            raise InvalidSiteVersionException
+        # The fetcher waits for the rate limiter and retries throttled requests
+        return self.fetcher.get_page(url)
 
-        data_file = data_files.get(file_path, None)
-        if data_file is None:
-            raise FileNotFoundError
+    def get_pages(self, urls: iter):
 
-        return tuple(data_file.keys())
+        # The fetcher requests the pages concurrently and returns them in order
+        return self.fetcher.get_pages(urls)
 
+    # Utility functions
     def check_validation_rules(self, version: str):
 
-        validation_succeeded = True
-        expected_data_files = self.validation_rules.get(version, None)
-        if expected_data_files is None:
-            validation_succeeded = False
-            self.logger.error(f"There are no validation rules for site version: {version}")
-            raise InvalidSiteVersionException
-
-        for expected_file_name in expected_data_files:
+        # The rules of the site version of this scraper are compiled once, other versions when they are checked
+        if version == self.domain:
+            data_validator = self.get_data_validator()
+        else:
+            table_rules = self.validation_rules.get(version, None)
+            if table_rules is None:
+                self.logger.error(f"There are no validation rules for site version: {version}")
+                raise InvalidSiteVersionException
+            data_validator = DataValidator(self.logger, table_rules, maximum_workers=self.validation_workers)
 
-            file_rules = expected_data_files.get(expected_file_name, None)
-            if file_rules is None:
-                self.logger.warning(f"No validation rules were specified for data file: {expected_file_name}")
-                continue
+        return data_validator.validate("data")
 
-            try:
-                data = self.get_data_tuple_from_psv(f"data/{expected_file_name}")
-            except FileNotFoundError:
-                validation_succeeded = False
-                self.logger.error(f"Can't find required data file: {expected_file_name}")
-                continue
+    def get_data_validator(self):
 
-            previous_values = {field_name: [] for field_name in file_rules}
+        if self.data_validator is None:
+            table_rules = self.validation_rules.get(self.domain, None)
+            if table_rules is None:
+                self.logger.error(f"There are no validation rules for site version: {self.domain}")
+                raise InvalidSiteVersionException
+            self.data_validator = DataValidator(self.logger, table_rules, maximum_workers=self.validation_workers)
 
-            for index, row in enumerate(data):
+        return self.data_validator
 
-                for expected_field_name in file_rules:
+    def read_table(self, table_name: str, field_names: iter = None, start: int = 0, end: int = None):
 
-                    field_rules = file_rules.get(expected_field_name, None)
-                    if field_rules is None:
-                        self.logger.warning(f"No validation rules were specified in data file: {expected_file_name} "
-                                            f"one row {index + 1} for field {expected_field_name}")
-                        continue
+        # Rows of a scraped table, read from its columnar file when it is up to date
+        # Only the given columns and rows are decoded from a columnar file
+        columnar_file_path = find_columnar_file(self.entity_store.get_file_path(table_name))
+        if columnar_file_path is not None:
+            with ColumnarTable(columnar_file_path) as table:
+                field_names = table.field_names if field_names is None else tuple(field_names)
+                return [dict(zip(field_names, row)) for row in table.read_rows(field_names, start, end)]
 
-                    field_value = row.get(expected_field_name, None)
-                    if field_value is None:
-                        validation_succeeded = False
-                        self.logger.error(f"Expected value wasn't found in data file: {expected_file_name} on row "
-                                          f"{index + 1} for field {expected_field_name}")
-
-                    type_rule = field_rules.get("type", None)
-                    format_rule = field_rules.get("format", None)
-                    minimum_rule = field_rules.get("minimum", None)
-                    not_nullable_rule = field_rules.get("not_null", None)
-                    enum_rule = field_rules.get("enum", None)
-                    unique_rule = field_rules.get("unique", None)
-
-                    if type_rule and \
-                       field_value != "":
-                        if type_rule == "string":
-                            pass
-                        if type_rule == "integer":
-                            try:
-                                field_value_as_int = int(field_value)
-                                if field_value_as_int < minimum_rule:
-                                    validation_succeeded = False
-                                    self.logger.error(f"The value \"{field_value}\" is below the minimum in data file: "
-                                                      f"{expected_file_name} on row {index + 1} "
-                                                      f"for field {expected_field_name}")
-                            except ValueError:
-                                validation_succeeded = False
-                                self.logger.error(f"The value \"{field_value}\" is not an integer in data file: "
-                                                  f"{expected_file_name} on row {index + 1} "
-                                                  f"for field {expected_field_name}")
-                        if type_rule == "boolean":
-                            try:
-                                bool(field_value)
-                            except ValueError:
-                                validation_succeeded = False
-                                self.logger.error(f"The value \"{field_value}\" is not a boolean in data file: "
-                                                  f"{expected_file_name} on row {index + 1} "
-                                                  f"for field {expected_field_name}")
-
-                    if format_rule and \
-                       field_value != "":
-                        if format_rule == "url":
-                            if not is_url_format(field_value):
-                                validation_succeeded = False
-                                self.logger.error(f"The value \"{field_value}\" is not in the url format in data file: "
-                                                  f"{expected_file_name} on row {index + 1} "
-                                                  f"for field {expected_field_name}")
-
-                    if not_nullable_rule:
-                        if field_value == "":
-                            validation_succeeded = False
-                            self.logger.error(f"Required value is not present in data file: "
-                                              f"{expected_file_name} on row {index + 1} "
-                                              f"for field {expected_field_name}")
-
-                    if enum_rule and \
-                       field_value != "":
-                        try:
-                            valid_values = self.read_json_file(f"wowhead_scraper/json_data/{enum_rule}").values()
-                            if field_value not in valid_values:
-                                validation_succeeded = False
-                                self.logger.error(
-                                    f"The value \"{field_value}\" is not present in {enum_rule} in data file: "
-                                    f"{expected_file_name} on row {index + 1} "
-                                    f"for field {expected_field_name}")
-                        except FileNotFoundError:
-                            self.logger.error(f"The enum type of \"{enum_rule}\" can't be found "
-                                              f"in the json_data directory")
-
-                    if unique_rule and \
-                       field_value != "":
-                        if field_value in previous_values[expected_field_name]:
-                            validation_succeeded = False
-                            self.logger.error(f"The value \"{field_value}\" is not unique in data file: "
-                                              f"{expected_file_name} on row {index + 1} "
-                                              f"for field {expected_field_name}")
-
-                    if field_value not in previous_values[expected_field_name]:
-                        previous_values[expected_field_name].append(field_value)
-
-        if not validation_succeeded:
-            self.logger.error("Data validation failed")
-        return validation_succeeded
-
-    def get_data_rows(self, file_path: str):
-
-        data = []
-        with open(f"{file_path}.psv", newline="") as file:
-            file_reader = reader(file, delimiter='|', lineterminator='\n')
-            for row in file_reader:
-                data.append(tuple(row))
-
-        data = tuple(data)
+        records = self.entity_store.read(table_name)[start:end]
+        field_names = self.entity_store.get_record_class(table_name).field_names if field_names is None \
+            else tuple(field_names)
 
-        return data
+        return [{field_name: record[field_name] for field_name in field_names} for record in records]
@@ -1,13 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+from csv import reader
 from mysql.connector import connect
+from wowhead_scraper.columnar_table import ColumnarTable, find_columnar_file
+from wowhead_scraper.connection_pool import ConnectionPool
+from wowhead_scraper.database_schema import get_database_schema
 from wowhead_scraper.exceptions import NoDBConfigFoundException, InvalidSiteVersionException, \
-    CantReadCredentialException
-from wowhead_scraper.scraper import WowheadScraper
+    CantReadCredentialException, InvalidShadowTableException, DuplicateNaturalKeyException
+from wowhead_scraper.logger import Logger
 import os
+import re
+import sqlite3
+import threading
+import time
 
 
 class SQLConnector:
 
-    def __init__(self, site_version: str):
+    # Suffixes of the tables an export is loaded into and of the tables it replaced
+    shadow_suffix = "__shadow"
+    previous_suffix = "__previous"
+
+    def __init__(self,
+                 site_version: str,
+                 batch_size: int = 1000,
+                 use_load_data: bool = False,
+                 connection=None,
+                 logger: Logger = None,
+                 minimum_row_ratio: float = 0.5,
+                 maximum_workers: int = 4,
+                 connection_factory=None):
 
         # Determine site version
         if site_version in ("classic", "old"):
@@ -19,21 +40,91 @@ class SQLConnector:
         else:
             raise InvalidSiteVersionException
 
-        # Initialise connection variables
-        self.connection = None
-        self.cursor = None
+        self.logger = logger if logger is not None else Logger()
+
+        # Rows are inserted in batches of prepared statements,
+        # or streamed by the server from the psv file with load data local infile
+        self.batch_size = max(batch_size, 1)
+        self.use_load_data = use_load_data
+
+        # A shadow table that lost more rows than this, compared to the live table, isn't swapped in
+        self.minimum_row_ratio = minimum_row_ratio
+
+        # Columns, their types and the foreign keys come from the schema all connectors of the domain share
+        self.schema = get_database_schema(self.domain)
+        self.table_rules = self.schema.table_rules
+
+        # Initialise connection variables, every thread uses a connection of its own
+        # An open connection can be given, like a sqlite connection to test the loading without a server,
+        # then the tables are loaded one by one over that connection
+        self.local = threading.local()
+        self.connection = connection
+        self.cursor = connection.cursor() if connection is not None else None
+        self.owns_connection = connection is None
+        self.connection_factory = connection_factory
+        self.set_dialect(connection)
+
+        # Tables that don't depend on each other are loaded at the same time over pooled connections
+        self.maximum_workers = max(maximum_workers, 1)
+        self.pool = None
+
+    @property
+    def connection(self):
+
+        return getattr(self.local, "connection", None)
+
+    @connection.setter
+    def connection(self, connection):
+
+        self.local.connection = connection
+
+    @property
+    def cursor(self):
+
+        return getattr(self.local, "cursor", None)
+
+    @cursor.setter
+    def cursor(self, cursor):
+
+        self.local.cursor = cursor
+
+    def set_dialect(self, connection):
+
+        self.dialect = "sqlite" if isinstance(connection, sqlite3.Connection) else "mysql"
+        self.placeholder = "?" if self.dialect == "sqlite" else "%s"
 
     def connect(self):
 
+        # Keep a connection that was given
+        if not self.owns_connection:
+            return
+
+        # Connections can be opened by a given factory
+        if self.connection_factory is not None:
+            self.connection = self.connection_factory()
+            self.cursor = self.connection.cursor()
+            self.set_dialect(self.connection)
+            if self.maximum_workers > 1:
+                self.pool = ConnectionPool(self.connection_factory, self.maximum_workers)
+            return
+
         # Get database credentials
         credentials = self.read_config()
 
         # Create connection
-        self.connection = connect(user=credentials["user"],
-                                  password=credentials["password"],
-                                  database=credentials["database"],
-                                  host=credentials["host"])
+        def create_connection():
+
+            return connect(user=credentials["user"],
+                           password=credentials["password"],
+                           database=credentials["database"],
+                           host=credentials["host"],
+                           allow_local_infile=self.use_load_data)
+
+        self.connection = create_connection()
         self.cursor = self.connection.cursor()
+        self.set_dialect(self.connection)
+        if self.maximum_workers > 1:
+            self.pool = ConnectionPool(create_connection, self.maximum_workers)
 
         global_connect_timeout = "SET GLOBAL connect_timeout=180"
         global_wait_timeout = "SET GLOBAL connect_timeout=180"
@@ -51,7 +142,13 @@ class SQLConnector:
 
     def disconnect(self):
 
-        # Close connection
+        # Close connection, a connection that was given is closed by its owner
+        if not self.owns_connection:
+            return
+
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
         self.cursor.close()
         self.connection.close()
 
@@ -88,89 +185,786 @@ class SQLConnector:
 
                 rowcount = result.rowcount
 
-    def update_tables_from_psv(self):
+    def set_foreign_key_checks(self, enabled: bool):
+
+        if self.dialect == "sqlite":
+            self.cursor.execute(f"PRAGMA foreign_keys = {'ON' if enabled else 'OFF'};")
+        else:
+            self.cursor.execute(f"SET foreign_key_checks = {1 if enabled else 0};")
+
+    def update_tables_from_psv(self, directory_path: str = "data", setup_database: bool = True):
+
+        # Start timer
+        start_time = time.time()
 
         # Create connection
         self.connect()
 
         # Setup tables
-        self.setup_db()
+        if setup_database:
+            self.setup_db()
 
         # Disable foreign key checks
-        self.cursor.execute("SET foreign_key_checks = 0;")
+        self.set_foreign_key_checks(False)
 
-        # TODO setup transaction
+        # Load the psv files of known tables level by level, every table is loaded in its own transaction
+        try:
+            table_results = self.run_table_tasks(
+                self.get_psv_names(directory_path),
+                lambda psv_name: self.update_table_from_psv(psv_name, f"{directory_path}/{psv_name}"))
+        finally:
+            # Enable foreign key checks
+            self.set_foreign_key_checks(True)
 
-        # Iterate through all the psv files
-        psv_files = os.listdir("data")
-        for file in psv_files:
+            # Close connection
+            self.disconnect()
 
-            self.update_table_from_psv(file[0:-4], f"data/{file[0:-4]}")
+        # End timer
+        end_time = time.time()
 
-        # Enable foreign key checks
-        self.cursor.execute("SET foreign_key_checks = 1;")
+        row_count = sum([table_result["row_count"] for table_result in table_results.values()])
+        self.logger.log(f"Loaded {row_count} rows into {len(table_results)} tables in {round(end_time - start_time, 2)}s.")
 
-        # Close connection
-        self.disconnect()
+        results = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "row_count": row_count,
+            "tables": table_results
+        }
 
-    def update_table_from_psv(self, psv_name: str, psv_file_path):
+        return results
 
-        # Get psv data
-        wowhead_scraper = WowheadScraper(self.domain)
-        columns = wowhead_scraper.get_header_names(self.domain, psv_name)
-        rows = wowhead_scraper.get_data_rows(psv_file_path)
+    def swap_tables_from_psv(self, directory_path: str = "data", setup_database: bool = True):
 
-        # Reset table
-        self.reset_table(psv_name)
+        # Start timer
+        start_time = time.time()
 
-        # Insert rows into Database
-        # Prepare columns
-        columns_string = "", "".join(columns)
+        # Create connection
+        self.connect()
 
-        for row in rows:
+        # Setup tables
+        if setup_database:
+            self.setup_db()
+
+        # Disable foreign key checks
+        self.set_foreign_key_checks(False)
+
+        # Load every table into a shadow copy, the live tables stay untouched until they are swapped
+        psv_names = self.get_psv_names(directory_path)
+        generation = time.time_ns()
+        try:
+            def load_shadow_table(psv_name: str):
+
+                self.create_shadow_table(psv_name, generation)
+
+                return self.update_table_from_psv(psv_name,
+                                                  f"{directory_path}/{psv_name}",
+                                                  self.get_shadow_name(psv_name))
+
+            table_results = self.run_table_tasks(psv_names, load_shadow_table)
+
+            # Check every shadow table before any of them goes live
+            problems = []
+            for psv_name in psv_names:
+                problems.extend(self.validate_shadow_table(psv_name, table_results[psv_name]["row_count"], psv_names))
+            if len(problems) > 0:
+                for problem in problems:
+                    self.logger.error(problem)
+                raise InvalidShadowTableException(f"The shadow tables have {len(problems)} problems, "
+                                                  f"the live tables were kept. {problems[0]}")
+
+            # Swap all shadow tables in with one rename, the replaced tables are kept for a rollback
+            self.swap_tables(psv_names)
+        except Exception:
+            self.drop_tables([self.get_shadow_name(psv_name) for psv_name in psv_names])
+            raise
+        finally:
+            # Enable foreign key checks
+            self.set_foreign_key_checks(True)
+
+            # Close connection
+            self.disconnect()
+
+        # End timer
+        end_time = time.time()
+
+        row_count = sum([table_result["row_count"] for table_result in table_results.values()])
+        self.logger.log(f"Swapped in {len(table_results)} tables with {row_count} rows, "
+                        f"loaded in {round(end_time - start_time, 2)}s.")
+
+        results = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "row_count": row_count,
+            "tables": table_results
+        }
+
+        return results
+
+    def rollback_tables(self, table_names: iter = None):
+
+        # Start timer
+        start_time = time.time()
+
+        # Create connection
+        self.connect()
+
+        # Disable foreign key checks
+        self.set_foreign_key_checks(False)
+
+        # Swap the live tables with the ones they replaced, rolling back twice brings the newest tables back
+        try:
+            if table_names is None:
+                table_names = [table_name for table_name in self.table_rules
+                               if self.table_exists(self.get_previous_name(table_name))]
+            renames = []
+            for table_name in table_names:
+                renames.append((table_name, self.get_shadow_name(table_name)))
+                renames.append((self.get_previous_name(table_name), table_name))
+                renames.append((self.get_shadow_name(table_name), self.get_previous_name(table_name)))
+            self.rename_tables(renames)
+            self.restore_foreign_keys(table_names)
+        finally:
+            # Enable foreign key checks
+            self.set_foreign_key_checks(True)
+
+            # Close connection
+            self.disconnect()
+
+        # End timer
+        end_time = time.time()
+
+        self.logger.log(f"Rolled back {len(table_names)} tables.")
+
+        results = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "tables": tuple(table_names)
+        }
+
+        return results
+
+    def run_table_tasks(self, table_names: iter, table_task):
+
+        # Referenced tables are loaded before the tables that reference them,
+        # the tables of one level are loaded at the same time when there is a pool
+        table_results = {}
+        levels = self.schema.get_dependency_levels(table_names)
+        with ThreadPoolExecutor(max_workers=self.maximum_workers) as executor:
+            for level, level_table_names in enumerate(levels):
+
+                if self.pool is None:
+                    for table_name in level_table_names:
+                        table_results[table_name] = self.run_table_task(table_task, table_name, level)
+                    continue
+
+                futures = {table_name: executor.submit(self.run_pooled_table_task, table_task, table_name, level)
+                           for table_name in level_table_names}
+                for table_name in level_table_names:
+                    table_results[table_name] = futures[table_name].result()
+
+        # Keep the order of the given tables in the report
+        return {table_name: table_results[table_name] for table_name in table_names}
+
+    def run_pooled_table_task(self, table_task, table_name: str, level: int):
+
+        # Workers use a pooled connection, foreign key checks are set per connection
+        connection = self.pool.acquire()
+        self.connection = connection
+        self.cursor = connection.cursor()
+        try:
+            self.set_foreign_key_checks(False)
+            return self.run_table_task(table_task, table_name, level)
+        finally:
+            self.set_foreign_key_checks(True)
+            self.cursor.close()
+            self.connection = None
+            self.cursor = None
+            self.pool.release(connection)
+
+    def run_table_task(self, table_task, table_name: str, level: int):
+
+        results = table_task(table_name)
+        results["level"] = level
+        results["duration"] = round(results["end_time"] - results["start_time"], 3)
+
+        return results
+
+    def get_psv_names(self, directory_path: str):
+
+        # Only the psv files of known tables are loaded
+        return [file_name[0:-4] for file_name in sorted(os.listdir(directory_path))
+                if file_name.endswith(".psv") and file_name[0:-4] in self.table_rules]
+
+    def get_shadow_name(self, table_name: str):
+
+        return f"{table_name}{self.shadow_suffix}"
+
+    def get_previous_name(self, table_name: str):
+
+        return f"{table_name}{self.previous_suffix}"
+
+    def get_create_table_statement(self, table_name: str):
+
+        if self.dialect == "sqlite":
+            self.cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?;", (table_name,))
+            rows = self.cursor.fetchall()
+            if len(rows) == 0:
+                raise InvalidShadowTableException(f"There is no table {table_name} to copy.")
+            return rows[0][0]
+
+        self.cursor.execute(f"SHOW CREATE TABLE {self.quote_name(table_name)};")
 
-            # Prepare row
-            current_value = 0
-            row_string = ""
-            for value in row:
+        return self.cursor.fetchall()[0][1]
 
-                # Check if value is convertible
-                real_value = self.check_if_string_is_convertible(value)
+    def create_shadow_table(self, table_name: str, generation: int):
 
-                # Add value to row string
-                if current_value == len(row) - 1:
-                    row_string += real_value
-                else:
-                    row_string += real_value + ", "
+        shadow_name = self.get_shadow_name(table_name)
+        self.drop_tables([shadow_name])
 
-                current_value += 1
+        # Copy the live table with its indexes and foreign keys,
+        # constraint names are unique per schema, so every generation gets names of its own
+        statement = self.get_create_table_statement(table_name)
+        statement = re.sub(r"^\s*CREATE TABLE\s+(IF NOT EXISTS\s+)?(`?\w+`?\.)?[`\"]?\w+[`\"]?",
+                           f"CREATE TABLE {self.quote_name(shadow_name)}",
+                           statement,
+                           count=1)
+        statement = re.sub(r"CONSTRAINT `(\w+?)(_g\d+)?`",
+                           lambda match: f"CONSTRAINT `{match.group(1)}_g{generation}`",
+                           statement)
 
-            self.cursor.execute(f"INSERT INTO {psv_name} ({columns_string}) VALUES ({row_string});")
+        # Start the ids of the new rows at 1 again
+        statement = re.sub(r"\s*AUTO_INCREMENT=\d+", "", statement)
+        self.cursor.execute(statement)
 
-        # Commit changes
+    def validate_shadow_table(self, table_name: str, expected_row_count: int, swapped_table_names: iter):
+
+        problems = []
+        shadow_name = self.get_shadow_name(table_name)
+
+        # Every row of the psv file has to be there, and the table can't lose too many rows at once
+        row_count = self.count_rows(shadow_name)
+        if row_count != expected_row_count:
+            problems.append(f"{shadow_name} holds {row_count} rows, but its psv file has {expected_row_count}.")
+        live_row_count = self.count_rows(table_name)
+        if row_count < live_row_count * self.minimum_row_ratio:
+            problems.append(f"{shadow_name} holds {row_count} rows, but {table_name} holds {live_row_count}.")
+
+        # Referenced rows have to exist in the table that will be live after the swap
+        for column, referenced_table_name, referenced_column in self.get_foreign_keys(table_name):
+
+            if referenced_table_name in swapped_table_names:
+                referenced_table_name = self.get_shadow_name(referenced_table_name)
+            self.cursor.execute(
+                "SELECT COUNT(*) FROM {table} AS child LEFT JOIN {referenced_table} AS parent "
+                "ON child.{column} = parent.{referenced_column} "
+                "WHERE child.{column} IS NOT NULL AND parent.{referenced_column} IS NULL;".format(
+                    table=self.quote_name(shadow_name),
+                    referenced_table=self.quote_name(referenced_table_name),
+                    column=self.quote_name(column),
+                    referenced_column=self.quote_name(referenced_column)
+                ))
+            missing_count = self.cursor.fetchall()[0][0]
+            if missing_count > 0:
+                problems.append(f"{missing_count} rows of {shadow_name} reference a missing "
+                                f"{referenced_table_name}.{referenced_column} in {column}.")
+
+        return problems
+
+    def get_foreign_keys(self, table_name: str):
+
+        # Foreign keys as column, referenced table and referenced column
+        if self.dialect == "sqlite":
+            self.cursor.execute(f"PRAGMA foreign_key_list({self.quote_name(table_name)});")
+            return [(row[3], row[2], row[4]) for row in self.cursor.fetchall() if row[4] is not None]
+
+        self.cursor.execute("SELECT COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME "
+                            "FROM information_schema.KEY_COLUMN_USAGE "
+                            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+                            "AND REFERENCED_TABLE_NAME IS NOT NULL;", (table_name,))
+
+        return [tuple(row) for row in self.cursor.fetchall()]
+
+    def count_rows(self, table_name: str):
+
+        self.cursor.execute(f"SELECT COUNT(*) FROM {self.quote_name(table_name)};")
+
+        return self.cursor.fetchall()[0][0]
+
+    def table_exists(self, table_name: str):
+
+        if self.dialect == "sqlite":
+            self.cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?;", (table_name,))
+        else:
+            self.cursor.execute("SELECT COUNT(*) FROM information_schema.TABLES "
+                                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s;", (table_name,))
+
+        return self.cursor.fetchall()[0][0] > 0
+
+    def swap_tables(self, table_names: iter):
+
+        # Drop the generation before the previous one, then move the live tables aside and the shadow tables in
+        self.drop_tables([self.get_previous_name(table_name) for table_name in table_names])
+        renames = []
+        for table_name in table_names:
+            renames.append((table_name, self.get_previous_name(table_name)))
+            renames.append((self.get_shadow_name(table_name), table_name))
+        self.rename_tables(renames)
+        self.restore_foreign_keys(table_names)
+
+    def rename_tables(self, renames: iter):
+
+        # Mysql renames all tables in one atomic statement,
+        # sqlite renames them in one transaction and keeps foreign keys pointing at the names they had
+        if len(renames) == 0:
+            return
+        if self.dialect == "sqlite":
+            self.connection.commit()
+            self.cursor.execute("PRAGMA legacy_alter_table = ON;")
+            self.cursor.execute("BEGIN;")
+            try:
+                for old_name, new_name in renames:
+                    self.cursor.execute(f"ALTER TABLE {self.quote_name(old_name)} "
+                                        f"RENAME TO {self.quote_name(new_name)};")
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                self.cursor.execute("PRAGMA legacy_alter_table = OFF;")
+        else:
+            self.cursor.execute("RENAME TABLE {renames};".format(
+                renames=", ".join([f"{self.quote_name(old_name)} TO {self.quote_name(new_name)}"
+                                   for old_name, new_name in renames])))
+
+    def restore_foreign_keys(self, table_names: iter):
+
+        # Mysql moves the foreign keys that reference a renamed table along with it,
+        # so after a swap the live tables, and the tables of the frontend, reference the tables that were replaced
+        # Those foreign keys are created again against the live tables, sqlite kept them pointing at the live names
+        if self.dialect == "sqlite":
+            return
+        live_names = {}
+        for table_name in table_names:
+            live_names[self.get_previous_name(table_name)] = table_name
+            live_names[self.get_shadow_name(table_name)] = table_name
+
+        self.cursor.execute("SELECT constraints.TABLE_NAME, constraints.CONSTRAINT_NAME, "
+                            "constraints.REFERENCED_TABLE_NAME, constraints.UPDATE_RULE, constraints.DELETE_RULE, "
+                            "usages.COLUMN_NAME, usages.REFERENCED_COLUMN_NAME "
+                            "FROM information_schema.REFERENTIAL_CONSTRAINTS AS constraints "
+                            "JOIN information_schema.KEY_COLUMN_USAGE AS usages "
+                            "ON usages.CONSTRAINT_SCHEMA = constraints.CONSTRAINT_SCHEMA "
+                            "AND usages.TABLE_NAME = constraints.TABLE_NAME "
+                            "AND usages.CONSTRAINT_NAME = constraints.CONSTRAINT_NAME "
+                            "WHERE constraints.CONSTRAINT_SCHEMA = DATABASE() "
+                            "ORDER BY constraints.TABLE_NAME, constraints.CONSTRAINT_NAME, usages.ORDINAL_POSITION;")
+        foreign_keys = {}
+        for (table_name, constraint_name, referenced_table_name, update_rule, delete_rule, column,
+             referenced_column) in self.cursor.fetchall():
+
+            # The replaced tables keep referencing each other
+            if referenced_table_name not in live_names or \
+                    table_name.endswith(self.previous_suffix) or table_name.endswith(self.shadow_suffix):
+                continue
+            foreign_key = foreign_keys.setdefault((table_name, constraint_name), {
+                "referenced_table_name": live_names[referenced_table_name],
+                "update_rule": update_rule,
+                "delete_rule": delete_rule,
+                "columns": [],
+                "referenced_columns": []
+            })
+            foreign_key["columns"].append(column)
+            foreign_key["referenced_columns"].append(referenced_column)
+
+        for (table_name, constraint_name), foreign_key in foreign_keys.items():
+
+            self.cursor.execute(f"ALTER TABLE {self.quote_name(table_name)} "
+                                f"DROP FOREIGN KEY {self.quote_name(constraint_name)};")
+            self.cursor.execute("ALTER TABLE {table} ADD CONSTRAINT {constraint} FOREIGN KEY ({columns}) "
+                                "REFERENCES {referenced_table} ({referenced_columns}) "
+                                "ON DELETE {delete_rule} ON UPDATE {update_rule};".format(
+                                    table=self.quote_name(table_name),
+                                    constraint=self.quote_name(constraint_name),
+                                    columns=", ".join([self.quote_name(column) for column in foreign_key["columns"]]),
+                                    referenced_table=self.quote_name(foreign_key["referenced_table_name"]),
+                                    referenced_columns=", ".join([self.quote_name(column)
+                                                                  for column in foreign_key["referenced_columns"]]),
+                                    delete_rule=foreign_key["delete_rule"],
+                                    update_rule=foreign_key["update_rule"]))
+        if len(foreign_keys) > 0:
+            self.logger.log(f"Pointed {len(foreign_keys)} foreign keys at the swapped in tables again.")
+
+    def drop_tables(self, table_names: iter):
+
+        for table_name in table_names:
+            self.cursor.execute(f"DROP TABLE IF EXISTS {self.quote_name(table_name)};")
         self.connection.commit()
 
-    def check_if_string_is_convertible(self, value_string):
+    def report_schema_gaps(self, psv_name: str, psv_file_path):
+
+        # The setup script may not create every table and column of the validation rules
+        schema_gaps = self.schema.get_schema_gaps(psv_name)
+        if schema_gaps is not None:
+            self.logger.warning(f"{schema_gaps}, the database needs them to load {psv_file_path}.")
 
-        # Check if string is boolean
-        if value_string in ("True", "False"):
-            return value_string
+    def update_table_from_psv(self, psv_name: str, psv_file_path, table_name: str = None):
 
-        # Check if string is int
+        # Start timer
+        start_time = time.time()
+
+        table_rules = self.schema.get_table_rules(psv_name)
+        self.report_schema_gaps(psv_name, psv_file_path)
+
+        # The rows are loaded into the table of the psv file, unless another table like its shadow table is given
+        if table_name is None:
+            table_name = psv_name
+
+        # Replace the rows of the table in one transaction, so a failing load keeps the previous rows
+        # The ids are numbered from 1 by the loader, like they were after a truncate
+        try:
+            self.reset_table(table_name)
+            id_column = self.get_auto_increment_column(table_name)
+            if self.use_load_data and self.dialect == "mysql":
+                row_count = self.load_data_from_psv(psv_name, psv_file_path, table_rules, table_name, id_column)
+            else:
+                row_count = self.insert_rows_from_psv(psv_name, psv_file_path, table_rules, table_name, id_column)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        self.reset_auto_increment(table_name)
+
+        # End timer
+        end_time = time.time()
+
+        rows_per_second = round(row_count / max(end_time - start_time, 0.000001))
+        self.logger.log(f"Loaded {row_count} rows into {table_name} in {round(end_time - start_time, 2)}s "
+                        f"({rows_per_second} rows/s).")
+
+        results = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "row_count": row_count,
+            "rows_per_second": rows_per_second
+        }
+
+        return results
+
+    def insert_rows_from_psv(self,
+                             psv_name: str,
+                             psv_file_path,
+                             table_rules: dict,
+                             table_name: str,
+                             id_column: str = None):
+
+        # Stream the rows of the psv file into batches of a prepared insert statement
+        row_count = 0
+        columns, rows = self.read_rows_from_psv(psv_name, psv_file_path, table_rules)
+        if id_column is not None and id_column not in columns:
+            columns = (id_column,) + columns
+            rows = ((row_number,) + tuple(row) for row_number, row in enumerate(rows, 1))
+        statement = self.get_insert_statement(table_name, columns)
+
+        batch = []
+        for row in rows:
+
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.cursor.executemany(statement, batch)
+                row_count += len(batch)
+                batch = []
+        if len(batch) > 0:
+            self.cursor.executemany(statement, batch)
+            row_count += len(batch)
+
+        return row_count
+
+    def read_rows_from_psv(self, psv_name: str, psv_file_path, table_rules: dict):
+
+        # Returns the columns and the typed rows of a table, which are read from its columnar file when it is up to date
+        # Values are returned like the database stores them, with the doubled single quotes of the scraper undone
+        codec = self.schema.get_row_codec(psv_name)
+        columnar_file_path = find_columnar_file(f"{psv_file_path}.psv")
+        if columnar_file_path is not None:
+            table = ColumnarTable(columnar_file_path)
+            try:
+                columns = self.get_columns(psv_name, table.field_names, table_rules)
+            except ValueError:
+                table.close()
+                raise
+
+            def read_columnar_rows():
+
+                with table:
+                    for row in table.iterate_rows():
+                        yield codec.unquote(row)
+
+            return columns, read_columnar_rows()
+
+        # Psv values are decoded by the row codec of the table
+        file = open(f"{psv_file_path}.psv", newline="")
+        file_reader = reader(file, delimiter='|', lineterminator='\n')
         try:
-            int(value_string)
-            return value_string
+            columns = self.get_columns(psv_name, next(file_reader, ()), table_rules)
         except ValueError:
-            pass
+            file.close()
+            raise
+        decoders = codec.get_decoders(columns)
+
+        def read_psv_rows():
+
+            with file:
+                for row in file_reader:
+                    yield codec.unquote(codec.decode_psv(row, decoders))
 
-        # Check if string is None
-        if value_string == "None":
-            return "NULL"
+        return columns, read_psv_rows()
 
-        # Default to string
-        return "'" + value_string + "'"
+    def sync_tables_from_psv(self, directory_path: str = "data", setup_database: bool = True):
+
+        # Start timer
+        start_time = time.time()
+
+        # Create connection
+        self.connect()
+
+        # Setup tables
+        if setup_database:
+            self.setup_db()
+
+        # Disable foreign key checks
+        self.set_foreign_key_checks(False)
+
+        # Only change the rows that differ, every table is synced in its own transaction
+        try:
+            table_results = self.run_table_tasks(
+                self.get_psv_names(directory_path),
+                lambda psv_name: self.sync_table_from_psv(psv_name, f"{directory_path}/{psv_name}"))
+        finally:
+            # Enable foreign key checks
+            self.set_foreign_key_checks(True)
+
+            # Close connection
+            self.disconnect()
+
+        # End timer
+        end_time = time.time()
+
+        results = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "tables": table_results
+        }
+        for change_type in ("inserted", "updated", "deleted", "unchanged"):
+            results[change_type] = sum([table_result[change_type] for table_result in table_results.values()])
+        self.logger.log(f"Synced {len(table_results)} tables in {round(end_time - start_time, 2)}s: "
+                        f"{results['inserted']} inserted, {results['updated']} updated, {results['deleted']} deleted "
+                        f"and {results['unchanged']} unchanged rows.")
+
+        return results
+
+    def sync_table_from_psv(self, psv_name: str, psv_file_path):
+
+        # Start timer
+        start_time = time.time()
+
+        table_rules = self.schema.get_table_rules(psv_name)
+        self.report_schema_gaps(psv_name, psv_file_path)
+
+        # Read the rows of the psv file and of the table by their natural key
+        columns, rows = self.read_rows_from_psv(psv_name, psv_file_path, table_rules)
+        codec = self.schema.get_row_codec(psv_name)
+        readers = codec.get_readers(columns)
+        key_columns = self.get_natural_key(columns)
+        new_rows = self.get_rows_by_key(psv_name, rows, columns, key_columns)
+        self.cursor.execute("SELECT {columns} FROM {table};".format(
+            columns=", ".join([self.quote_name(column) for column in columns]),
+            table=self.quote_name(psv_name)
+        ))
+        current_rows = self.get_rows_by_key(
+            psv_name,
+            [codec.read_sql(row, readers) for row in self.cursor.fetchall()],
+            columns,
+            key_columns)
+
+        # Rows keep their primary key when they are updated
+        inserted_rows = []
+        updated_rows = []
+        unchanged_count = 0
+        for key, row in new_rows.items():
+
+            previous_row = current_rows.get(key, None)
+            if previous_row is None:
+                inserted_rows.append(row)
+            elif row == previous_row:
+                unchanged_count += 1
+            else:
+                updated_rows.append(row + key)
+        deleted_keys = [key for key in current_rows if key not in new_rows]
+
+        # Delete first, so an inserted row can take over a unique value of a deleted row
+        key_condition = " AND ".join([f"{self.quote_name(column)} {self.get_null_safe_equals()} {self.placeholder}"
+                                      for column in key_columns])
+        try:
+            self.execute_batches(f"DELETE FROM {self.quote_name(psv_name)} WHERE {key_condition};", deleted_keys)
+            self.execute_batches("UPDATE {table} SET {values} WHERE {key_condition};".format(
+                table=self.quote_name(psv_name),
+                values=", ".join([f"{self.quote_name(column)} = {self.placeholder}" for column in columns]),
+                key_condition=key_condition
+            ), updated_rows)
+            self.execute_batches(self.get_insert_statement(psv_name, columns), inserted_rows)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+
+        # End timer
+        end_time = time.time()
+
+        deleted_count = len(deleted_keys)
+        if len(inserted_rows) + len(updated_rows) + deleted_count > 0:
+            self.logger.log(f"Synced {psv_name} in {round(end_time - start_time, 2)}s: {len(inserted_rows)} inserted, "
+                            f"{len(updated_rows)} updated and {deleted_count} deleted rows.")
+
+        results = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "inserted": len(inserted_rows),
+            "updated": len(updated_rows),
+            "deleted": deleted_count,
+            "unchanged": unchanged_count
+        }
+
+        return results
+
+    def get_natural_key(self, columns: tuple):
+
+        # Entities are identified by their wowhead id or name, link tables by the names they link
+        for key_column in ("wowhead_id", "name"):
+            if key_column in columns:
+                return (key_column,)
+        key_columns = tuple([column for column in columns if column.endswith("_name")])
+
+        return key_columns if len(key_columns) > 0 else columns
+
+    def get_rows_by_key(self, table_name: str, rows: iter, columns: tuple, key_columns: tuple):
+
+        # A row can only be updated in place when its natural key identifies it
+        key_indexes = [columns.index(column) for column in key_columns]
+        rows_by_key = {}
+        for row in rows:
+
+            key = tuple([row[index] for index in key_indexes])
+            if key in rows_by_key:
+                raise DuplicateNaturalKeyException(
+                    f"The table {table_name} has more than one row with {', '.join(key_columns)} {key}")
+            rows_by_key[key] = row
+
+        return rows_by_key
+
+    def get_null_safe_equals(self):
+
+        return "IS" if self.dialect == "sqlite" else "<=>"
+
+    def execute_batches(self, statement: str, parameters: list):
+
+        for offset in range(0, len(parameters), self.batch_size):
+            self.cursor.executemany(statement, parameters[offset:offset + self.batch_size])
+
+    def get_insert_statement(self, table_name: str, columns: tuple):
+
+        return "INSERT INTO {table} ({columns}) VALUES ({values});".format(
+            table=self.quote_name(table_name),
+            columns=", ".join([self.quote_name(column) for column in columns]),
+            values=", ".join([self.placeholder for column in columns])
+        )
+
+    def load_data_from_psv(self,
+                           psv_name: str,
+                           psv_file_path,
+                           table_rules: dict,
+                           table_name: str,
+                           id_column: str = None):
+
+        # Let the server read the psv file, values are read into variables and converted like the row codec does
+        with open(f"{psv_file_path}.psv", newline="") as file:
+            columns = self.get_columns(psv_name, next(reader(file, delimiter='|', lineterminator='\n'), ()), table_rules)
+
+        value_names = [f"@value_{index}" for index in range(len(columns))]
+        conversions = [f"{self.quote_name(column)} = {conversion}"
+                       for column, conversion in zip(columns,
+                                                     self.get_value_conversions(columns, table_rules, value_names))]
+        if id_column is not None and id_column not in columns:
+            self.cursor.execute("SET @row_number = 0;")
+            conversions.append(f"{self.quote_name(id_column)} = (@row_number := @row_number + 1)")
+
+        statement = ("LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8 "
+                     "FIELDS TERMINATED BY '|' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                     "LINES TERMINATED BY '\\n' IGNORE 1 LINES ({variables}) SET {conversions};").format(
+            table=self.quote_name(table_name),
+            variables=", ".join([f"@value_{index}" for index in range(len(columns))]),
+            conversions=", ".join(conversions)
+        )
+        self.cursor.execute(statement, (os.path.abspath(f"{psv_file_path}.psv"),))
+
+        return self.cursor.rowcount
+
+    def get_value_conversions(self, columns: tuple, table_rules: dict, value_names: list):
+
+        # Expressions that convert the psv values of the columns like the row codec does,
+        # strings get the doubled single quotes of the scraper undone like the rows the connector inserts
+        conversions = []
+        for column, value_name in zip(columns, value_names):
+
+            rules = table_rules[column]
+            if rules["type"] == "boolean":
+                conversion = f"{value_name} = 'True'"
+            elif rules["type"] == "integer":
+                conversion = f"NULLIF({value_name}, '')"
+            elif rules.get("not_null", False):
+                conversion = f"REPLACE({value_name}, '''''', '''')"
+            else:
+                conversion = f"NULLIF(REPLACE({value_name}, '''''', ''''), '')"
+            conversions.append(conversion)
+
+        return conversions
+
+    def get_columns(self, psv_name: str, header: iter, table_rules: dict):
+
+        # Only columns of the validation rules are loaded, so column names are safe to put in statements
+        columns = tuple(header)
+        unknown_columns = [column for column in columns if column not in table_rules]
+        if len(columns) == 0 or len(unknown_columns) > 0:
+            raise ValueError(f"The header of {psv_name}.psv contains unknown columns: {', '.join(unknown_columns)}")
+
+        return columns
+
+    def quote_name(self, name: str):
+
+        if re.fullmatch(r"\w+", name) is None:
+            raise ValueError(f"Invalid table or column name: {name}")
+
+        return f"`{name}`"
 
     def reset_table(self, table_name):
 
-        self.cursor.execute(f"TRUNCATE TABLE {table_name};")
-        self.cursor.execute(f"ALTER TABLE {table_name} AUTO_INCREMENT = 0;")
+        # Truncate would commit the transaction, so delete the rows instead
+        self.cursor.execute(f"DELETE FROM {self.quote_name(table_name)};")
+
+    def get_auto_increment_column(self, table_name: str):
+
+        # Sqlite numbers the rows of an emptied table from 1 again, mysql keeps counting after a delete
+        if self.dialect == "sqlite":
+            return None
+        self.cursor.execute("SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+                            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND EXTRA LIKE %s;",
+                            (table_name, "%auto_increment%"))
+        rows = self.cursor.fetchall()
+
+        return rows[0][0] if len(rows) > 0 else None
+
+    def reset_auto_increment(self, table_name: str):
+
+        # Altering a table commits, so the counter is only reset after the load, it continues after the highest id
+        if self.dialect == "mysql":
+            self.cursor.execute(f"ALTER TABLE {self.quote_name(table_name)} AUTO_INCREMENT = 1;")
@@ -0,0 +1,132 @@
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from wowhead_scraper.logger import Logger
+
+
+class StageScheduler:
+
+    def __init__(self, logger: Logger, stages: dict, maximum_parallel_stages: int = 4):
+
+        # Stages are given in the order they ran in before, every stage declares the tables it reads and writes
+        self.logger = logger
+        self.stages = stages
+        self.maximum_parallel_stages = max(maximum_parallel_stages, 1)
+        self.dependencies = self.get_dependencies()
+
+    def get_dependencies(self):
+
+        # A stage waits for every earlier stage that writes a table it reads or writes,
+        # or that reads a table it writes, so the declared order is kept wherever it matters
+        stage_names = list(self.stages)
+        dependencies = {stage_name: [] for stage_name in stage_names}
+        for index, stage_name in enumerate(stage_names):
+
+            inputs = set(self.stages[stage_name]["inputs"])
+            outputs = set(self.stages[stage_name]["outputs"])
+            for earlier_stage_name in stage_names[0:index]:
+
+                earlier_inputs = set(self.stages[earlier_stage_name]["inputs"])
+                earlier_outputs = set(self.stages[earlier_stage_name]["outputs"])
+                if earlier_outputs & inputs or earlier_outputs & outputs or earlier_inputs & outputs:
+                    dependencies[stage_name].append(earlier_stage_name)
+
+        return dependencies
+
+    def run(self, run_stage):
+
+        # Start every stage as soon as the stages it depends on are done
+        # The stages share the fetcher, so they are still limited by the same rate limiter
+        timings = {}
+        waiting_stage_names = list(self.stages)
+        running_stages = {}
+        finished_stage_names = set()
+        failure = None
+        with ThreadPoolExecutor(max_workers=self.maximum_parallel_stages) as executor:
+
+            while waiting_stage_names or running_stages:
+
+                if failure is None:
+                    for stage_name in list(waiting_stage_names):
+
+                        if len(running_stages) >= self.maximum_parallel_stages:
+                            break
+                        if all([dependency in finished_stage_names for dependency in self.dependencies[stage_name]]):
+                            waiting_stage_names.remove(stage_name)
+                            future = executor.submit(self.run_timed_stage, run_stage, stage_name)
+                            running_stages[future] = stage_name
+                elif not running_stages:
+                    break
+
+                done_futures = wait(running_stages, return_when=FIRST_COMPLETED)[0]
+                for future in done_futures:
+
+                    stage_name = running_stages.pop(future)
+                    try:
+                        timings[stage_name] = future.result()
+                        finished_stage_names.add(stage_name)
+                    except Exception as exception:
+                        # Let the running stages finish, but don't start new ones
+                        self.logger.error(f"Stage {stage_name} failed, no new stages are started.")
+                        if failure is None:
+                            failure = exception
+
+        if failure is not None:
+            raise failure
+
+        self.log_critical_path(timings)
+
+        return timings
+
+    def run_timed_stage(self, run_stage, stage_name: str):
+
+        start_time = time.time()
+        results = run_stage(stage_name)
+
+        return {
+            "start_time": start_time,
+            "end_time": time.time(),
+            "results": results
+        }
+
+    def get_critical_path(self, timings: dict):
+
+        # The longest chain of dependent stages decides how long a run takes at least
+        chain_durations = {}
+        chain_predecessors = {}
+        for stage_name in self.stages:
+
+            duration = timings[stage_name]["end_time"] - timings[stage_name]["start_time"]
+            predecessor = None
+            for dependency in self.dependencies[stage_name]:
+                if predecessor is None or chain_durations[dependency] > chain_durations[predecessor]:
+                    predecessor = dependency
+            chain_durations[stage_name] = duration + (chain_durations[predecessor] if predecessor is not None else 0)
+            chain_predecessors[stage_name] = predecessor
+
+        stage_name = max(chain_durations, key=lambda name: chain_durations[name])
+        critical_path = []
+        while stage_name is not None:
+            critical_path.insert(0, stage_name)
+            stage_name = chain_predecessors[stage_name]
+
+        return {
+            "stages": tuple(critical_path),
+            "duration": max(chain_durations.values())
+        }
+
+    def log_critical_path(self, timings: dict):
+
+        if len(timings) == 0:
+            return
+
+        critical_path = self.get_critical_path(timings)
+        stage_time = sum([timing["end_time"] - timing["start_time"] for timing in timings.values()])
+        wall_time = max([timing["end_time"] for timing in timings.values()]) - \
+            min([timing["start_time"] for timing in timings.values()])
+        path_description = " -> ".join([
+            f"{stage_name} ({round(timings[stage_name]['end_time'] - timings[stage_name]['start_time'], 2)}s)"
+            for stage_name in critical_path["stages"]])
+        self.logger.log(f"Critical path: {path_description}.")
+        self.logger.log(f"The critical path took {round(critical_path['duration'], 2)}s of "
+                        f"{round(wall_time, 2)}s, the stages took {round(stage_time, 2)}s together.")
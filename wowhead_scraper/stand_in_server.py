@@ -0,0 +1,633 @@
+import argparse
+import html
+import random
+import re
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from threading import Lock, Thread
+from urllib.parse import unquote, urlsplit
+from wowhead_scraper.page_archive import PageArchive
+
+
+class SyntheticPages:
+
+    main_professions = (("Alchemy", 171, "trade_alchemy"),
+                        ("Blacksmithing", 164, "trade_blacksmithing"),
+                        ("Enchanting", 333, "trade_engraving"),
+                        ("Engineering", 202, "trade_engineering"),
+                        ("Herbalism", 182, "spell_nature_naturetouchgrow"),
+                        ("Leatherworking", 165, "trade_leatherworking"),
+                        ("Mining", 186, "trade_mining"),
+                        ("Skinning", 393, "inv_misc_pelt_wolf_01"),
+                        ("Tailoring", 197, "trade_tailoring"))
+    secondary_professions = (("Cooking", 185, "inv_misc_food_15"),
+                             ("First Aid", 129, "spell_holy_sealofsacrifice"),
+                             ("Fishing", 356, "trade_fishing"),
+                             ("Riding", 762, "spell_nature_swiftness"))
+    specialisations = {
+        "Blacksmithing": ("Armorsmith", "Weaponsmith"),
+        "Engineering": ("Gnomish Engineer", "Goblin Engineer"),
+        "Leatherworking": ("Dragonscale Leatherworking", "Elemental Leatherworking", "Tribal Leatherworking")
+    }
+    recipe_item_prefixes = {
+        "Alchemy": "Recipe",
+        "Blacksmithing": "Plans",
+        "Cooking": "Recipe",
+        "Enchanting": "Formula",
+        "Engineering": "Schematic",
+        "First Aid": "Manual",
+        "Leatherworking": "Pattern",
+        "Mining": "Plans",
+        "Tailoring": "Pattern"
+    }
+    craftable_item_filter_ids = {
+        "Alchemy": 1,
+        "Blacksmithing": 2,
+        "Cooking": 3,
+        "Enchanting": 4,
+        "Engineering": 5,
+        "First Aid": 6,
+        "Leatherworking": 8,
+        "Mining": 9,
+        "Tailoring": 10
+    }
+    adjectives = ("Heavy", "Light", "Runed", "Mithril", "Thorium", "Silk", "Mageweave", "Arcane", "Frost", "Fiery",
+                  "Greater", "Lesser", "Elixir", "Gnomish", "Goblin", "Dark", "Golden", "Iron", "Copper", "Silver",
+                  "Jaina's", "Thrall's")
+    nouns = ("Bracers", "Boots", "Gloves", "Helm", "Belt", "Cloak", "Potion", "Bandage", "Grenade", "Dust",
+             "Essence", "Shard", "Thread", "Leather", "Bar", "Powder", "Scope", "Rod", "Stew", "Vest")
+    enchantment_slots = ("Bracer", "Boots", "Gloves", "Chest", "Cloak", "Shield", "2H Weapon", "Weapon")
+    enchantment_stats = ("Minor Health", "Lesser Stamina", "Strength", "Agility", "Spirit", "Intellect",
+                         "Defense", "Fire Resistance", "Lesser Protection", "Mana")
+    location_categories = (0, 1, 2, 3, 6, -1)
+    faction_territories = (0, 1, 2, 4)
+    reactions = (1, -1, 0, None)
+    sources = (1, 2, 4, 5, 15, 16, 17, 19, 21, 23)
+    item_slots = (0, 1, 2, 3, 5, 6, 7, 8, 9, 10, 12, 13, 14, 15, 16, 17, 18, 21, 24)
+
+    def __init__(self, scale: int = 1, seed: int = 0, padding: int = 32 * 1024):
+
+        self.random = random.Random(seed)
+        self.scale = scale
+        self.padding = self.create_padding(padding)
+        self.used_names = set()
+
+        # Generate locations
+        self.locations = []
+        for index in range(40 * scale):
+            minimum_level = self.random.randint(1, 55)
+            location = {
+                "category": self.location_categories[index % len(self.location_categories)],
+                "id": 1 + index,
+                "name": self.create_name("Vale", "Peaks", "Marsh", "Barrens", "Keep", "Hold"),
+                "territory": self.faction_territories[index % len(self.faction_territories)],
+                "minlevel": minimum_level,
+                "maxlevel": minimum_level + 5
+            }
+            if index % 3 == 0:
+                location["reqlevel"] = minimum_level
+            self.locations.append(location)
+
+        # Generate vendors
+        self.vendors = []
+        for index in range(60 * scale):
+            self.vendors.append({
+                "id": 3000 + index,
+                "location": [location["id"] for location in self.random.sample(self.locations, 2)],
+                "name": self.create_name("Merchant", "Supplier", "Trader", "Vendor"),
+                "react": [self.random.choice(self.reactions), self.random.choice(self.reactions)]
+            })
+
+        # Generate reagents, a part of them is sold by vendors
+        self.reagents = []
+        self.sold_by = {}
+        for index in range(80 * scale):
+            reagent_sources = sorted(self.random.sample(self.sources, self.random.randint(1, 3)))
+            reagent = {
+                "id": 2000 + index,
+                "name": self.create_name("Cloth", "Ore", "Herb", "Hide", "Vial", "Spice", "Flux"),
+                "source": reagent_sources
+            }
+            self.reagents.append(reagent)
+            if 5 in reagent_sources:
+                self.sold_by[reagent["id"]] = [{
+                    "id": vendor["id"],
+                    "name": vendor["name"],
+                    "react": vendor["react"],
+                    "cost": [self.random.randint(1, 5000)]
+                } for vendor in self.random.sample(self.vendors, self.random.randint(1, 3))]
+
+        # Generate reagents which only show up in recipes
+        self.unknown_reagents = []
+        for index in range(10 * scale):
+            self.unknown_reagents.append({
+                "id": 90000 + index,
+                "name": self.create_name("Relic", "Crystal", "Gem", "Rune")
+            })
+
+        # Generate enchantments
+        self.enchantments = []
+        for index in range(20 * scale):
+            name = f"Enchant {self.random.choice(self.enchantment_slots)} - " \
+                   f"{self.create_name(*self.enchantment_stats, with_adjective=False)}"
+            self.enchantments.append({
+                "id": 7400 + index,
+                "name": name
+            })
+
+        # Generate craftable items per profession
+        self.craftable_items = {}
+        item_id = 10000
+        for profession_name in self.craftable_item_filter_ids:
+            self.craftable_items[profession_name] = []
+            for index in range(20 * scale):
+                craftable_item = {
+                    "id": item_id,
+                    "name": self.create_name(*self.nouns),
+                    "slot": self.random.choice(self.item_slots)
+                }
+                if index % 4 != 0:
+                    craftable_item["sellprice"] = self.random.randint(1, 20000)
+                self.craftable_items[profession_name].append(craftable_item)
+                item_id += 1
+
+        # Generate profession data
+        self.professions = {}
+        self.trainers = {}
+        spell_id = 20000
+        recipe_item_id = 40000
+        trainer_id = 5000
+        for profession_name, profession_id, icon in self.main_professions + self.secondary_professions:
+            recipes = []
+            recipe_names = [craftable_item["name"] for craftable_item in self.craftable_items.get(profession_name, [])]
+            if profession_name == "Enchanting":
+                recipe_names += [enchantment["name"] for enchantment in self.enchantments]
+            if profession_name == "Engineering":
+                recipe_names.append('"Gnomish" Cloaking Device')
+            for recipe_name in recipe_names:
+                learned_at = self.random.randint(1, 300)
+                reagents = [[reagent["id"], self.random.randint(1, 10)]
+                            for reagent in self.random.sample(self.reagents, self.random.randint(1, 4))]
+                if self.random.random() < 0.1:
+                    reagents.append([self.random.choice(self.unknown_reagents)["id"], 1])
+                recipes.append({
+                    "colors": [learned_at, learned_at + 10, learned_at + 20, learned_at + 30],
+                    "creates": [recipe_item_id + 50000, 1, self.random.choice((1, 1, 1, 3))],
+                    "id": spell_id,
+                    "learnedat": learned_at,
+                    "name": recipe_name,
+                    "reagents": reagents,
+                    "skill": [profession_id],
+                    "trainingcost": self.random.randint(1, 50000)
+                })
+                spell_id += 1
+
+            recipe_items = []
+            prefix = self.recipe_item_prefixes.get(profession_name, "Recipe")
+            for recipe in recipes[::3]:
+                recipe_items.append({
+                    "id": recipe_item_id,
+                    "name": f"{prefix}: {recipe['name']}",
+                    "skill": recipe["learnedat"]
+                })
+                recipe_item_id += 1
+
+            trainers = []
+            for index in range(5 * scale):
+                trainer = {
+                    "id": trainer_id,
+                    "location": [self.random.choice(self.locations)["id"]],
+                    "name": self.create_name("Trainer", "Master", "Artisan", "Journeyman"),
+                    "react": [self.random.choice(self.reactions), self.random.choice(self.reactions)],
+                    "tag": f"{profession_name} Trainer"
+                }
+                trainers.append(trainer)
+                self.trainers[trainer_id] = {
+                    "trainer": trainer,
+                    "recipes": self.random.sample(recipes, min(len(recipes), self.random.randint(5, 30)))
+                }
+                trainer_id += 1
+
+            self.professions[profession_name] = {
+                "id": profession_id,
+                "icon": icon,
+                "recipes": recipes,
+                "recipe_items": recipe_items,
+                "trainers": trainers
+            }
+
+        # Index items and spells by id and name for pages and icons
+        self.items = {}
+        for item in self.reagents + self.unknown_reagents:
+            self.items[item["id"]] = item
+        for profession_name in self.craftable_items:
+            for item in self.craftable_items[profession_name]:
+                self.items[item["id"]] = item
+        for profession_name in self.professions:
+            for item in self.professions[profession_name]["recipe_items"]:
+                self.items[item["id"]] = item
+
+    def create_name(self, *nouns, with_adjective: bool = True):
+
+        # Names are unique, add a number once all combinations are used up
+        attempt = 0
+        while True:
+            noun = self.random.choice(nouns)
+            name = f"{self.random.choice(self.adjectives)} {noun}" if with_adjective else noun
+            if attempt > 20:
+                name = f"{name} {self.random.randint(2, 100 * self.scale + 100)}"
+            if name not in self.used_names:
+                self.used_names.add(name)
+                return name
+            attempt += 1
+
+    def create_padding(self, size: int):
+
+        # Real pages are mostly markup around a few script tags
+        block = "<div class=\"menu-item\"><a href=\"/items\" class=\"menu-link\">Items</a>" \
+                "<span class=\"menu-text\">Database</span></div>\n"
+
+        return block * max(size // len(block), 0)
+
+    def get_icon_name(self, name: str):
+
+        return "inv_" + re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+    def create_gatherer_data(self, type_id: int, entities: iter):
+
+        icons = {}
+        for entity in entities:
+            icons[str(entity["id"])] = {
+                "name_enus": entity["name"],
+                "quality": 1,
+                "icon": self.get_icon_name(entity["name"])
+            }
+
+        return f"WH.Gatherer.addData({type_id}, 4, {dumps(icons, separators=(',', ':'))});"
+
+    def create_listview_data(self, rows: iter, unquoted_keys: tuple = ()):
+
+        # Wowhead mixes json with unquoted javascript keys
+        rows_json = []
+        for row in rows:
+            quoted_row = {key: value for key, value in row.items() if key not in unquoted_keys}
+            row_json = dumps(quoted_row, separators=(",", ":"))
+            for key in unquoted_keys:
+                if key in row:
+                    row_json = f"{row_json[0:-1]},{key}:{dumps(row[key], separators=(',', ':'))}}}"
+            rows_json.append(row_json)
+
+        return f"[{','.join(rows_json)}]"
+
+    def create_listview(self, template: str, table_id: str, rows: iter, unquoted_keys: tuple = ()):
+
+        return f"new Listview({{template: '{template}', id: '{table_id}', tabs: tabsRelated, " \
+               f"parent: 'lkljbjkb574', data: {self.create_listview_data(rows, unquoted_keys)}}});"
+
+    def create_page(self, title: str, script: str, heading: str = None):
+
+        heading = f"<h1 class=\"heading-size-1\">{html.escape(heading)}</h1>\n" if heading is not None else ""
+
+        return f"<!DOCTYPE html>\n<html>\n<head>\n<title>{title} - Classic WoW</title>\n" \
+               f"<script src=\"/js/basic.js\"></script>\n</head>\n<body>\n{self.padding}{heading}" \
+               f"<div id=\"lkljbjkb574\"></div>\n<script>//<![CDATA[\n" \
+               f"var tabsRelated = new Tabs({{parent: WH.ge('jkbfksdbl4'), trackable: 'Item'}});\n" \
+               f"{script}\n//]]></script>\n{self.padding}</body>\n</html>\n"
+
+    def get_page(self, path: str):
+
+        url = urlsplit(unquote(path))
+        filter_string = url.query.replace("filter=", "")
+
+        if url.path == "/professions":
+            return self.get_skills_page("Professions", self.main_professions)
+        if url.path == "/secondary-skills":
+            return self.get_skills_page("Secondary Skills", self.secondary_professions)
+        if url.path == "/zones":
+            return self.create_page("Zones", self.create_listview("zone", "zones", self.locations))
+        if url.path == "/npcs" and filter_string == "29;1;0":
+            return self.create_page("Vendors", self.create_listview("npc", "npcs", self.vendors))
+        if url.path == "/items" and filter_string == "87;11;0":
+            return self.get_listview_page("Reagents", "items", 3, self.reagents)
+        if url.path == "/items":
+            match = re.match(r"86:64;(\d+):2;0:0", filter_string)
+            for profession_name in self.craftable_item_filter_ids:
+                if match is not None and int(match.group(1)) == self.craftable_item_filter_ids[profession_name]:
+                    return self.get_listview_page("Items", "items", 3, self.craftable_items[profession_name])
+            return None
+        if url.path == "/spells/professions/enchanting" and filter_string == "20:109;1:53;0:0":
+            return self.get_listview_page("Enchantments", "spells", 6, self.enchantments)
+
+        match = re.match(r"^/spells/professions/([a-z\-']+)(?:/([a-z\-']+))?$", url.path)
+        if match is not None:
+            return self.get_profession_spells_page(match.group(1), match.group(2))
+
+        match = re.match(r"^/npc=(\d+)", url.path)
+        if match is not None:
+            return self.get_npc_page(int(match.group(1)))
+
+        match = re.match(r"^/item=(\d+)", url.path)
+        if match is not None:
+            return self.get_item_page(int(match.group(1)))
+
+        for profession_name in self.professions:
+            if url.path == f"/{profession_name.lower().replace(' ', '-')}":
+                return self.get_profession_page(profession_name)
+
+        return None
+
+    def get_skills_page(self, title: str, professions: tuple):
+
+        skills = [{
+            "category": 11,
+            "icon": icon,
+            "id": profession_id,
+            "name": name
+        } for name, profession_id, icon in professions]
+
+        return self.create_page(title, self.create_listview("skill", "skills", skills))
+
+    def get_listview_page(self, title: str, listview_name: str, type_id: int, rows: iter):
+
+        script = f"{self.create_gatherer_data(type_id, rows)}\n" \
+                 f"var listview{listview_name} = {self.create_listview_data(rows)};"
+
+        return self.create_page(title, script)
+
+    def get_profession_spells_page(self, profession_slug: str, specialisation_slug: str):
+
+        for profession_name in self.professions:
+
+            if profession_name.lower().replace(" ", "-") != profession_slug:
+                continue
+
+            spells = [{"id": self.professions[profession_name]["id"], "name": profession_name}]
+            for index, specialisation in enumerate(self.specialisations.get(profession_name, ())):
+
+                # Recipes of a specialisation
+                if specialisation.lower().replace(" ", "-") == specialisation_slug:
+                    recipes = self.professions[profession_name]["recipes"][index::4]
+                    return self.get_listview_page(specialisation, "spells", 6, recipes)
+                spells.append({
+                    "id": 20219 + self.professions[profession_name]["id"] * 10 + index,
+                    "name": specialisation,
+                    "specialization": 1
+                })
+
+            if specialisation_slug is None:
+                return self.get_listview_page(profession_name, "spells", 6, spells)
+
+        return None
+
+    def get_profession_page(self, profession_name: str):
+
+        profession = self.professions[profession_name]
+        crafted_items = self.craftable_items.get(profession_name, [])
+        script = "\n".join([
+            self.create_gatherer_data(3, profession["recipe_items"] + crafted_items),
+            self.create_gatherer_data(6, profession["recipes"]),
+            self.create_listview("spell", "recipes", profession["recipes"]),
+            self.create_listview("item", "recipe-items", profession["recipe_items"]),
+            self.create_listview("item", "crafted-items", crafted_items),
+            self.create_listview("spell", "spells", [{"id": profession["id"], "name": profession_name}]),
+            self.create_listview("npc", "trainers", profession["trainers"])
+        ])
+
+        return self.create_page(profession_name, script, profession_name)
+
+    def get_npc_page(self, npc_id: int):
+
+        trainer = self.trainers.get(npc_id, None)
+        if trainer is None:
+            return None
+
+        script = "\n".join([
+            self.create_gatherer_data(6, trainer["recipes"]),
+            self.create_listview("spell", "teaches-recipe", trainer["recipes"])
+        ])
+
+        return self.create_page(trainer["trainer"]["name"], script, trainer["trainer"]["name"])
+
+    def get_item_page(self, item_id: int):
+
+        item = self.items.get(item_id, None)
+        if item is None:
+            return None
+
+        name = item["name"]
+        script = "\n".join([
+            f"WH.ge('ic{item_id}').appendChild(Icon.create('{self.get_icon_name(name)}', 2, null, 0, 1));",
+            self.create_listview("npc", "sold-by", self.sold_by.get(item_id, []), ("cost",))
+        ])
+
+        return self.create_page(name, script, name)
+
+
+class FixturePages:
+
+    def __init__(self, logger, archive_path: str):
+
+        # Serve pages recorded by a scraper in record mode
+        self.archive = PageArchive(logger, archive_path, "replay")
+        self.urls = {}
+        for url in self.archive.index:
+            split_url = urlsplit(url)
+            path = f"{split_url.path}?{split_url.query}" if split_url.query != "" else split_url.path
+            self.urls[unquote(path)] = url
+
+    def get_page(self, path: str):
+
+        url = self.urls.get(unquote(path), None)
+        if url is None:
+            return None
+
+        return self.archive.read(url)
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+
+        pass
+
+    def do_GET(self):
+
+        self.server.stand_in.handle(self)
+
+
+class StandInServer:
+
+    def __init__(self,
+                 pages,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 latency: float = 0.0,
+                 latency_jitter: float = 0.0,
+                 throttle_rate: float = 0.0,
+                 error_rate: float = 0.0,
+                 truncate_rate: float = 0.0,
+                 requests_per_second: float = None,
+                 retry_after: int = 1,
+                 seed: int = 0):
+
+        self.pages = pages
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.truncate_rate = truncate_rate
+        self.requests_per_second = requests_per_second
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = Lock()
+        self.last_request_time = 0.0
+        self.statistics = {
+            "requests": 0,
+            "pages_served": 0,
+            "not_found": 0,
+            "throttled": 0,
+            "errors": 0,
+            "truncated": 0
+        }
+
+        self.server = ThreadingHTTPServer((host, port), StandInRequestHandler)
+        self.server.daemon_threads = True
+        self.server.stand_in = self
+        self.thread = None
+
+    @property
+    def url(self):
+
+        host, port = self.server.server_address[0:2]
+
+        return f"http://{host}:{port}"
+
+    def start(self):
+
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        return self
+
+    def stop(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def serve_forever(self):
+
+        self.server.serve_forever()
+
+    def decide_fault(self):
+
+        with self.lock:
+            self.statistics["requests"] += 1
+            now = time.monotonic()
+
+            # Throttle clients which go faster than the allowed rate
+            if self.requests_per_second is not None and \
+                    now - self.last_request_time < 1 / self.requests_per_second:
+                self.statistics["throttled"] += 1
+                return "throttle"
+            self.last_request_time = now
+
+            roll = self.random.random()
+            if roll < self.throttle_rate:
+                self.statistics["throttled"] += 1
+                return "throttle"
+            if roll < self.throttle_rate + self.error_rate:
+                self.statistics["errors"] += 1
+                return "error"
+            if roll < self.throttle_rate + self.error_rate + self.truncate_rate:
+                self.statistics["truncated"] += 1
+                return "truncate"
+
+        return None
+
+    def handle(self, request_handler: StandInRequestHandler):
+
+        # Simulate network and server latency
+        delay = self.latency + self.random.uniform(0, self.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        fault = self.decide_fault()
+        if fault == "throttle":
+            self.send(request_handler, 429, b"Too many requests", {"Retry-After": str(self.retry_after)})
+            return
+        if fault == "error":
+            self.send(request_handler, self.random.choice((500, 502, 503)), b"Server error")
+            return
+
+        page = self.pages.get_page(request_handler.path)
+        if page is None:
+            with self.lock:
+                self.statistics["not_found"] += 1
+            self.send(request_handler, 404, b"Not found")
+            return
+
+        body = page.encode("utf-8")
+        with self.lock:
+            self.statistics["pages_served"] += 1
+        if fault == "truncate":
+            # Announce the full body, but close the connection halfway through
+            request_handler.send_response(200)
+            request_handler.send_header("Content-Type", "text/html; charset=utf-8")
+            request_handler.send_header("Content-Length", str(len(body)))
+            request_handler.end_headers()
+            request_handler.wfile.write(body[0:len(body) // 2])
+            request_handler.close_connection = True
+            return
+
+        self.send(request_handler, 200, body, {"Content-Type": "text/html; charset=utf-8"})
+
+    def send(self, request_handler: StandInRequestHandler, status_code: int, body: bytes, headers: dict = None):
+
+        request_handler.send_response(status_code)
+        for header, value in (headers or {}).items():
+            request_handler.send_header(header, value)
+        request_handler.send_header("Content-Length", str(len(body)))
+        request_handler.end_headers()
+        request_handler.wfile.write(body)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Serve wowhead shaped pages for load and concurrency testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--scale", type=int, default=1, help="Multiply the amount of generated entities")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--padding", type=int, default=32 * 1024, help="Bytes of markup around the scripts")
+    parser.add_argument("--fixtures", default=None, help="Serve pages from a recorded page archive instead")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before every response")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of responses that are 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of responses that are 5xx")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Fraction of responses cut in half")
+    parser.add_argument("--requests-per-second", type=float, default=None,
+                        help="Answer with 429 when requests come in faster than this")
+    arguments = parser.parse_args()
+
+    if arguments.fixtures is not None:
+        from wowhead_scraper.logger import Logger
+        stand_in_pages = FixturePages(Logger(), arguments.fixtures)
+    else:
+        stand_in_pages = SyntheticPages(scale=arguments.scale, seed=arguments.seed, padding=arguments.padding)
+
+    stand_in_server = StandInServer(stand_in_pages,
+                                    host=arguments.host,
+                                    port=arguments.port,
+                                    latency=arguments.latency,
+                                    latency_jitter=arguments.latency_jitter,
+                                    throttle_rate=arguments.throttle_rate,
+                                    error_rate=arguments.error_rate,
+                                    truncate_rate=arguments.truncate_rate,
+                                    requests_per_second=arguments.requests_per_second,
+                                    seed=arguments.seed)
+    print(f"Serving wowhead stand-in pages on {stand_in_server.url}")
+    stand_in_server.serve_forever()